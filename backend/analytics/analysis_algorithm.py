@@ -4,9 +4,11 @@ Bu modül deneme analizi, zayıf konu tespiti ve roadmap oluşturma algoritmalar
 """
 
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import math
 
+import numpy as np
+
 class ExamAnalyzer:
     """Deneme analizi için ana sınıf"""
     
@@ -189,6 +191,223 @@ class ExamAnalyzer:
         
         return weak_topics
     
+    def to_columns(self, attempt_lists: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Deneme listelerini toplu analiz için sütunlu dizilere çevirir
+        
+        Args:
+            attempt_lists: Her biri analyze_question_attempts formatında deneme listeleri
+            
+        Returns:
+            Dict: attempt_ids, topic_ids, user_answers, correct_answers, is_blank dizileri;
+                  topics (topic_id -> konu adı) ve subjects (soru başına ders adı)
+        """
+        topic_index = {}
+        attempt_ids = []
+        topic_ids = []
+        user_answers = []
+        correct_answers = []
+        is_blank = []
+        subjects = []
+        
+        for attempt_id, attempts in enumerate(attempt_lists):
+            for attempt in attempts:
+                attempt_ids.append(attempt_id)
+                topic_ids.append(topic_index.setdefault(attempt['topic'], len(topic_index)))
+                user_answers.append(attempt.get('user_answer') or '')
+                # Boş bırakılan sorularda doğru cevap gelmeyebilir; dict tabanlı sürüm onu okumaz
+                correct_answers.append(attempt.get('correct_answer') or '')
+                is_blank.append(bool(attempt.get('is_blank', False)))
+                # Ders adı yalnızca konunun ilk sorusundan okunur (dict tabanlı sürümle aynı)
+                subjects.append(attempt.get('subject'))
+        
+        return {
+            'attempt_ids': np.array(attempt_ids, dtype=np.int64),
+            'topic_ids': np.array(topic_ids, dtype=np.int64),
+            'user_answers': np.array(user_answers, dtype=str),
+            'correct_answers': np.array(correct_answers, dtype=str),
+            'is_blank': np.array(is_blank, dtype=bool),
+            'topics': list(topic_index),
+            'subjects': subjects,
+            'n_attempts': len(attempt_lists)
+        }
+    
+    def count_topic_results(self, topic_ids: np.ndarray, user_answers: np.ndarray,
+                            correct_answers: np.ndarray, is_blank: np.ndarray,
+                            attempt_ids: Optional[np.ndarray] = None,
+                            n_attempts: Optional[int] = None,
+                            n_topics: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Deneme x konu bazında doğru/yanlış/boş sayılarını hesaplar
+        
+        Args:
+            topic_ids: Soru başına konu indeksi
+            user_answers: Soru başına kullanıcı cevabı (boş için '')
+            correct_answers: Soru başına doğru cevap
+            is_blank: Soru başına boş bırakıldı bayrağı
+            attempt_ids: Soru başına deneme indeksi (verilmezse tek deneme)
+            n_attempts: Deneme sayısı
+            n_topics: Konu sayısı
+            
+        Returns:
+            Dict: (n_attempts, n_topics) boyutlu total/correct/wrong/blank matrisleri
+        """
+        topic_ids = np.asarray(topic_ids, dtype=np.int64)
+        if attempt_ids is None:
+            attempt_ids = np.zeros(len(topic_ids), dtype=np.int64)
+        attempt_ids = np.asarray(attempt_ids, dtype=np.int64)
+        
+        if n_attempts is None:
+            n_attempts = int(attempt_ids.max()) + 1 if len(attempt_ids) else 1
+        if n_topics is None:
+            n_topics = int(topic_ids.max()) + 1 if len(topic_ids) else 0
+        
+        # Boş kontrolü, ardından doğru/yanlış
+        blank = np.asarray(is_blank, dtype=bool) | (np.asarray(user_answers) == '')
+        correct = ~blank & (np.asarray(user_answers) == np.asarray(correct_answers))
+        wrong = ~blank & ~correct
+        
+        # (deneme, konu) çiftine göre gruplama
+        cells = attempt_ids * n_topics + topic_ids
+        size = n_attempts * n_topics
+        shape = (n_attempts, n_topics)
+        
+        return {
+            'total': np.bincount(cells, minlength=size).reshape(shape),
+            'correct': np.bincount(cells, weights=correct, minlength=size).astype(np.int64).reshape(shape),
+            'wrong': np.bincount(cells, weights=wrong, minlength=size).astype(np.int64).reshape(shape),
+            'blank': np.bincount(cells, weights=blank, minlength=size).astype(np.int64).reshape(shape)
+        }
+    
+    def score_topic_results(self, counts: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Sayım matrislerinden oranları, netleri ve zayıflık skorlarını hesaplar.
+        Ağırlıklar değiştiğinde sayımları tekrar çıkarmadan yeniden skorlamak için ayrı tutulur.
+        
+        Args:
+            counts: count_topic_results çıktısı
+            
+        Returns:
+            Dict: Sayımlara ek olarak accuracy_rate, wrong_rate, blank_rate, weakness_score ve net matrisleri
+        """
+        total = counts['total']
+        divisor = np.where(total > 0, total, 1)
+        
+        accuracy = np.where(total > 0, counts['correct'] / divisor, 0.0)
+        wrong_rate = np.where(total > 0, counts['wrong'] / divisor, 0.0)
+        blank_rate = np.where(total > 0, counts['blank'] / divisor, 0.0)
+        
+        weakness_score = (
+            self.weights['accuracy'] * (1 - accuracy) +
+            self.weights['omission'] * blank_rate +
+            self.weights['error'] * wrong_rate
+        )
+        
+        return {
+            **counts,
+            'accuracy_rate': accuracy,
+            'wrong_rate': wrong_rate,
+            'blank_rate': blank_rate,
+            'weakness_score': weakness_score,
+            'net': counts['correct'] - (counts['wrong'] / 4)
+        }
+    
+    def analyze_batch(self, topic_ids: np.ndarray, user_answers: np.ndarray,
+                      correct_answers: np.ndarray, is_blank: np.ndarray,
+                      attempt_ids: Optional[np.ndarray] = None,
+                      n_attempts: Optional[int] = None,
+                      n_topics: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Bir veya birden fazla denemeyi sütunlu dizilerle toplu analiz eder
+        
+        Returns:
+            Dict: (n_attempts, n_topics) boyutlu sayım, oran, net ve zayıflık skoru matrisleri
+        """
+        counts = self.count_topic_results(
+            topic_ids, user_answers, correct_answers, is_blank,
+            attempt_ids=attempt_ids, n_attempts=n_attempts, n_topics=n_topics
+        )
+        return self.score_topic_results(counts)
+    
+    def _analysis_from_batch(self, batch: Dict[str, np.ndarray], columns: Dict[str, Any],
+                             attempt_id: int, start: int, end: int) -> Dict[str, Any]:
+        """
+        Toplu analiz sonucundan tek deneme için analyze_question_attempts çıktısını üretir
+        
+        Args:
+            batch: analyze_batch çıktısı
+            columns: to_columns çıktısı
+            attempt_id: Deneme indeksi
+            start, end: Denemenin sorularının sütunlardaki aralığı
+            
+        Returns:
+            Dict: analyze_question_attempts ile aynı yapıda analiz
+        """
+        # Konuları denemedeki ilk görülme sırasına göre diz (dict tabanlı sürümle aynı sıra)
+        topic_ids, first_rows = np.unique(columns['topic_ids'][start:end], return_index=True)
+        order = np.argsort(first_rows, kind='stable')
+        
+        row = {key: batch[key][attempt_id].tolist() for key in (
+            'total', 'correct', 'wrong', 'blank', 'accuracy_rate', 'wrong_rate', 'blank_rate', 'weakness_score', 'net'
+        )}
+        
+        topic_performance = {}
+        for topic_id, first_row in zip(topic_ids[order].tolist(), first_rows[order].tolist()):
+            topic_performance[columns['topics'][topic_id]] = {
+                'subject': columns['subjects'][start + first_row],
+                'total_questions': row['total'][topic_id],
+                'correct_count': row['correct'][topic_id],
+                'wrong_count': row['wrong'][topic_id],
+                'blank_count': row['blank'][topic_id],
+                'accuracy_rate': row['accuracy_rate'][topic_id],
+                'wrong_rate': row['wrong_rate'][topic_id],
+                'blank_rate': row['blank_rate'][topic_id],
+                'weakness_score': row['weakness_score'][topic_id],
+                'net': row['net'][topic_id]
+            }
+        
+        total_questions = end - start
+        correct_count = sum(row['correct'])
+        wrong_count = sum(row['wrong'])
+        blank_count = sum(row['blank'])
+        
+        return {
+            'general_stats': {
+                'total_questions': total_questions,
+                'correct_count': correct_count,
+                'wrong_count': wrong_count,
+                'blank_count': blank_count,
+                'net': self.calculate_net(correct_count, wrong_count, total_questions),
+                'accuracy_rate': correct_count / total_questions if total_questions > 0 else 0,
+                'wrong_rate': wrong_count / total_questions if total_questions > 0 else 0,
+                'blank_rate': blank_count / total_questions if total_questions > 0 else 0
+            },
+            'topic_performance': topic_performance,
+            'weak_topics': self._identify_weak_topics(topic_performance)
+        }
+    
+    def analyze_attempts_batch(self, attempt_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Birden fazla denemeyi tek seferde analiz eder
+        
+        Args:
+            attempt_lists: Her biri analyze_question_attempts formatında deneme listeleri
+            
+        Returns:
+            List: Her deneme için analyze_question_attempts ile aynı yapıda analiz
+        """
+        columns = self.to_columns(attempt_lists)
+        batch = self.analyze_batch(
+            columns['topic_ids'], columns['user_answers'], columns['correct_answers'], columns['is_blank'],
+            attempt_ids=columns['attempt_ids'], n_attempts=columns['n_attempts'], n_topics=len(columns['topics'])
+        )
+        # to_columns soruları deneme sırasıyla dizer; her denemenin aralığını bul
+        bounds = np.searchsorted(columns['attempt_ids'], np.arange(columns['n_attempts'] + 1)).tolist()
+        return [
+            self._analysis_from_batch(batch, columns, attempt_id, bounds[attempt_id], bounds[attempt_id + 1])
+            for attempt_id in range(columns['n_attempts'])
+        ]
+    
     def generate_roadmap(self, weak_topics: List[Dict], max_topics_per_week: int = 3) -> Dict[str, Any]:
         """
         Zayıf konulara göre çalışma planı oluşturur
@@ -260,9 +479,8 @@ class ExamAnalyzer:
         Returns:
             Dict: İlerleme analizi
         """
-        # Önceki ve mevcut analizleri yap
-        previous_analysis = self.analyze_question_attempts(previous_attempts)
-        current_analysis = self.analyze_question_attempts(current_attempts)
+        # Önceki ve mevcut analizleri tek toplu hesaplamayla yap
+        previous_analysis, current_analysis = self.analyze_attempts_batch([previous_attempts, current_attempts])
         
         # Net değişimi
         net_change = current_analysis['general_stats']['net'] - previous_analysis['general_stats']['net']
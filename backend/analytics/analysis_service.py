@@ -5,6 +5,7 @@ Bu modül tüm analiz işlemlerini yönetir.
 
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
+from functools import wraps
 from django.db.models import Q, Avg, Count, Sum, F
 from django.utils import timezone
 import math
@@ -13,24 +14,179 @@ from users.models import User
 from exams.models import ExamRecord, Subject, Topic
 from tasks.models import DailyTask
 from coaching.models import UserProgress, SubjectPerformance, UserExamAttempt
-from fiverbase.firebase_service import FirebaseDataService
+from .data_sources import AnalyticsDataSource, get_data_source
+from fiverbase.records import ExamRecordDoc, TaskDoc, SessionDoc
+
+
+def cached_analysis(method):
+    """
+    Analiz sonucunu analyzer örneği boyunca sakla.
+    Aynı istek içinde tekrar çağrılan analizler yeniden hesaplanmaz.
+    """
+    @wraps(method)
+    def wrapper(self):
+        key = method.__name__
+        if key not in self._analysis_cache:
+            self._analysis_cache[key] = method(self)
+        return self._analysis_cache[key]
+    return wrapper
+
+
+def empty_exam_analysis() -> Dict[str, Any]:
+    """Hiç deneme kaydı olmayan kullanıcı için deneme analizi"""
+    return {
+        'total_exams': 0,
+        'average_net': 0.0,
+        'best_exam': {
+            'exam_name': 'Henüz deneme yok',
+            'total_net': 0.0,
+            'exam_date': None
+        },
+        'worst_exam': {
+            'exam_name': 'Henüz deneme yok',
+            'total_net': 0.0,
+            'exam_date': None
+        },
+        'best_subject': None,
+        'worst_subject': None,
+        'recent_performance': [],
+        'subject_performance': {}
+    }
+
+
+def find_best_and_worst_subject(subject_performance: Dict[str, Dict]) -> tuple:
+    """Ortalama nete göre en iyi ve en kötü dersi bul"""
+    best_subject = None
+    worst_subject = None
+    best_avg = 0
+    worst_avg = float('inf')
+    
+    for subject, stats in subject_performance.items():
+        avg_net = stats['total_net'] / stats['total_exams']
+        if avg_net > best_avg:
+            best_avg = avg_net
+            best_subject = subject
+        if avg_net < worst_avg:
+            worst_avg = avg_net
+            worst_subject = subject
+    
+    return best_subject, worst_subject
+
+
+def summarize_topic_stats(topic_stats: Dict[str, Dict]) -> Dict[str, Any]:
+    """Konu istatistiklerinden zayıf ve güçlü konuları belirle"""
+    weak_topics = []
+    strong_topics = []
+    
+    for topic, stats in topic_stats.items():
+        if stats['appearances'] >= 2:  # En az 2 denemede görülmüş
+            success_rate = (stats['correct_answers'] / stats['total_questions']) * 100 if stats['total_questions'] > 0 else 0
+            
+            if success_rate < 60:
+                weak_topics.append({
+                    'name': topic,
+                    'subject': stats['subject'],
+                    'success_rate': round(success_rate, 1)
+                })
+            elif success_rate > 80:
+                strong_topics.append({
+                    'name': topic,
+                    'subject': stats['subject'],
+                    'success_rate': round(success_rate, 1)
+                })
+    
+    return {
+        'weak_topics': sorted(weak_topics, key=lambda x: x['success_rate'])[:5],
+        'strong_topics': sorted(strong_topics, key=lambda x: x['success_rate'], reverse=True)[:5],
+        'topic_stats': topic_stats
+    }
 
 
 class ComprehensiveAnalyzer:
     """Kapsamlı analiz servisi"""
     
-    def __init__(self, user: User):
+    # Analizlerin sadece son N gününe baktığı koleksiyonlar; Firestore'dan bu aralık okunur
+    COLLECTION_WINDOWS = {
+        'study_sessions': 30,
+    }
+    
+    # Analizlerin kullandığı alanlar; Firestore'dan sadece bunlar indirilir (select)
+    COLLECTION_FIELDS = {
+        'exam_records': ['exam_name', 'exam_date', 'subject_name', 'total_net', 'total_questions', 'total_correct', 'topics'],
+        'tasks': ['task_type', 'is_completed', 'estimated_duration', 'created_at', 'completed_at'],
+        'study_sessions': ['start_time', 'duration_minutes'],
+        'questions': ['topic_id', 'is_correct', 'is_answered'],
+        'tests': ['topic_id', 'total_questions', 'correct_answers', 'wrong_answers', 'empty_answers'],
+    }
+    
+    def __init__(self, user: User, snapshot=None, data_source: Optional[AnalyticsDataSource] = None):
         self.user = user
-        self.firebase_service = FirebaseDataService()
+        self.snapshot = snapshot
+        # Veri kaynağı verilmezse ayarlardaki kaynak (varsayılan: Firestore) kullanılır
+        self.data_source = data_source or get_data_source()
         self.weights = {
             'accuracy': 0.4,      # Doğruluk oranı
             'consistency': 0.3,   # Tutarlılık
             'progress': 0.2,      # İlerleme
             'effort': 0.1         # Çaba
         }
+        # İstek kapsamlı önbellekler: her koleksiyon en fazla bir kez okunur,
+        # her analiz en fazla bir kez hesaplanır
+        self._data_cache = {}
+        self._analysis_cache = {}
+        
+        # Kalıcı analiz özeti verildiyse temel analizler özetten gelir, ham veri okunmaz
+        if snapshot is not None:
+            from .snapshot import snapshot_analyses
+            self._analysis_cache.update(snapshot_analyses(snapshot))
+    
+    def prefetch(self, collections: List[str]) -> None:
+        """Henüz okunmamış koleksiyonları tek seferde, paralel olarak getir"""
+        missing = [name for name in collections if name not in self._data_cache]
+        if not missing:
+            return
+        today = timezone.now().date()
+        date_ranges = {
+            name: (today - timedelta(days=days), None)
+            for name, days in self.COLLECTION_WINDOWS.items() if name in missing
+        }
+        bundle = self.data_source.get_user_bundle(self.user, missing, date_ranges, self.COLLECTION_FIELDS)
+        for name in missing:
+            self._data_cache[name] = getattr(bundle, name)
+    
+    def _load_collection(self, collection: str) -> List[Dict[str, Any]]:
+        """Kullanıcı koleksiyonunu Firebase'den bir kez çek, sonraki çağrılarda önbellekten döndür"""
+        self.prefetch([collection])
+        return self._data_cache[collection]
+    
+    def get_exam_records(self) -> List[ExamRecordDoc]:
+        """Kullanıcının deneme kayıtları (istek başına bir kez okunur)"""
+        return self._load_collection('exam_records')
+    
+    def get_tasks(self) -> List[TaskDoc]:
+        """Kullanıcının görevleri (istek başına bir kez okunur)"""
+        return self._load_collection('tasks')
+    
+    def get_study_sessions(self) -> List[SessionDoc]:
+        """Kullanıcının son 30 gündeki çalışma oturumları (istek başına bir kez okunur)"""
+        return self._load_collection('study_sessions')
+    
+    def has_study_sessions(self) -> bool:
+        """Pencere dışında da olsa kullanıcının hiç çalışma oturumu var mı"""
+        if self.get_study_sessions():
+            return True
+        return self.data_source.has_user_documents(self.user, 'study_sessions')
+    
+    def get_read_stats(self) -> Dict[str, int]:
+        """Bu analyzer örneğinin yaptığı Firestore okumaları"""
+        return self.data_source.get_read_stats()
     
     def get_comprehensive_analysis(self) -> Dict[str, Any]:
         """Kapsamlı analiz raporu"""
+        # Gerekli tüm koleksiyonları paralel olarak tek seferde oku
+        if self.snapshot is None:
+            self.prefetch(['exam_records', 'tasks', 'study_sessions'])
+        
         return {
             'exam_analysis': self.analyze_exam_performance(),
             'task_analysis': self.analyze_task_completion(),
@@ -40,47 +196,31 @@ class ComprehensiveAnalyzer:
             'progress_summary': self.get_progress_summary()
         }
     
+    @cached_analysis
     def analyze_exam_performance(self) -> Dict[str, Any]:
         """Deneme performans analizi - Firebase'den veri çeker"""
         # Firebase'den deneme kayıtlarını al
-        firebase_exam_records = self.firebase_service.get_user_exam_records(self.user.firebase_uid)
+        firebase_exam_records = self.get_exam_records()
         
         if not firebase_exam_records:
             # Default değerler döndür
-            return {
-                'total_exams': 0,
-                'average_net': 0.0,
-                'best_exam': {
-                    'exam_name': 'Henüz deneme yok',
-                    'total_net': 0.0,
-                    'exam_date': None
-                },
-                'worst_exam': {
-                    'exam_name': 'Henüz deneme yok',
-                    'total_net': 0.0,
-                    'exam_date': None
-                },
-                'best_subject': None,
-                'worst_subject': None,
-                'recent_performance': [],
-                'subject_performance': {}
-            }
+            return empty_exam_analysis()
         
         # Genel istatistikler
         total_exams = len(firebase_exam_records)
-        total_net = sum(record.get('total_net', 0) for record in firebase_exam_records)
+        total_net = sum(record.total_net for record in firebase_exam_records)
         average_net = total_net / total_exams if total_exams > 0 else 0
         
         # En iyi ve en kötü denemeleri bul
-        sorted_exams = sorted(firebase_exam_records, key=lambda x: x.get('total_net', 0), reverse=True)
+        sorted_exams = sorted(firebase_exam_records, key=lambda x: x.total_net, reverse=True)
         best_exam = sorted_exams[0] if sorted_exams else None
         worst_exam = sorted_exams[-1] if sorted_exams else None
         
         # Ders bazlı analiz
         subject_performance = {}
         for record in firebase_exam_records:
-            subject_name = record.get('subject_name', 'Bilinmeyen Ders')
-            net_score = record.get('total_net', 0)
+            subject_name = record.subject_name
+            net_score = record.total_net
             
             if subject_name not in subject_performance:
                 subject_performance[subject_name] = {
@@ -100,41 +240,29 @@ class ComprehensiveAnalyzer:
                 subject_performance[subject_name]['worst_net'] = net_score
         
         # En iyi/kötü dersleri bul
-        best_subject = None
-        worst_subject = None
-        best_avg = 0
-        worst_avg = float('inf')
-        
-        for subject, stats in subject_performance.items():
-            avg_net = stats['total_net'] / stats['total_exams']
-            if avg_net > best_avg:
-                best_avg = avg_net
-                best_subject = subject
-            if avg_net < worst_avg:
-                worst_avg = avg_net
-                worst_subject = subject
+        best_subject, worst_subject = find_best_and_worst_subject(subject_performance)
         
         # Son 5 deneme trendi
         recent_exams = []
         for exam in sorted_exams[:5]:
             recent_exams.append({
-                'exam_name': exam.get('exam_name', 'Bilinmeyen Deneme'),
-                'total_net': float(exam.get('total_net', 0)),
-                'exam_date': exam.get('exam_date', 'Bilinmeyen Tarih')
+                'exam_name': exam.exam_name,
+                'total_net': float(exam.total_net),
+                'exam_date': exam.exam_date
             })
         
         return {
             'total_exams': total_exams,
             'average_net': round(average_net, 2),
             'best_exam': {
-                'exam_name': best_exam.get('exam_name', 'Bilinmeyen Deneme') if best_exam else 'Bilinmeyen Deneme',
-                'total_net': float(best_exam.get('total_net', 0)) if best_exam else 0.0,
-                'exam_date': best_exam.get('exam_date', 'Bilinmeyen Tarih') if best_exam else None
+                'exam_name': best_exam.exam_name if best_exam else 'Bilinmeyen Deneme',
+                'total_net': float(best_exam.total_net) if best_exam else 0.0,
+                'exam_date': best_exam.exam_date if best_exam else None
             },
             'worst_exam': {
-                'exam_name': worst_exam.get('exam_name', 'Bilinmeyen Deneme') if worst_exam else 'Bilinmeyen Deneme',
-                'total_net': float(worst_exam.get('total_net', 0)) if worst_exam else 0.0,
-                'exam_date': worst_exam.get('exam_date', 'Bilinmeyen Tarih') if worst_exam else None
+                'exam_name': worst_exam.exam_name if worst_exam else 'Bilinmeyen Deneme',
+                'total_net': float(worst_exam.total_net) if worst_exam else 0.0,
+                'exam_date': worst_exam.exam_date if worst_exam else None
             },
             'best_subject': best_subject,
             'worst_subject': worst_subject,
@@ -142,10 +270,11 @@ class ComprehensiveAnalyzer:
             'subject_performance': subject_performance
         }
     
+    @cached_analysis
     def analyze_task_completion(self) -> Dict[str, Any]:
         """Görev tamamlama analizi - Firebase'den veri çeker"""
         # Firebase'den görevleri al
-        firebase_tasks = self.firebase_service.get_user_tasks(self.user.firebase_uid)
+        firebase_tasks = self.get_tasks()
         
         if not firebase_tasks:
             # Default değerler döndür
@@ -158,26 +287,25 @@ class ComprehensiveAnalyzer:
             }
         
         total_tasks = len(firebase_tasks)
-        completed_tasks = len([task for task in firebase_tasks if task.get('is_completed', False)])
+        completed_tasks = len([task for task in firebase_tasks if task.is_completed])
         completion_rate = (completed_tasks / total_tasks) * 100 if total_tasks > 0 else 0
         
         # Görev türü bazlı analiz
         task_types = {}
         for task in firebase_tasks:
-            task_type = task.get('task_type', 'unknown')
+            task_type = task.task_type
             if task_type not in task_types:
                 task_types[task_type] = {'total': 0, 'completed': 0}
             
             task_types[task_type]['total'] += 1
-            if task.get('is_completed', False):
+            if task.is_completed:
                 task_types[task_type]['completed'] += 1
         
         # Son 7 günlük görev tamamlama
-        last_week = timezone.now() - timedelta(days=7)
+        last_week = (timezone.now() - timedelta(days=7)).replace(tzinfo=None)
         weekly_tasks = [task for task in firebase_tasks 
-                       if task.get('created_at') and 
-                       datetime.fromisoformat(task['created_at'].replace('Z', '+00:00')).replace(tzinfo=None) >= last_week.replace(tzinfo=None)]
-        weekly_completed = len([task for task in weekly_tasks if task.get('is_completed', False)])
+                       if task.created_at and task.created_at >= last_week]
+        weekly_completed = len([task for task in weekly_tasks if task.is_completed])
         weekly_total = len(weekly_tasks)
         weekly_rate = (weekly_completed / weekly_total) * 100 if weekly_total > 0 else 0
         
@@ -189,13 +317,14 @@ class ComprehensiveAnalyzer:
             'task_types': task_types
         }
     
+    @cached_analysis
     def analyze_study_patterns(self) -> Dict[str, Any]:
         """Çalışma pattern analizi - Firebase'den veri çeker"""
         # Firebase'den çalışma oturumlarını al
-        firebase_sessions = self.firebase_service.get_user_study_sessions(self.user.firebase_uid)
+        firebase_sessions = self.get_study_sessions()
         
         # Eğer hiç oturum yoksa default değerler döndür
-        if not firebase_sessions:
+        if not self.has_study_sessions():
             return {
                 'total_study_hours': 0.0,
                 'daily_average': 0.0,
@@ -206,28 +335,26 @@ class ComprehensiveAnalyzer:
             }
         
         # Son 30 günlük çalışma analizi
-        last_month = timezone.now() - timedelta(days=30)
+        last_month = (timezone.now() - timedelta(days=30)).replace(tzinfo=None)
         recent_sessions = [session for session in firebase_sessions 
-                          if session.get('start_time') and 
-                          datetime.fromisoformat(session['start_time'].replace('Z', '+00:00')).replace(tzinfo=None) >= last_month.replace(tzinfo=None)]
+                          if session.start_time and session.start_time >= last_month]
         
-        total_study_minutes = sum(session.get('duration_minutes', 0) for session in recent_sessions)
+        total_study_minutes = sum(session.duration_minutes for session in recent_sessions)
         total_study_hours = total_study_minutes / 60
         
         # Günlük ortalama çalışma
         daily_average = total_study_hours / 30 if total_study_hours > 0 else 0
         
         # En çok çalışılan günler
-        study_days = len(set(session.get('start_time', '')[:10] for session in recent_sessions if session.get('start_time')))
+        study_days = len(set(session.start_time.date() for session in recent_sessions))
         study_streak = self.calculate_study_streak()
         
         # Hedef vs gerçekleşen (görevlerden)
-        firebase_tasks = self.firebase_service.get_user_tasks(self.user.firebase_uid)
+        firebase_tasks = self.get_tasks()
         recent_tasks = [task for task in firebase_tasks 
-                       if task.get('created_at') and 
-                       datetime.fromisoformat(task['created_at'].replace('Z', '+00:00')).replace(tzinfo=None) >= last_month.replace(tzinfo=None)]
+                       if task.created_at and task.created_at >= last_month]
         
-        target_minutes = sum(task.get('estimated_duration', 0) for task in recent_tasks)
+        target_minutes = sum(task.estimated_duration for task in recent_tasks)
         target_hours = target_minutes / 60
         achievement_rate = (total_study_hours / target_hours) * 100 if target_hours > 0 else 0
         
@@ -240,10 +367,11 @@ class ComprehensiveAnalyzer:
             'target_hours': round(target_hours, 1)
         }
     
+    @cached_analysis
     def analyze_topic_performance(self) -> Dict[str, Any]:
         """Konu bazlı performans analizi - Firebase'den veri çeker"""
         # Firebase'den deneme kayıtlarını al
-        firebase_exam_records = self.firebase_service.get_user_exam_records(self.user.firebase_uid)
+        firebase_exam_records = self.get_exam_records()
         
         # Eğer hiç deneme kaydı yoksa default değerler döndür
         if not firebase_exam_records:
@@ -257,11 +385,10 @@ class ComprehensiveAnalyzer:
         topic_stats = {}
         
         for record in firebase_exam_records:
-            topics = record.get('topics', [])
-            for topic_name in topics:
+            for topic_name in record.topics:
                 if topic_name not in topic_stats:
                     topic_stats[topic_name] = {
-                        'subject': record.get('subject_name', 'Bilinmeyen Ders'),
+                        'subject': record.subject_name,
                         'total_questions': 0,
                         'correct_answers': 0,
                         'appearances': 0
@@ -270,8 +397,8 @@ class ComprehensiveAnalyzer:
                 topic_stats[topic_name]['appearances'] += 1
                 
                 # Deneme kayıtlarından konu bazlı istatistikler
-                total_questions = record.get('total_questions', 0)
-                total_correct = record.get('total_correct', 0)
+                total_questions = record.total_questions
+                total_correct = record.total_correct
                 
                 # Konuya göre soru sayısını tahmin et (toplam soruların %20'si)
                 topic_questions = int(total_questions * 0.2)
@@ -281,61 +408,34 @@ class ComprehensiveAnalyzer:
                 topic_stats[topic_name]['correct_answers'] += topic_correct
         
         # Zayıf ve güçlü konuları belirle
-        weak_topics = []
-        strong_topics = []
-        
-        for topic, stats in topic_stats.items():
-            if stats['appearances'] >= 2:  # En az 2 denemede görülmüş
-                success_rate = (stats['correct_answers'] / stats['total_questions']) * 100 if stats['total_questions'] > 0 else 0
-                
-                if success_rate < 60:
-                    weak_topics.append({
-                        'name': topic,
-                        'subject': stats['subject'],
-                        'success_rate': round(success_rate, 1)
-                    })
-                elif success_rate > 80:
-                    strong_topics.append({
-                        'name': topic,
-                        'subject': stats['subject'],
-                        'success_rate': round(success_rate, 1)
-                    })
-        
-        return {
-            'weak_topics': sorted(weak_topics, key=lambda x: x['success_rate'])[:5],
-            'strong_topics': sorted(strong_topics, key=lambda x: x['success_rate'], reverse=True)[:5],
-            'topic_stats': topic_stats
-        }
+        return summarize_topic_stats(topic_stats)
     
+    @cached_analysis
     def calculate_study_streak(self) -> int:
         """Çalışma streak'ini hesapla - Firebase'den veri çeker"""
-        firebase_tasks = self.firebase_service.get_user_tasks(self.user.firebase_uid)
+        firebase_tasks = self.get_tasks()
         
         # Tamamlanmış görevleri al
-        completed_tasks = [task for task in firebase_tasks if task.get('is_completed', False)]
+        completed_tasks = [task for task in firebase_tasks if task.is_completed and task.completed_at]
         
         if not completed_tasks:
             return 0
         
         # Tarihe göre sırala
-        completed_tasks.sort(key=lambda x: x.get('completed_at', ''), reverse=True)
+        completed_tasks.sort(key=lambda x: x.completed_at, reverse=True)
         
         streak = 0
         current_date = timezone.now().date()
         
         for task in completed_tasks:
-            if task.get('completed_at'):
-                try:
-                    task_date = datetime.fromisoformat(task['completed_at'].replace('Z', '+00:00')).replace(tzinfo=None).date()
-                    if task_date == current_date - timedelta(days=streak):
-                        streak += 1
-                    else:
-                        break
-                except:
-                    continue
+            if task.completed_at.date() == current_date - timedelta(days=streak):
+                streak += 1
+            else:
+                break
         
         return streak
     
+    @cached_analysis
     def generate_recommendations(self) -> List[Dict[str, Any]]:
         """Kişiselleştirilmiş öneriler"""
         recommendations = []
@@ -372,6 +472,7 @@ class ComprehensiveAnalyzer:
         
         return recommendations
     
+    @cached_analysis
     def get_progress_summary(self) -> Dict[str, Any]:
         """İlerleme özeti"""
         exam_analysis = self.analyze_exam_performance()
@@ -390,6 +491,7 @@ class ComprehensiveAnalyzer:
             }
         }
     
+    @cached_analysis
     def calculate_overall_score(self) -> float:
         """Genel performans skoru hesapla"""
         exam_analysis = self.analyze_exam_performance()
@@ -452,87 +554,89 @@ class ComprehensiveAnalyzer:
             }
 
     def get_subject_topic_analysis(self, subject_code: str) -> Dict[str, Any]:
-        """Belirli bir dersin konu bazlı analizi - Firebase'den konuları çek"""
+        """
+        Belirli bir dersin konu bazlı analizi - Firebase'den konuları çek.
+        Konu sayısından bağımsız olarak sabit sayıda sorgu yapar: konular, soru ve test
+        kayıtları birer kez okunur, deneme-konu bağlantıları tek ORM sorgusuyla alınır.
+        """
         try:
-            import firebase_admin
-            from firebase_admin import firestore
+            # Dersin konuları
+            topics = self.data_source.get_topics(subject_code, fields=['name'])
+            topic_ids = {topic['id'] for topic in topics}
+            
+            # Konu bazlı sayaçlar
+            topic_totals = {
+                topic_id: {'total': 0, 'correct': 0, 'wrong': 0, 'empty': 0}
+                for topic_id in topic_ids
+            }
+            
+            # Deneme kayıtlarından veri topla (ExamRecord konuları Django Topic kayıtlarıdır,
+            # id'si sayısal olan Firestore konuları ile eşleşir)
+            linked_topic_ids = [int(topic_id) for topic_id in topic_ids if str(topic_id).isdigit()]
+            if linked_topic_ids:
+                exam_topic_links = ExamRecord.exam_topics.through.objects.filter(
+                    examrecord__user=self.user,
+                    topic_id__in=linked_topic_ids
+                ).values_list(
+                    'topic_id',
+                    'examrecord__total_questions',
+                    'examrecord__total_correct',
+                    'examrecord__total_wrong'
+                )
+                
+                for topic_id, record_questions, record_correct, record_wrong in exam_topic_links:
+                    if not record_questions:
+                        continue
+                    totals = topic_totals[str(topic_id)]
+                    totals['total'] += record_questions
+                    totals['correct'] += record_correct or 0
+                    totals['wrong'] += record_wrong or 0
+                    totals['empty'] += (record_questions - (record_correct or 0) - (record_wrong or 0))
             
-            # Firebase'den konuları çek
-            db = firestore.client()
+            # Soru çözme ve test kayıtları (Firebase'den, tek seferde)
+            self.prefetch(['questions', 'tests'])
             
-            # Subject code'a göre konuları al
-            topics_ref = db.collection('topics')
-            topics_query = topics_ref.where('subject_code', '==', subject_code)
-            topics_docs = topics_query.stream()
+            for question_data in self._load_collection('questions'):
+                totals = topic_totals.get(question_data.get('topic_id'))
+                if totals is None:
+                    continue
+                totals['total'] += 1
+                if question_data.get('is_correct'):
+                    totals['correct'] += 1
+                elif question_data.get('is_answered'):
+                    totals['wrong'] += 1
+                else:
+                    totals['empty'] += 1
+            
+            for test_data in self._load_collection('tests'):
+                totals = topic_totals.get(test_data.get('topic_id'))
+                if totals is None:
+                    continue
+                totals['total'] += test_data.get('total_questions', 0)
+                totals['correct'] += test_data.get('correct_answers', 0)
+                totals['wrong'] += test_data.get('wrong_answers', 0)
+                totals['empty'] += test_data.get('empty_answers', 0)
             
             topic_analysis = []
             
-            for topic_doc in topics_docs:
-                topic_data = topic_doc.to_dict()
-                
-                # Bu konuyla ilgili kullanıcının verilerini al
-                # Deneme kayıtları
-                exam_records = ExamRecord.objects.filter(
-                    user=self.user,
-                    exam_topics__contains=[topic_doc.id]
-                )
-                
-                # Soru çözme kayıtları (Firebase'den)
-                questions_ref = db.collection('user_questions')
-                user_questions_query = questions_ref.where('user_uid', '==', self.user.firebase_uid).where('topic_id', '==', topic_doc.id)
-                user_questions_docs = user_questions_query.stream()
-                
-                # Test kayıtları (Firebase'den)
-                tests_ref = db.collection('user_tests')
-                user_tests_query = tests_ref.where('user_uid', '==', self.user.firebase_uid).where('topic_id', '==', topic_doc.id)
-                user_tests_docs = user_tests_query.stream()
-                
-                total_questions = 0
-                correct_answers = 0
-                wrong_answers = 0
-                empty_answers = 0
-                
-                # Deneme kayıtlarından veri topla
-                for record in exam_records:
-                    if record.total_questions:
-                        total_questions += record.total_questions
-                        correct_answers += record.total_correct or 0
-                        wrong_answers += record.total_wrong or 0
-                        empty_answers += (record.total_questions - (record.total_correct or 0) - (record.total_wrong or 0))
-                
-                # Soru çözme kayıtlarından veri topla
-                for question_doc in user_questions_docs:
-                    question_data = question_doc.to_dict()
-                    total_questions += 1
-                    if question_data.get('is_correct'):
-                        correct_answers += 1
-                    elif question_data.get('is_answered'):
-                        wrong_answers += 1
-                    else:
-                        empty_answers += 1
-                
-                # Test kayıtlarından veri topla
-                for test_doc in user_tests_docs:
-                    test_data = test_doc.to_dict()
-                    total_questions += test_data.get('total_questions', 0)
-                    correct_answers += test_data.get('correct_answers', 0)
-                    wrong_answers += test_data.get('wrong_answers', 0)
-                    empty_answers += test_data.get('empty_answers', 0)
+            for topic_data in topics:
+                totals = topic_totals[topic_data['id']]
+                total_questions = totals['total']
                 
                 # Eğer hiç veri yoksa, konuyu atla
                 if total_questions == 0:
                     continue
                 
                 # Doğruluk oranını hesapla
-                accuracy = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
+                accuracy = (totals['correct'] / total_questions) * 100 if total_questions > 0 else 0
                 
                 topic_analysis.append({
-                    'id': topic_doc.id,
+                    'id': topic_data['id'],
                     'name': topic_data.get('name', 'Bilinmeyen Konu'),
                     'totalQuestions': int(total_questions),
-                    'correctAnswers': int(correct_answers),
-                    'wrongAnswers': int(wrong_answers),
-                    'emptyAnswers': int(empty_answers),
+                    'correctAnswers': int(totals['correct']),
+                    'wrongAnswers': int(totals['wrong']),
+                    'emptyAnswers': int(totals['empty']),
                     'accuracy': round(accuracy, 1)
                 })
             
@@ -0,0 +1,283 @@
+"""
+YÖN App - Analiz Veri Kaynakları
+ComprehensiveAnalyzer'ın okuduğu kullanıcı verileri için ortak arayüz ve uygulamaları:
+Firestore (varsayılan), Django ORM ve ağ gerektirmeyen bellek içi kaynak.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from exams.models import ExamRecord, Subject, Topic
+from tasks.models import DailyTask
+from tasks.serializers import DailyTaskSerializer
+from coaching.models import StudySession, UserQuestionAnswer
+from fiverbase.firebase_service import (
+    FirebaseDataService, UserDataBundle, RECORD_TYPES, DATE_RANGE_FIELDS, range_bound
+)
+from fiverbase.records import ExamRecordDoc, TaskDoc, SessionDoc
+
+
+class AnalyticsDataSource(ABC):
+    """
+    Analiz veri kaynağı arayüzü.
+    Koleksiyon adları ve dönen kayıt tipleri FirebaseDataService.get_user_bundle ile aynıdır.
+    """
+
+    def __init__(self):
+        self.query_count = 0
+        self.document_reads = 0
+
+    @abstractmethod
+    def get_user_bundle(self, user, collections: Iterable[str],
+                        date_ranges: Optional[Dict[str, Tuple]] = None,
+                        fields: Optional[Dict[str, Iterable[str]]] = None) -> UserDataBundle:
+        """Kullanıcının istenen koleksiyonlarını getir"""
+
+    @abstractmethod
+    def has_user_documents(self, user, name: str) -> bool:
+        """Kullanıcının koleksiyonda en az bir kaydı var mı"""
+
+    @abstractmethod
+    def get_topics(self, subject_code: str, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Dersin konularını getir ('id' ve 'name' alanlarıyla)"""
+
+    def get_read_stats(self) -> Dict[str, int]:
+        """Bu kaynak üzerinden yapılan okumalar"""
+        return {
+            'queries': self.query_count,
+            'documents': self.document_reads
+        }
+
+    def _count_read(self, documents: List[Any]) -> List[Any]:
+        self.query_count += 1
+        self.document_reads += len(documents)
+        return documents
+
+
+class FirestoreDataSource(AnalyticsDataSource):
+    """Firestore kaynağı (FirebaseDataService üzerinden)"""
+
+    def __init__(self, service: Optional[FirebaseDataService] = None):
+        super().__init__()
+        self.service = service or FirebaseDataService()
+
+    def get_user_bundle(self, user, collections, date_ranges=None, fields=None) -> UserDataBundle:
+        return self.service.get_user_bundle(user.firebase_uid, collections, date_ranges, fields)
+
+    def has_user_documents(self, user, name: str) -> bool:
+        return self.service.has_user_documents(name, user.firebase_uid)
+
+    def get_topics(self, subject_code: str, fields=None) -> List[Dict[str, Any]]:
+        return self.service.get_topics(subject_code, fields=fields)
+
+    def get_read_stats(self) -> Dict[str, int]:
+        return self.service.get_read_stats()
+
+
+def _aware(value):
+    """Tarih sınırını ORM filtresi için timezone bilgili datetime'a çevir"""
+    if not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class DjangoDataSource(AnalyticsDataSource):
+    """
+    Django ORM kaynağı: ExamRecord, DailyTask, StudySession ve UserQuestionAnswer tablolarından okur.
+    Firestore'daki user_tests koleksiyonunun ORM karşılığı olmadığı için tests her zaman boştur.
+    """
+
+    def _exam_records(self, user, date_range=None) -> List[ExamRecordDoc]:
+        records = ExamRecord.objects.filter(user=user).select_related('exam_subject').prefetch_related('exam_topics')
+        return [
+            ExamRecordDoc(
+                id=str(record.id),
+                exam_name=record.exam_name,
+                exam_date=record.exam_date.isoformat(),
+                subject_name=record.exam_subject.name if record.exam_subject else 'Bilinmeyen Ders',
+                total_net=float(record.total_net or 0),
+                total_questions=record.total_questions or 0,
+                total_correct=record.total_correct or 0,
+                topics=[topic.name for topic in record.exam_topics.all()]
+            )
+            for record in records
+        ]
+
+    def _task_queryset(self, user, date_range=None):
+        tasks = DailyTask.objects.filter(user_uid=user.firebase_uid)
+        start, end = date_range or (None, None)
+        if start:
+            tasks = tasks.filter(created_at__gte=_aware(start))
+        if end:
+            tasks = tasks.filter(created_at__lt=_aware(end))
+        return tasks
+
+    def _tasks(self, user, date_range=None) -> List[TaskDoc]:
+        return [
+            TaskDoc(
+                id=str(task.id),
+                task_type=task.task_type,
+                is_completed=task.is_completed,
+                estimated_duration=task.estimated_duration or 0,
+                created_at=task.created_at.replace(tzinfo=None) if task.created_at else None,
+                completed_at=task.completed_at.replace(tzinfo=None) if task.completed_at else None
+            )
+            for task in self._task_queryset(user, date_range)
+        ]
+
+    def _daily_tasks(self, user, date_range=None) -> List[Dict[str, Any]]:
+        tasks = self._task_queryset(user, date_range).order_by('-created_at')
+        return [dict(data) for data in DailyTaskSerializer(tasks, many=True).data]
+
+    def _study_sessions(self, user, date_range=None) -> List[SessionDoc]:
+        sessions = StudySession.objects.filter(user=user)
+        start, end = date_range or (None, None)
+        if start:
+            sessions = sessions.filter(start_time__gte=_aware(start))
+        if end:
+            sessions = sessions.filter(start_time__lt=_aware(end))
+        return [
+            SessionDoc(
+                id=str(session.id),
+                start_time=session.start_time.replace(tzinfo=None),
+                duration_minutes=session.duration_minutes
+            )
+            for session in sessions
+        ]
+
+    def _questions(self, user, date_range=None) -> List[Dict[str, Any]]:
+        # Konusu olmayan cevaplar konu analizine girmez
+        answers = UserQuestionAnswer.objects.filter(
+            exam_attempt__user=user, question__topic_id__isnull=False
+        ).values_list(
+            'id', 'question__topic_id', 'is_correct', 'user_answer'
+        )
+        return [
+            {
+                'id': str(answer_id),
+                'topic_id': str(topic_id),
+                'is_correct': is_correct,
+                'is_answered': bool(user_answer)
+            }
+            for answer_id, topic_id, is_correct, user_answer in answers
+        ]
+
+    def _tests(self, user, date_range=None) -> List[Dict[str, Any]]:
+        return []
+
+    def get_user_bundle(self, user, collections, date_ranges=None, fields=None) -> UserDataBundle:
+        date_ranges = date_ranges or {}
+        bundle = UserDataBundle()
+        for name in collections:
+            try:
+                documents = getattr(self, f'_{name}')(user, date_ranges.get(name))
+                setattr(bundle, name, self._count_read(documents))
+            except Exception as e:
+                print(f"Veritabanından {name} alınırken hata: {e}")
+                bundle.errors[name] = str(e)
+        return bundle
+
+    def has_user_documents(self, user, name: str) -> bool:
+        return bool(getattr(self.get_user_bundle(user, [name]), name))
+
+    def get_topics(self, subject_code: str, fields=None) -> List[Dict[str, Any]]:
+        """Ders kodu, ders adının küçük harfli ve alt çizgili haliyle eşleştirilir ('TYT Matematik' -> 'tyt_matematik')"""
+        subject_ids = [
+            subject.id for subject in Subject.objects.filter(is_active=True)
+            if subject.name.lower().replace(' ', '_') == subject_code
+        ]
+        topics = Topic.objects.filter(subject_id__in=subject_ids, is_active=True).values_list('id', 'name')
+        return self._count_read([{'id': str(topic_id), 'name': name} for topic_id, name in topics])
+
+
+class InMemoryDataSource(AnalyticsDataSource):
+    """
+    Bellek içi kaynak: Firestore dokümanlarının dict hallerini tutar.
+    Sorgu davranışı (kullanıcı filtresi, tarih aralığı, alan seçimi) Firestore ile aynıdır;
+    benchmark ve testlerde ağ olmadan gerçek analiz kodunu çalıştırmak için kullanılır.
+    Sadece test/benchmark içindir: dokümanlarla oluşturulup analyzer'a doğrudan verilir,
+    ANALYTICS_DATA_SOURCE ile seçilemez.
+
+    Args:
+        collections: {paket alanı: [doküman dict'leri]} - dokümanlar 'id' ve 'user_uid' içerir,
+            daily_tasks dokümanlarında da kullanıcı 'user_uid' ile belirtilir
+        topics: Konu dokümanları ('id', 'name', 'subject_code')
+    """
+
+    def __init__(self, collections: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 topics: Optional[List[Dict[str, Any]]] = None):
+        super().__init__()
+        self.collections = collections or {}
+        self.topics = topics or []
+
+    def add(self, name: str, document: Dict[str, Any]) -> None:
+        """Koleksiyona doküman ekle"""
+        self.collections.setdefault(name, []).append(document)
+
+    def _query(self, user, name: str, date_range=None, fields=None) -> List[Any]:
+        documents = [doc for doc in self.collections.get(name, []) if doc.get('user_uid') == user.firebase_uid]
+
+        if date_range:
+            start, end = date_range
+            field_name = DATE_RANGE_FIELDS[name]
+            if start:
+                documents = [doc for doc in documents if isinstance(doc.get(field_name), str) and doc[field_name] >= range_bound(start)]
+            if end:
+                documents = [doc for doc in documents if isinstance(doc.get(field_name), str) and doc[field_name] < range_bound(end)]
+
+        if name == 'daily_tasks':
+            documents = sorted(documents, key=lambda doc: doc.get('created_at') or '', reverse=True)
+
+        results = []
+        record_type = RECORD_TYPES.get(name)
+        for doc in documents:
+            data = {key: value for key, value in doc.items() if key != 'id'}
+            if fields is not None:
+                data = {key: value for key, value in data.items() if key in fields}
+            results.append(record_type.from_document(doc['id'], data) if record_type else {'id': doc['id'], **data})
+        return self._count_read(results)
+
+    def get_user_bundle(self, user, collections, date_ranges=None, fields=None) -> UserDataBundle:
+        date_ranges = date_ranges or {}
+        fields = fields or {}
+        bundle = UserDataBundle()
+        for name in collections:
+            setattr(bundle, name, self._query(user, name, date_ranges.get(name), fields.get(name)))
+        return bundle
+
+    def has_user_documents(self, user, name: str) -> bool:
+        return bool(self._query(user, name, fields=[]))
+
+    def get_topics(self, subject_code: str, fields=None) -> List[Dict[str, Any]]:
+        topics = [topic for topic in self.topics if topic.get('subject_code') == subject_code]
+        results = []
+        for topic in topics:
+            data = {key: value for key, value in topic.items() if key != 'id'}
+            if fields is not None:
+                data = {key: value for key, value in data.items() if key in fields}
+            results.append({'id': topic['id'], **data})
+        return self._count_read(results)
+
+
+# settings.ANALYTICS_DATA_SOURCE değerleri (InMemoryDataSource boş başladığı için seçilemez)
+DATA_SOURCES = {
+    'firestore': FirestoreDataSource,
+    'django': DjangoDataSource,
+}
+
+
+def get_data_source(name: Optional[str] = None) -> AnalyticsDataSource:
+    """Ayarlarda seçili (varsayılan: Firestore) analiz veri kaynağını oluştur"""
+    name = name or getattr(settings, 'ANALYTICS_DATA_SOURCE', 'firestore')
+    if name not in DATA_SOURCES:
+        raise ImproperlyConfigured(
+            f"ANALYTICS_DATA_SOURCE '{name}' geçersiz; seçenekler: {', '.join(DATA_SOURCES)}"
+        )
+    return DATA_SOURCES[name]()
@@ -0,0 +1 @@
+# Management package 
\ No newline at end of file
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from analytics.snapshot import rebuild_snapshot
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = 'Kullanıcıların analiz özetlerini tüm geçmişten yeniden oluşturur'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Sadece bu kullanıcının özetini yeniden oluştur'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all().order_by('id')
+        if options['user_id']:
+            users = users.filter(id=options['user_id'])
+
+        rebuilt = 0
+        for user in users.iterator():
+            try:
+                rebuild_snapshot(user)
+                rebuilt += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'{user} özeti oluşturulamadı: {e}'))
+
+        self.stdout.write(self.style.SUCCESS(f'{rebuilt} analiz özeti yeniden oluşturuldu.'))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exam_count', models.IntegerField(default=0)),
+                ('exam_net_total', models.FloatField(default=0.0)),
+                ('best_exam', models.JSONField(blank=True, null=True)),
+                ('worst_exam', models.JSONField(blank=True, null=True)),
+                ('top_exams', models.JSONField(default=list)),
+                ('subject_stats', models.JSONField(default=dict)),
+                ('topic_stats', models.JSONField(default=dict)),
+                ('task_count', models.IntegerField(default=0)),
+                ('completed_task_count', models.IntegerField(default=0)),
+                ('task_types', models.JSONField(default=dict)),
+                ('task_days', models.JSONField(default=dict)),
+                ('completion_days', models.JSONField(default=dict)),
+                ('session_count', models.IntegerField(default=0)),
+                ('study_days', models.JSONField(default=dict)),
+                ('attempt_count', models.IntegerField(default=0)),
+                ('attempt_score_total', models.FloatField(default=0.0)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Analiz Özeti',
+                'verbose_name_plural': 'Analiz Özetleri',
+                'db_table': 'analytics_snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class AnalyticsSnapshot(models.Model):
+    """
+    Kullanıcı başına kalıcı analiz özeti.
+    ExamRecord, DailyTask, StudySession ve UserExamAttempt yazıldıkça artımlı güncellenir,
+    böylece analiz endpoint'leri tüm geçmişi taramadan cevap verebilir.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='analytics_snapshot')
+    
+    # Deneme istatistikleri
+    exam_count = models.IntegerField(default=0)
+    exam_net_total = models.FloatField(default=0.0)
+    best_exam = models.JSONField(null=True, blank=True)
+    worst_exam = models.JSONField(null=True, blank=True)
+    top_exams = models.JSONField(default=list)  # Nete göre ilk 5 deneme
+    subject_stats = models.JSONField(default=dict)  # {ders: {total_exams, total_net, best_net, worst_net}}
+    topic_stats = models.JSONField(default=dict)  # {konu: {subject, total_questions, correct_answers, appearances}}
+    
+    # Görev istatistikleri
+    task_count = models.IntegerField(default=0)
+    completed_task_count = models.IntegerField(default=0)
+    task_types = models.JSONField(default=dict)  # {tür: {total, completed}}
+    task_days = models.JSONField(default=dict)  # {tarih: {total, completed, target_minutes}} - son 30 gün
+    completion_days = models.JSONField(default=dict)  # {tarih: {count}} - streak için
+    
+    # Çalışma oturumları
+    session_count = models.IntegerField(default=0)
+    study_days = models.JSONField(default=dict)  # {tarih: {minutes, sessions}} - son 30 gün
+    
+    # Sınav denemeleri
+    attempt_count = models.IntegerField(default=0)
+    attempt_score_total = models.FloatField(default=0.0)
+    
+    rebuilt_at = models.DateTimeField(null=True, blank=True)  # Son sıfırdan oluşturma zamanı
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user} - Analiz Özeti"
+    
+    class Meta:
+        db_table = 'analytics_snapshots'
+        verbose_name = 'Analiz Özeti'
+        verbose_name_plural = 'Analiz Özetleri'
@@ -0,0 +1,199 @@
+"""
+YÖN App - Analiz Özeti Sinyalleri
+Kayıt yazıldıkça AnalyticsSnapshot'ı artımlı günceller.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from exams.models import ExamRecord, Topic
+from tasks.models import DailyTask
+from coaching.models import StudySession, UserExamAttempt
+from .snapshot import (
+    add_exam, add_exam_topics, remove_exam_topics, replace_exam, update_snapshot,
+    apply_task, apply_session, apply_attempt,
+    exam_values, task_values, session_values, attempt_values
+)
+
+User = get_user_model()
+
+
+def _remember_previous(sender, instance, extractor):
+    """Güncellemeden önceki değerleri sakla (delta için)"""
+    instance._snapshot_previous = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).first()
+        if previous is not None:
+            instance._snapshot_previous = extractor(previous)
+
+
+def _replace(apply, previous, current):
+    """Eski katkıyı geri alıp yenisini ekleyen güncelleme adımı"""
+    def step(snapshot):
+        if previous is not None:
+            apply(snapshot, previous, -1)
+        apply(snapshot, current, 1)
+    return step
+
+
+def _task_user_id(user_uid):
+    """DailyTask kayıtları firebase_uid ile tutulur"""
+    if not user_uid:
+        return None
+    return User.objects.filter(firebase_uid=user_uid).values_list('id', flat=True).first()
+
+
+# Deneme kayıtları
+
+def _topic_names(record) -> list:
+    return list(record.exam_topics.values_list('name', flat=True))
+
+
+@receiver(pre_save, sender=ExamRecord)
+def exam_record_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_previous(sender, instance, exam_values)
+
+
+@receiver(post_save, sender=ExamRecord)
+def exam_record_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        update_snapshot(instance.user_id, lambda snapshot: add_exam(snapshot, exam_values(instance)))
+        return
+
+    # Konular kayıt güncellemesiyle değişmez: eski katkı çıkarılıp yenisi eklenir
+    previous = getattr(instance, '_snapshot_previous', None)
+    topic_names = _topic_names(instance)
+    update_snapshot(instance.user_id, lambda snapshot: replace_exam(
+        snapshot, previous, exam_values(instance), topic_names, topic_names
+    ))
+
+
+@receiver(pre_delete, sender=ExamRecord)
+def exam_record_deleting(sender, instance, **kwargs):
+    # Ara tablo satırları silmede m2m_changed göndermeden silinir
+    instance._snapshot_topics = _topic_names(instance)
+
+
+@receiver(post_delete, sender=ExamRecord)
+def exam_record_deleted(sender, instance, **kwargs):
+    values = exam_values(instance)
+    topic_names = getattr(instance, '_snapshot_topics', [])
+    update_snapshot(instance.user_id, lambda snapshot: replace_exam(snapshot, values, None, topic_names, []))
+
+
+def _apply_topic_change(records, topic_names_for, sign):
+    """Kayıt başına konu katkısını ekle (sign=1) veya çıkar (sign=-1), kullanıcı başına tek güncelleme"""
+    by_user = {}
+    for record in records:
+        by_user.setdefault(record.user_id, []).append((exam_values(record), topic_names_for(record)))
+
+    def step(items):
+        def apply(snapshot):
+            for values, topic_names in items:
+                if sign > 0:
+                    add_exam_topics(snapshot, values, topic_names)
+                else:
+                    remove_exam_topics(snapshot, values, topic_names)
+        return apply
+
+    for user_id, items in by_user.items():
+        update_snapshot(user_id, step(items))
+
+
+@receiver(m2m_changed, sender=ExamRecord.exam_topics.through)
+def exam_topics_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # Temizlenecek ilişkiler post_clear'da bilinmez (pk_set None), önceden toplanır
+        if reverse:
+            instance._snapshot_cleared = list(instance.examrecord_set.select_related('exam_subject'))
+        else:
+            instance._snapshot_cleared = _topic_names(instance)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    sign = 1 if action == 'post_add' else -1
+    if reverse:
+        # Konu tarafından değişiklik: instance Topic, pk_set deneme kayıtları
+        if action == 'post_clear':
+            records = getattr(instance, '_snapshot_cleared', [])
+        else:
+            records = ExamRecord.objects.filter(pk__in=pk_set).select_related('exam_subject')
+        _apply_topic_change(records, lambda record: [instance.name], sign)
+    else:
+        if action == 'post_clear':
+            topic_names = getattr(instance, '_snapshot_cleared', [])
+        else:
+            topic_names = list(Topic.objects.filter(pk__in=pk_set).values_list('name', flat=True))
+        _apply_topic_change([instance], lambda record: topic_names, sign)
+
+
+# Günlük görevler
+
+@receiver(pre_save, sender=DailyTask)
+def daily_task_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_previous(sender, instance, task_values)
+
+
+@receiver(post_save, sender=DailyTask)
+def daily_task_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    user_id = _task_user_id(instance.user_uid)
+    if user_id:
+        previous = getattr(instance, '_snapshot_previous', None)
+        update_snapshot(user_id, _replace(apply_task, previous, task_values(instance)))
+
+
+@receiver(post_delete, sender=DailyTask)
+def daily_task_deleted(sender, instance, **kwargs):
+    user_id = _task_user_id(instance.user_uid)
+    if user_id:
+        update_snapshot(user_id, lambda snapshot: apply_task(snapshot, task_values(instance), -1))
+
+
+# Çalışma oturumları
+
+@receiver(pre_save, sender=StudySession)
+def study_session_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_previous(sender, instance, session_values)
+
+
+@receiver(post_save, sender=StudySession)
+def study_session_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_snapshot_previous', None)
+    update_snapshot(instance.user_id, _replace(apply_session, previous, session_values(instance)))
+
+
+@receiver(post_delete, sender=StudySession)
+def study_session_deleted(sender, instance, **kwargs):
+    update_snapshot(instance.user_id, lambda snapshot: apply_session(snapshot, session_values(instance), -1))
+
+
+# Sınav denemeleri
+
+@receiver(pre_save, sender=UserExamAttempt)
+def exam_attempt_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_previous(sender, instance, attempt_values)
+
+
+@receiver(post_save, sender=UserExamAttempt)
+def exam_attempt_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_snapshot_previous', None)
+    update_snapshot(instance.user_id, _replace(apply_attempt, previous, attempt_values(instance)))
+
+
+@receiver(post_delete, sender=UserExamAttempt)
+def exam_attempt_deleted(sender, instance, **kwargs):
+    update_snapshot(instance.user_id, lambda snapshot: apply_attempt(snapshot, attempt_values(instance), -1))
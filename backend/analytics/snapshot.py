@@ -0,0 +1,450 @@
+"""
+YÖN App - Kalıcı Analiz Özeti
+AnalyticsSnapshot kayıtlarını yazma anında artımlı olarak günceller, istenildiğinde
+sıfırdan oluşturur ve ComprehensiveAnalyzer'ın analizlerini özetten üretir.
+"""
+
+import copy
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from exams.models import ExamRecord
+from tasks.models import DailyTask
+from coaching.models import StudySession, UserExamAttempt
+from .models import AnalyticsSnapshot
+from .analysis_service import empty_exam_analysis, find_best_and_worst_subject, summarize_topic_stats
+
+# Görev ve çalışma pencereleri için saklanan gün sayısı (analizler en fazla 30 güne bakar)
+WINDOW_DAYS = 30
+# Streak hesabı için saklanan tamamlanma günleri
+STREAK_HISTORY_DAYS = 400
+
+
+def _day(value) -> Optional[str]:
+    """Tarih/datetime değerini 'YYYY-MM-DD' anahtarına çevir"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def _cutoff(days: int) -> str:
+    """Bugünden geriye 'days' gün önceki tarih anahtarı"""
+    return (timezone.now().date() - timedelta(days=days)).isoformat()
+
+
+def _apply_daily(mapping: Dict[str, Dict], day: Optional[str], increments: Dict[str, float], sign: int, cutoff: str) -> None:
+    """Günlük sayaçlara ekle/çıkar; pencere dışında kalan günler saklanmaz"""
+    if not day or day < cutoff:
+        return
+    counters = mapping.setdefault(day, dict.fromkeys(increments, 0))
+    for key, amount in increments.items():
+        counters[key] = counters.get(key, 0) + sign * amount
+    if all(value <= 0 for value in counters.values()):
+        del mapping[day]
+
+
+# Kayıtlardan özete katkı değerlerini çıkaran fonksiyonlar
+
+def exam_values(record: ExamRecord) -> Dict[str, Any]:
+    return {
+        'exam_name': record.exam_name,
+        'exam_date': _day(record.exam_date),
+        'subject_name': record.exam_subject.name if record.exam_subject_id else 'Bilinmeyen Ders',
+        'total_net': float(record.total_net or 0),
+        'total_questions': record.total_questions or 0,
+        'total_correct': record.total_correct or 0,
+    }
+
+
+def task_values(task: DailyTask) -> Dict[str, Any]:
+    return {
+        'task_type': task.task_type,
+        'is_completed': task.is_completed,
+        'created_day': _day(task.created_at),
+        'completed_day': _day(task.completed_at) if task.is_completed else None,
+        'estimated_duration': task.estimated_duration or 0,
+    }
+
+
+def session_values(session: StudySession) -> Dict[str, Any]:
+    return {
+        'start_day': _day(session.start_time),
+        'minutes': session.duration_minutes or 0,
+    }
+
+
+def attempt_values(attempt: UserExamAttempt) -> Dict[str, Any]:
+    return {'score': attempt.score or 0.0}
+
+
+# Artımlı güncelleme adımları
+
+def add_exam(snapshot: AnalyticsSnapshot, values: Dict[str, Any]) -> None:
+    """Yeni deneme kaydını özete ekle"""
+    net = values['total_net']
+    entry = {
+        'exam_name': values['exam_name'],
+        'total_net': net,
+        'exam_date': values['exam_date']
+    }
+
+    snapshot.exam_count += 1
+    snapshot.exam_net_total += net
+
+    # Eşitlikte ilk eklenen en iyi, son eklenen en kötü olarak kalır (sıralı analizle aynı)
+    if snapshot.best_exam is None or net > snapshot.best_exam['total_net']:
+        snapshot.best_exam = entry
+    if snapshot.worst_exam is None or net <= snapshot.worst_exam['total_net']:
+        snapshot.worst_exam = entry
+    snapshot.top_exams = sorted(snapshot.top_exams + [entry], key=lambda x: x['total_net'], reverse=True)[:5]
+
+    stats = snapshot.subject_stats.setdefault(values['subject_name'], {
+        'total_exams': 0,
+        'total_net': 0,
+        'best_net': 0,
+        'worst_net': None
+    })
+    stats['total_exams'] += 1
+    stats['total_net'] += net
+    stats['best_net'] = max(stats['best_net'], net)
+    stats['worst_net'] = net if stats['worst_net'] is None else min(stats['worst_net'], net)
+
+
+def add_exam_topics(snapshot: AnalyticsSnapshot, values: Dict[str, Any], topic_names: List[str]) -> None:
+    """Deneme konularını konu istatistiklerine ekle (konu başına soruların %20'si varsayılır)"""
+    topic_questions = int(values['total_questions'] * 0.2)
+    topic_correct = int(values['total_correct'] * 0.2)
+
+    for topic_name in topic_names:
+        stats = snapshot.topic_stats.setdefault(topic_name, {
+            'subject': values['subject_name'],
+            'total_questions': 0,
+            'correct_answers': 0,
+            'appearances': 0
+        })
+        stats['appearances'] += 1
+        stats['total_questions'] += topic_questions
+        stats['correct_answers'] += topic_correct
+
+
+def _exam_entry(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'exam_name': values['exam_name'],
+        'total_net': values['total_net'],
+        'exam_date': values['exam_date']
+    }
+
+
+def remove_exam(snapshot: AnalyticsSnapshot, values: Dict[str, Any]) -> bool:
+    """
+    Deneme kaydının katkısını geri al.
+    Toplamlar artımlı düşülür; en iyi/en kötü değerler geri alınamadığı için kaydın
+    bunları etkileyip etkilemediği döndürülür (refresh_exam_extremes ile yenilenir).
+
+    Returns:
+        bool: En iyi/en kötü değerlerin yenilenmesi gerekiyorsa True
+    """
+    net = values['total_net']
+    entry = _exam_entry(values)
+
+    snapshot.exam_count -= 1
+    snapshot.exam_net_total -= net
+
+    stale = entry in snapshot.top_exams or entry == snapshot.best_exam or entry == snapshot.worst_exam
+
+    stats = snapshot.subject_stats.get(values['subject_name'])
+    if stats is not None:
+        stats['total_exams'] -= 1
+        stats['total_net'] -= net
+        if stats['total_exams'] <= 0:
+            del snapshot.subject_stats[values['subject_name']]
+        elif net >= stats['best_net'] or stats['worst_net'] is None or net <= stats['worst_net']:
+            stats['stale'] = True
+            stale = True
+    return stale
+
+
+def remove_exam_topics(snapshot: AnalyticsSnapshot, values: Dict[str, Any], topic_names: List[str]) -> None:
+    """add_exam_topics katkısını geri al"""
+    topic_questions = int(values['total_questions'] * 0.2)
+    topic_correct = int(values['total_correct'] * 0.2)
+
+    for topic_name in topic_names:
+        stats = snapshot.topic_stats.get(topic_name)
+        if stats is None:
+            continue
+        stats['appearances'] -= 1
+        stats['total_questions'] -= topic_questions
+        stats['correct_answers'] -= topic_correct
+        if stats['appearances'] <= 0:
+            del snapshot.topic_stats[topic_name]
+
+
+def refresh_exam_extremes(snapshot: AnalyticsSnapshot) -> None:
+    """
+    En iyi/en kötü deneme, ilk 5 deneme ve etkilenen derslerin en iyi/en kötü netlerini
+    indeksli sıralı sorgularla yeniden al (tüm geçmiş okunmaz).
+    Eşitlikte sıralı analizle aynı sonuç için eklenme sırası (created_at, id) kullanılır.
+    """
+    records = ExamRecord.objects.filter(user_id=snapshot.user_id).select_related('exam_subject')
+
+    top = [_exam_entry(exam_values(record)) for record in records.order_by('-total_net', 'created_at', 'id')[:5]]
+    worst = records.order_by('total_net', '-created_at', '-id').first()
+    snapshot.top_exams = top
+    snapshot.best_exam = top[0] if top else None
+    snapshot.worst_exam = _exam_entry(exam_values(worst)) if worst is not None else None
+
+    for subject_name, stats in snapshot.subject_stats.items():
+        if not stats.pop('stale', False):
+            continue
+        if subject_name == 'Bilinmeyen Ders':
+            subject_records = records.filter(exam_subject__isnull=True)
+        else:
+            subject_records = records.filter(exam_subject__name=subject_name)
+        extremes = subject_records.aggregate(best=Max('total_net'), worst=Min('total_net'))
+        stats['best_net'] = max(0, float(extremes['best'] or 0))
+        stats['worst_net'] = float(extremes['worst'] or 0)
+
+
+def replace_exam(snapshot: AnalyticsSnapshot, previous: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]],
+                 previous_topics: List[str], current_topics: List[str]) -> None:
+    """Deneme kaydının eski katkısını çıkar, yenisini ekle (silmede current None)"""
+    stale = False
+    if previous is not None:
+        stale = remove_exam(snapshot, previous)
+        remove_exam_topics(snapshot, previous, previous_topics)
+    if current is not None:
+        add_exam(snapshot, current)
+        add_exam_topics(snapshot, current, current_topics)
+    if stale:
+        refresh_exam_extremes(snapshot)
+
+
+def rebuild_exam_section(snapshot: AnalyticsSnapshot) -> None:
+    """
+    Deneme bölümünü kayıtlardan yeniden hesapla (rebuild_snapshot).
+    """
+    snapshot.exam_count = 0
+    snapshot.exam_net_total = 0.0
+    snapshot.best_exam = None
+    snapshot.worst_exam = None
+    snapshot.top_exams = []
+    snapshot.subject_stats = {}
+    snapshot.topic_stats = {}
+
+    records = ExamRecord.objects.filter(user_id=snapshot.user_id).select_related(
+        'exam_subject'
+    ).prefetch_related('exam_topics').order_by('created_at', 'id')
+
+    for record in records:
+        values = exam_values(record)
+        add_exam(snapshot, values)
+        add_exam_topics(snapshot, values, [topic.name for topic in record.exam_topics.all()])
+
+
+def apply_task(snapshot: AnalyticsSnapshot, values: Dict[str, Any], sign: int) -> None:
+    """Görev katkısını ekle (sign=1) veya geri al (sign=-1)"""
+    completed = 1 if values['is_completed'] else 0
+
+    snapshot.task_count += sign
+    snapshot.completed_task_count += sign * completed
+
+    type_stats = snapshot.task_types.setdefault(values['task_type'], {'total': 0, 'completed': 0})
+    type_stats['total'] += sign
+    type_stats['completed'] += sign * completed
+    if type_stats['total'] <= 0:
+        del snapshot.task_types[values['task_type']]
+
+    _apply_daily(snapshot.task_days, values['created_day'], {
+        'total': 1,
+        'completed': completed,
+        'target_minutes': values['estimated_duration']
+    }, sign, _cutoff(WINDOW_DAYS))
+    _apply_daily(snapshot.completion_days, values['completed_day'], {'count': 1}, sign, _cutoff(STREAK_HISTORY_DAYS))
+
+
+def apply_session(snapshot: AnalyticsSnapshot, values: Dict[str, Any], sign: int) -> None:
+    """Çalışma oturumu katkısını ekle veya geri al"""
+    snapshot.session_count += sign
+    _apply_daily(snapshot.study_days, values['start_day'], {
+        'minutes': values['minutes'],
+        'sessions': 1
+    }, sign, _cutoff(WINDOW_DAYS))
+
+
+def apply_attempt(snapshot: AnalyticsSnapshot, values: Dict[str, Any], sign: int) -> None:
+    """Sınav denemesi katkısını ekle veya geri al"""
+    snapshot.attempt_count += sign
+    snapshot.attempt_score_total += sign * values['score']
+
+
+def prune_snapshot(snapshot: AnalyticsSnapshot) -> None:
+    """Pencere dışına çıkan günlük sayaçları temizle"""
+    window_cutoff = _cutoff(WINDOW_DAYS)
+    streak_cutoff = _cutoff(STREAK_HISTORY_DAYS)
+    snapshot.task_days = {day: value for day, value in snapshot.task_days.items() if day >= window_cutoff}
+    snapshot.study_days = {day: value for day, value in snapshot.study_days.items() if day >= window_cutoff}
+    snapshot.completion_days = {day: value for day, value in snapshot.completion_days.items() if day >= streak_cutoff}
+
+
+def update_snapshot(user_id: int, apply: Callable[[AnalyticsSnapshot], None]) -> None:
+    """
+    Kullanıcının özetini kilitleyip artımlı olarak güncelle.
+    Özet henüz yoksa bir şey yapılmaz; ilk okumada yeni kayıt dahil tüm geçmişten oluşturulur.
+    Güncelleme başarısız olursa özet silinir ve bir sonraki okumada yeniden oluşturulur.
+    """
+    try:
+        with transaction.atomic():
+            snapshot = AnalyticsSnapshot.objects.select_for_update().filter(user_id=user_id).first()
+            if snapshot is None:
+                return
+            apply(snapshot)
+            prune_snapshot(snapshot)
+            snapshot.save()
+    except Exception as e:
+        print(f"Analiz özeti güncellenirken hata: {e}")
+        AnalyticsSnapshot.objects.filter(user_id=user_id).delete()
+
+
+def rebuild_snapshot(user) -> AnalyticsSnapshot:
+    """Kullanıcının özetini tüm geçmişten sıfırdan oluştur"""
+    with transaction.atomic():
+        existing_id = AnalyticsSnapshot.objects.select_for_update().filter(
+            user=user
+        ).values_list('id', flat=True).first()
+        snapshot = AnalyticsSnapshot(id=existing_id, user=user)
+
+        rebuild_exam_section(snapshot)
+
+        if user.firebase_uid:
+            for task in DailyTask.objects.filter(user_uid=user.firebase_uid).iterator():
+                apply_task(snapshot, task_values(task), 1)
+
+        for session in StudySession.objects.filter(user=user).iterator():
+            apply_session(snapshot, session_values(session), 1)
+
+        for attempt in UserExamAttempt.objects.filter(user=user).only('score').iterator():
+            apply_attempt(snapshot, attempt_values(attempt), 1)
+
+        snapshot.rebuilt_at = timezone.now()
+        snapshot.save()
+
+    return snapshot
+
+
+def get_snapshot(user) -> AnalyticsSnapshot:
+    """Kullanıcının özetini getir, yoksa oluştur"""
+    snapshot = AnalyticsSnapshot.objects.filter(user=user).first()
+    if snapshot is not None:
+        return snapshot
+    try:
+        return rebuild_snapshot(user)
+    except IntegrityError:
+        # Aynı anda başka bir istek oluşturduysa onu kullan
+        return AnalyticsSnapshot.objects.get(user=user)
+
+
+# Özetten analiz üretimi (ComprehensiveAnalyzer ile aynı çıktı yapısı)
+
+def _window_sum(mapping: Dict[str, Dict], days: int, key: str) -> float:
+    cutoff = _cutoff(days)
+    return sum(counters.get(key, 0) for day, counters in mapping.items() if day >= cutoff)
+
+
+def _exam_analysis(snapshot: AnalyticsSnapshot) -> Dict[str, Any]:
+    if snapshot.exam_count == 0:
+        return empty_exam_analysis()
+
+    subject_performance = copy.deepcopy(snapshot.subject_stats)
+    best_subject, worst_subject = find_best_and_worst_subject(subject_performance)
+
+    return {
+        'total_exams': snapshot.exam_count,
+        'average_net': round(snapshot.exam_net_total / snapshot.exam_count, 2),
+        'best_exam': dict(snapshot.best_exam),
+        'worst_exam': dict(snapshot.worst_exam),
+        'best_subject': best_subject,
+        'worst_subject': worst_subject,
+        'recent_performance': [dict(exam) for exam in snapshot.top_exams],
+        'subject_performance': subject_performance
+    }
+
+
+def _task_analysis(snapshot: AnalyticsSnapshot) -> Dict[str, Any]:
+    if snapshot.task_count == 0:
+        return {
+            'total_tasks': 0,
+            'completed_tasks': 0,
+            'completion_rate': 0.0,
+            'weekly_completion_rate': 0.0,
+            'task_types': {}
+        }
+
+    completion_rate = (snapshot.completed_task_count / snapshot.task_count) * 100
+    weekly_total = _window_sum(snapshot.task_days, 7, 'total')
+    weekly_completed = _window_sum(snapshot.task_days, 7, 'completed')
+    weekly_rate = (weekly_completed / weekly_total) * 100 if weekly_total > 0 else 0
+
+    return {
+        'total_tasks': snapshot.task_count,
+        'completed_tasks': snapshot.completed_task_count,
+        'completion_rate': round(completion_rate, 1),
+        'weekly_completion_rate': round(weekly_rate, 1),
+        'task_types': copy.deepcopy(snapshot.task_types)
+    }
+
+
+def _study_streak(snapshot: AnalyticsSnapshot) -> int:
+    """Bugünden geriye kesintisiz görev tamamlanan gün sayısı"""
+    streak = 0
+    current_date = timezone.now().date()
+    while snapshot.completion_days.get((current_date - timedelta(days=streak)).isoformat(), {}).get('count', 0) > 0:
+        streak += 1
+    return streak
+
+
+def _study_analysis(snapshot: AnalyticsSnapshot) -> Dict[str, Any]:
+    if snapshot.session_count == 0:
+        return {
+            'total_study_hours': 0.0,
+            'daily_average': 0.0,
+            'study_days': 0,
+            'study_streak': 0,
+            'achievement_rate': 0.0,
+            'target_hours': 0.0
+        }
+
+    cutoff = _cutoff(WINDOW_DAYS)
+    total_study_hours = _window_sum(snapshot.study_days, WINDOW_DAYS, 'minutes') / 60
+    daily_average = total_study_hours / 30 if total_study_hours > 0 else 0
+    study_days = len([day for day, counters in snapshot.study_days.items() if day >= cutoff and counters.get('sessions', 0) > 0])
+    target_hours = _window_sum(snapshot.task_days, WINDOW_DAYS, 'target_minutes') / 60
+    achievement_rate = (total_study_hours / target_hours) * 100 if target_hours > 0 else 0
+
+    return {
+        'total_study_hours': round(total_study_hours, 1),
+        'daily_average': round(daily_average, 1),
+        'study_days': study_days,
+        'study_streak': _study_streak(snapshot),
+        'achievement_rate': round(achievement_rate, 1),
+        'target_hours': round(target_hours, 1)
+    }
+
+
+def snapshot_analyses(snapshot: AnalyticsSnapshot) -> Dict[str, Any]:
+    """Özetten analizleri üret; anahtarlar ComprehensiveAnalyzer metot adlarıdır"""
+    return {
+        'analyze_exam_performance': _exam_analysis(snapshot),
+        'analyze_task_completion': _task_analysis(snapshot),
+        'analyze_study_patterns': _study_analysis(snapshot),
+        'analyze_topic_performance': summarize_topic_stats(copy.deepcopy(snapshot.topic_stats)),
+        'calculate_study_streak': _study_streak(snapshot),
+    }
@@ -0,0 +1,412 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from users.models import User
+from exams.models import ExamCategory, Subject, Topic, ExamRecord
+from tasks.models import DailyTask
+from coaching.models import StudySession, UserExamAttempt
+from fiverbase.firebase_service import FirebaseDataService
+from .analysis_algorithm import ExamAnalyzer
+from .analysis_service import ComprehensiveAnalyzer
+from .data_sources import (
+    AnalyticsDataSource, DjangoDataSource, FirestoreDataSource, InMemoryDataSource, get_data_source
+)
+from .models import AnalyticsSnapshot
+from .snapshot import get_snapshot, rebuild_snapshot
+from .views import get_comprehensive_analysis
+
+
+class FakeDocument:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeQuery:
+    """where/select/order_by/stream destekleyen basit Firestore sorgusu"""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def where(self, field, op, value):
+        return FakeQuery([doc for doc in self.documents if doc.to_dict().get(field) == value])
+
+    def select(self, field_paths):
+        return FakeQuery([
+            FakeDocument(doc.id, {key: value for key, value in doc.to_dict().items() if key in field_paths})
+            for doc in self.documents
+        ])
+
+    def order_by(self, *args, **kwargs):
+        return self
+
+    def stream(self):
+        return iter(self.documents)
+
+
+class FakeFirestore:
+    def __init__(self, collections):
+        self.collections = collections
+
+    def collection(self, name):
+        return FakeQuery(self.collections.get(name, []))
+
+
+def make_attempt(topic, user_answer, correct_answer='A', subject='TYT Matematik', **extra):
+    attempt = {'topic': topic, 'subject': subject, 'correct_answer': correct_answer, **extra}
+    if user_answer is not None:
+        attempt['user_answer'] = user_answer
+    return attempt
+
+
+class ExamAnalyzerBatchTests(TestCase):
+    """NumPy tabanlı toplu analizin dict tabanlı analyze_question_attempts ile aynı sonucu vermesi"""
+
+    def setUp(self):
+        self.analyzer = ExamAnalyzer()
+        self.first = [
+            make_attempt('Türev', 'A'),
+            make_attempt('Türev', 'B'),
+            make_attempt('Limit', 'C', correct_answer='C'),
+            make_attempt('Paragraf', '', subject='TYT Türkçe'),
+            make_attempt('Türev', 'A', is_blank=True),
+        ]
+        self.second = [
+            make_attempt('Limit', 'D', correct_answer='C'),
+            make_attempt('Türev', 'A'),
+            make_attempt('İntegral', None),
+            make_attempt('Türev', 'A'),
+            make_attempt('Limit', 'C', correct_answer='C'),
+        ]
+
+    def assert_batch_matches(self, attempt_lists):
+        expected = [self.analyzer.analyze_question_attempts(attempts) for attempts in attempt_lists]
+        self.assertEqual(self.analyzer.analyze_attempts_batch(attempt_lists), expected)
+
+    def test_single_attempt(self):
+        self.assert_batch_matches([self.first])
+
+    def test_several_attempts(self):
+        self.assert_batch_matches([self.first, self.second, self.first[:2]])
+
+    def test_empty_attempts(self):
+        self.assertEqual(self.analyzer.analyze_attempts_batch([]), [])
+        self.assert_batch_matches([[]])
+        self.assert_batch_matches([[], self.first, []])
+
+    def test_blank_and_missing_answers(self):
+        attempts = [
+            make_attempt('Türev', ''),
+            make_attempt('Türev', None),
+            {'topic': 'Türev', 'subject': 'TYT Matematik', 'correct_answer': 'A', 'user_answer': None},
+            make_attempt('Limit', None, correct_answer=None),
+            make_attempt('Limit', 'B', correct_answer=None),
+        ]
+        # Boş bırakılan soruda doğru cevap hiç gelmeyebilir
+        del attempts[3]['correct_answer']
+        # Ders adı yalnızca konunun ilk sorusunda bulunabilir
+        del attempts[1]['subject']
+        self.assert_batch_matches([attempts, [make_attempt('Türev', 'A')]])
+
+    def test_topic_in_single_attempt(self):
+        self.assert_batch_matches([self.first, [make_attempt('Olasılık', 'B')], self.second])
+
+    def test_progress_matches_per_attempt_analysis(self):
+        def per_attempt(attempt_lists):
+            return [self.analyzer.analyze_question_attempts(attempts) for attempts in attempt_lists]
+
+        for previous, current in [(self.first, self.second), (self.second, self.first), ([], self.first), (self.first, [])]:
+            with self.subTest(previous=len(previous), current=len(current)):
+                with mock.patch.object(self.analyzer, 'analyze_attempts_batch', side_effect=per_attempt):
+                    expected = self.analyzer.analyze_progress(previous, current)
+                self.assertEqual(self.analyzer.analyze_progress(previous, current), expected)
+
+
+class SubjectTopicAnalysisTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ogrenci', email='ogrenci@example.com', firebase_uid='uid-1')
+        category = ExamCategory.objects.create(name='TYT', category_type='TYT')
+        self.subject = Subject.objects.create(category=category, name='Matematik')
+
+    def build_firestore(self, topic_count):
+        """Her konu için Django Topic, deneme kaydı, soru ve test kaydı oluştur"""
+        topics, questions, tests = [], [], []
+        for i in range(topic_count):
+            topic = Topic.objects.create(subject=self.subject, name=f'Konu {i}')
+            record = ExamRecord.objects.create(
+                user=self.user, exam_name=f'Deneme {i}', exam_date='2025-01-01', exam_type='TYT',
+                exam_subject=self.subject, total_questions=10, total_correct=6, total_wrong=2
+            )
+            record.exam_topics.add(topic)
+
+            topics.append(FakeDocument(str(topic.id), {'name': topic.name, 'subject_code': 'tyt_matematik'}))
+            questions.append(FakeDocument(f'q{i}', {'user_uid': 'uid-1', 'topic_id': str(topic.id), 'is_correct': True}))
+            tests.append(FakeDocument(f't{i}', {
+                'user_uid': 'uid-1', 'topic_id': str(topic.id),
+                'total_questions': 5, 'correct_answers': 3, 'wrong_answers': 1, 'empty_answers': 1
+            }))
+
+        # Başka kullanıcının kaydı sonuca girmemeli
+        questions.append(FakeDocument('q-other', {'user_uid': 'uid-2', 'topic_id': topics[0].id, 'is_correct': False}))
+        return FakeFirestore({'topics': topics, 'user_questions': questions, 'user_tests': tests})
+
+    def analyze(self, topic_count):
+        firestore_db = self.build_firestore(topic_count)
+        with mock.patch('fiverbase.firebase_service.firestore.client', return_value=firestore_db):
+            analyzer = ComprehensiveAnalyzer(self.user)
+            with self.assertNumQueries(1):
+                result = analyzer.get_subject_topic_analysis('tyt_matematik')
+        return result, analyzer.get_read_stats()
+
+    def test_query_count_is_constant(self):
+        small_result, small_stats = self.analyze(3)
+        large_result, large_stats = self.analyze(30)
+
+        self.assertEqual(small_result['total_topics'], 3)
+        self.assertEqual(large_result['total_topics'], 30)
+        # topics + user_questions + user_tests
+        self.assertEqual(small_stats['queries'], 3)
+        self.assertEqual(large_stats['queries'], 3)
+
+    def test_response_shape(self):
+        result, _ = self.analyze(2)
+
+        self.assertEqual(result['subject'], {'code': 'tyt_matematik', 'name': 'Tyt Matematik'})
+        self.assertEqual(result['topics'][0]['name'], 'Konu 0')
+        self.assertEqual(result['topics'][0]['totalQuestions'], 16)
+        self.assertEqual(result['topics'][0]['correctAnswers'], 10)
+        self.assertEqual(result['topics'][0]['wrongAnswers'], 3)
+        self.assertEqual(result['topics'][0]['emptyAnswers'], 3)
+        self.assertEqual(result['topics'][0]['accuracy'], 62.5)
+
+
+class AnalyticsSnapshotTests(TestCase):
+    SNAPSHOT_FIELDS = [
+        'exam_count', 'best_exam', 'worst_exam', 'top_exams', 'subject_stats', 'topic_stats',
+        'task_count', 'completed_task_count', 'task_types', 'task_days', 'completion_days',
+        'session_count', 'study_days', 'attempt_count'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create(username='ogrenci', email='ogrenci@example.com', firebase_uid='uid-1')
+        self.category = ExamCategory.objects.create(name='TYT', category_type='TYT')
+        self.subjects = [Subject.objects.create(category=self.category, name=name) for name in ('Matematik', 'Fizik')]
+        self.topics = [Topic.objects.create(subject=self.subjects[0], name=f'Konu {i}') for i in range(3)]
+
+    def add_exam(self, name, net, subject=None, topics=()):
+        record = ExamRecord.objects.create(
+            user=self.user, exam_name=name, exam_date='2025-01-01', exam_type='TYT',
+            exam_subject=subject or self.subjects[0], total_questions=20, total_correct=int(net), total_net=net
+        )
+        record.exam_topics.add(*topics)
+        return record
+
+    def assertMatchesRebuild(self):
+        snapshot = AnalyticsSnapshot.objects.get(user=self.user)
+        rebuilt = rebuild_snapshot(self.user)
+        for field in self.SNAPSHOT_FIELDS:
+            self.assertEqual(getattr(snapshot, field), getattr(rebuilt, field), field)
+        self.assertAlmostEqual(snapshot.exam_net_total, rebuilt.exam_net_total)
+        self.assertAlmostEqual(snapshot.attempt_score_total, rebuilt.attempt_score_total)
+
+    def test_exam_records_are_applied_incrementally(self):
+        get_snapshot(self.user)
+        records = [
+            # Konular Matematik'e ait; Fizik denemelerinin konusu yok
+            self.add_exam(f'Deneme {i}', net, subject=self.subjects[i % 2], topics=self.topics[:i % 3 + 1] if i % 2 == 0 else ())
+            for i, net in enumerate([12, 18, 7, 18, 15, 9, 3])
+        ]
+        self.assertMatchesRebuild()
+
+        # En iyi denemeyi güncelle, en kötüyü sil
+        records[1].total_net = 2
+        records[1].save()
+        self.assertMatchesRebuild()
+        records[6].delete()
+        self.assertMatchesRebuild()
+
+        # Konu ekleme/çıkarma/temizleme ve konu tarafından değişiklik
+        records[0].exam_topics.remove(self.topics[0])
+        records[2].exam_topics.clear()
+        self.topics[1].examrecord_set.add(records[4], records[0])
+        self.assertMatchesRebuild()
+        self.topics[1].examrecord_set.clear()
+        self.assertMatchesRebuild()
+
+    def test_exam_update_does_not_reread_history(self):
+        get_snapshot(self.user)
+        records = [self.add_exam(f'Deneme {i}', 10 + i) for i in range(20)]
+
+        # En iyi/en kötü ilk 5'i etkilemeyen güncelleme tüm geçmişi okumaz
+        records[5].total_net = 12.5
+        with mock.patch('analytics.snapshot.rebuild_exam_section') as rebuild, \
+                mock.patch('analytics.snapshot.refresh_exam_extremes') as refresh:
+            records[5].save()
+        rebuild.assert_not_called()
+        refresh.assert_not_called()
+        self.assertMatchesRebuild()
+
+    def test_tasks_sessions_and_attempts_are_applied_incrementally(self):
+        get_snapshot(self.user)
+        now = timezone.now()
+        task = DailyTask.objects.create(user_uid='uid-1', title='Görev', task_type='study', estimated_duration=60)
+        DailyTask.objects.create(user_uid='uid-1', title='Görev 2', task_type='review', estimated_duration=30)
+        task.complete_task()
+        session = StudySession.objects.create(
+            user=self.user, session_type='study', start_time=now - timedelta(hours=2), duration_minutes=90
+        )
+        attempt = UserExamAttempt.objects.create(
+            user=self.user, exam_category=self.category, total_questions=10, score=70, duration_minutes=20
+        )
+        self.assertMatchesRebuild()
+
+        session.duration_minutes = 45
+        session.save()
+        attempt.score = 40
+        attempt.save()
+        task.delete()
+        self.assertMatchesRebuild()
+
+    def test_rebuild_command(self):
+        self.add_exam('Deneme', 10)
+        AnalyticsSnapshot.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_analytics_snapshots', user_id=self.user.id, stdout=out)
+
+        self.assertIn('1 analiz özeti', out.getvalue())
+        self.assertEqual(AnalyticsSnapshot.objects.get(user=self.user).exam_count, 1)
+
+    @override_settings(ANALYTICS_DATA_SOURCE='django')
+    def test_comprehensive_analysis_reads_snapshot(self):
+        for i, net in enumerate([12, 18, 7]):
+            self.add_exam(f'Deneme {i}', net, topics=self.topics[:1])
+
+        def get(query):
+            request = APIRequestFactory().get('/api/analytics/comprehensive-analysis/', query)
+            force_authenticate(request, user=self.user)
+            return get_comprehensive_analysis(request)
+
+        live = get({})
+        with mock.patch('analytics.analysis_service.ComprehensiveAnalyzer.prefetch') as prefetch:
+            snapshot = get({'source': 'snapshot'})
+        prefetch.assert_not_called()
+
+        self.assertEqual(snapshot.data['data']['exam_analysis'], live.data['data']['exam_analysis'])
+        self.assertEqual(snapshot['X-Firestore-Queries'], '0')
+
+
+class FirebaseDataServiceTests(TestCase):
+    def test_has_user_documents_reads_only_document_name(self):
+        firestore_db = mock.MagicMock()
+        query = firestore_db.collection.return_value.where.return_value
+        query.select.return_value.limit.return_value.stream.return_value = iter([FakeDocument('s1', {})])
+
+        with mock.patch('fiverbase.firebase_service.firestore.client', return_value=firestore_db):
+            self.assertTrue(FirebaseDataService().has_user_documents('study_sessions', 'uid-1'))
+
+        query.select.assert_called_once_with(['__name__'])
+
+
+class DataSourceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ogrenci', email='ogrenci@example.com', firebase_uid='uid-1')
+        self.other = User.objects.create(username='diger', email='diger@example.com', firebase_uid='uid-2')
+
+    def test_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            AnalyticsDataSource()
+
+    def test_settings_choose_only_real_sources(self):
+        with override_settings(ANALYTICS_DATA_SOURCE='django'):
+            self.assertIsInstance(get_data_source(), DjangoDataSource)
+        with override_settings(ANALYTICS_DATA_SOURCE='memory'):
+            with self.assertRaises(ImproperlyConfigured):
+                get_data_source()
+
+    def test_in_memory_source_filters_like_firestore(self):
+        source = InMemoryDataSource({
+            'exam_records': [
+                {'id': 'e1', 'user_uid': 'uid-1', 'exam_name': 'Deneme 1', 'total_net': 12.5, 'subject_name': 'Matematik'},
+                {'id': 'e2', 'user_uid': 'uid-2', 'exam_name': 'Deneme 2', 'total_net': 8},
+            ],
+            'study_sessions': [
+                {'id': 's1', 'user_uid': 'uid-1', 'start_time': '2025-01-10T10:00:00', 'duration_minutes': 30},
+                {'id': 's2', 'user_uid': 'uid-1', 'start_time': '2024-12-01T10:00:00', 'duration_minutes': 60},
+            ],
+        }, topics=[{'id': 't1', 'name': 'Türev', 'subject_code': 'tyt_matematik'}])
+
+        bundle = source.get_user_bundle(
+            self.user, ['exam_records', 'study_sessions'],
+            date_ranges={'study_sessions': (timezone.datetime(2025, 1, 1).date(), None)},
+            fields={'exam_records': ['exam_name']}
+        )
+
+        self.assertEqual([record.id for record in bundle.exam_records], ['e1'])
+        # Seçilmeyen alanlar indirilmez, varsayılan değer kalır
+        self.assertEqual(bundle.exam_records[0].exam_name, 'Deneme 1')
+        self.assertEqual(bundle.exam_records[0].total_net, 0)
+        self.assertEqual([session.id for session in bundle.study_sessions], ['s1'])
+        self.assertTrue(source.has_user_documents(self.user, 'exam_records'))
+        self.assertFalse(source.has_user_documents(self.other, 'study_sessions'))
+        self.assertEqual(source.get_topics('tyt_matematik'), [{'id': 't1', 'name': 'Türev', 'subject_code': 'tyt_matematik'}])
+        self.assertEqual(source.get_read_stats(), {'queries': 5, 'documents': 4})
+
+    def test_django_source_reads_orm_models(self):
+        category = ExamCategory.objects.create(name='TYT', category_type='TYT')
+        subject = Subject.objects.create(category=category, name='TYT Matematik')
+        topic = Topic.objects.create(subject=subject, name='Türev')
+        record = ExamRecord.objects.create(
+            user=self.user, exam_name='Deneme', exam_date='2025-01-01', exam_type='TYT',
+            exam_subject=subject, total_questions=20, total_correct=12, total_net='10.50'
+        )
+        record.exam_topics.add(topic)
+        ExamRecord.objects.create(
+            user=self.other, exam_name='Diğer', exam_date='2025-01-01', exam_type='TYT', total_net=5
+        )
+        now = timezone.now()
+        StudySession.objects.create(user=self.user, session_type='study', start_time=now, duration_minutes=40)
+        StudySession.objects.create(
+            user=self.user, session_type='study', start_time=now - timedelta(days=60), duration_minutes=20
+        )
+
+        source = DjangoDataSource()
+        bundle = source.get_user_bundle(
+            self.user, ['exam_records', 'study_sessions', 'questions', 'tests'],
+            date_ranges={'study_sessions': (now.date() - timedelta(days=30), None)}
+        )
+
+        self.assertEqual(len(bundle.exam_records), 1)
+        self.assertEqual(bundle.exam_records[0].subject_name, 'TYT Matematik')
+        self.assertEqual(bundle.exam_records[0].total_net, 10.5)
+        self.assertEqual(bundle.exam_records[0].topics, ['Türev'])
+        self.assertEqual([session.duration_minutes for session in bundle.study_sessions], [40])
+        self.assertEqual(bundle.questions, [])
+        self.assertEqual(bundle.tests, [])
+        self.assertEqual(source.get_topics('tyt_matematik'), [{'id': str(topic.id), 'name': 'Türev'}])
+
+    def test_firestore_source_reads_user_documents(self):
+        firestore_db = FakeFirestore({
+            'exam_records': [
+                FakeDocument('e1', {'user_uid': 'uid-1', 'exam_name': 'Deneme 1', 'total_net': 12}),
+                FakeDocument('e2', {'user_uid': 'uid-2', 'exam_name': 'Deneme 2', 'total_net': 8}),
+            ],
+            'user_questions': [FakeDocument('q1', {'user_uid': 'uid-1', 'topic_id': 't1', 'is_correct': True})],
+        })
+        with mock.patch('fiverbase.firebase_service.firestore.client', return_value=firestore_db):
+            source = FirestoreDataSource()
+        bundle = source.get_user_bundle(self.user, ['exam_records', 'questions'])
+
+        self.assertEqual([(record.id, record.total_net) for record in bundle.exam_records], [('e1', 12)])
+        self.assertEqual(bundle.questions, [{'id': 'q1', 'user_uid': 'uid-1', 'topic_id': 't1', 'is_correct': True}])
+        self.assertEqual(source.get_read_stats(), {'queries': 2, 'documents': 2})
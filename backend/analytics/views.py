@@ -4,6 +4,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from .analysis_service import ComprehensiveAnalyzer
+from .snapshot import get_snapshot
 from users.models import User
 
 @api_view(['GET'])
@@ -53,17 +54,27 @@ def get_comprehensive_analysis(request):
         # Kullanıcıyı al
         user = request.user
         
-        # Analiz servisini başlat
-        analyzer = ComprehensiveAnalyzer(user)
+        # Analiz servisini başlat (source=snapshot: kalıcı analiz özetinden oku)
+        if request.GET.get('source') == 'snapshot':
+            analyzer = ComprehensiveAnalyzer(user, snapshot=get_snapshot(user))
+        else:
+            analyzer = ComprehensiveAnalyzer(user)
         
         # Kapsamlı analizi al
         analysis_result = analyzer.get_comprehensive_analysis()
         
-        return Response({
+        response = Response({
             'success': True,
             'data': analysis_result
         })
         
+        # Bu isteğin yaptığı Firestore okumalarını raporla
+        read_stats = analyzer.get_read_stats()
+        response['X-Firestore-Queries'] = read_stats['queries']
+        response['X-Firestore-Documents'] = read_stats['documents']
+        
+        return response
+        
     except Exception as e:
         return Response({
             'success': False,
@@ -0,0 +1,86 @@
+"""
+YÖN App - ExamAnalyzer Benchmark
+Sözlük tabanlı analyze_question_attempts ile NumPy tabanlı toplu analizi karşılaştırır.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.exam_analyzer --attempts 2000 --questions 120 --topics 60
+"""
+
+import argparse
+import random
+import time
+
+from analytics.analysis_algorithm import ExamAnalyzer
+
+SUBJECTS = ['TYT Türkçe', 'TYT Matematik', 'TYT Fizik', 'TYT Kimya', 'TYT Biyoloji', 'TYT Tarih']
+CHOICES = ['A', 'B', 'C', 'D', 'E']
+
+
+def generate_attempts(n_attempts: int, n_questions: int, n_topics: int, seed: int = 42):
+    """Rastgele deneme cevapları üret"""
+    rng = random.Random(seed)
+    topics = [(f'Konu {i}', SUBJECTS[i % len(SUBJECTS)]) for i in range(n_topics)]
+    
+    attempt_lists = []
+    for _ in range(n_attempts):
+        attempts = []
+        for q in range(n_questions):
+            topic, subject = rng.choice(topics)
+            correct_answer = rng.choice(CHOICES)
+            is_blank = rng.random() < 0.15
+            user_answer = '' if is_blank else (correct_answer if rng.random() < 0.6 else rng.choice(CHOICES))
+            attempts.append({
+                'question_id': f'q{q}',
+                'topic': topic,
+                'subject': subject,
+                'user_answer': user_answer,
+                'correct_answer': correct_answer,
+                'is_blank': is_blank
+            })
+        attempt_lists.append(attempts)
+    return attempt_lists
+
+
+def run(n_attempts: int, n_questions: int, n_topics: int):
+    analyzer = ExamAnalyzer()
+    attempt_lists = generate_attempts(n_attempts, n_questions, n_topics)
+    
+    # Mevcut sözlük tabanlı uygulama
+    start = time.perf_counter()
+    dict_results = [analyzer.analyze_question_attempts(attempts) for attempts in attempt_lists]
+    dict_seconds = time.perf_counter() - start
+    
+    # Toplu analiz (dönüşüm + hesaplama + sözlük çıktısı)
+    start = time.perf_counter()
+    batch_results = analyzer.analyze_attempts_batch(attempt_lists)
+    batch_seconds = time.perf_counter() - start
+    
+    # Sadece NumPy çekirdeği (sütunlu veri hazırken, örn. ağırlık değişikliği sonrası yeniden skorlama)
+    columns = analyzer.to_columns(attempt_lists)
+    start = time.perf_counter()
+    counts = analyzer.count_topic_results(
+        columns['topic_ids'], columns['user_answers'], columns['correct_answers'], columns['is_blank'],
+        attempt_ids=columns['attempt_ids'], n_attempts=columns['n_attempts'], n_topics=len(columns['topics'])
+    )
+    count_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    analyzer.weights = {'accuracy': 0.5, 'omission': 0.3, 'error': 0.2}
+    analyzer.score_topic_results(counts)
+    rescore_seconds = time.perf_counter() - start
+    
+    print(f"Denemeler: {n_attempts}, deneme başına soru: {n_questions}, konu: {n_topics}")
+    print(f"Sonuçlar aynı: {dict_results == batch_results}")
+    print(f"Sözlük tabanlı:        {dict_seconds:.3f} sn")
+    print(f"Toplu (uçtan uca):     {batch_seconds:.3f} sn")
+    print(f"Toplu sayım çekirdeği: {count_seconds:.4f} sn")
+    print(f"Yeniden skorlama:      {rescore_seconds:.4f} sn")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ExamAnalyzer sözlük/NumPy karşılaştırması')
+    parser.add_argument('--attempts', type=int, default=2000)
+    parser.add_argument('--questions', type=int, default=120)
+    parser.add_argument('--topics', type=int, default=60)
+    args = parser.parse_args()
+    run(args.attempts, args.questions, args.topics)
@@ -0,0 +1,337 @@
+"""
+YÖN App - Benchmark Sentetik Veri Üreteci
+N kullanıcı x M deneme x K görev x S çalışma oturumu boyutunda veri üretir.
+Doküman şekilleri fiverbase/add_exam_data.py (Firestore) ve create_mock_data.py (ORM) ile aynıdır.
+"""
+
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from exams.models import ExamCategory, Subject, Topic, Question, ExamRecord
+from coaching.models import StudySession, SubjectPerformance
+from tasks.models import DailyTask
+from exams.counters import rebuild_counters
+
+User = get_user_model()
+
+# Hazır boyutlar: kullanıcı, kullanıcı başına deneme/görev/oturum, gönderilen sınavdaki soru sayısı
+SIZES = {
+    'small': {'users': 5, 'exams': 10, 'tasks': 50, 'sessions': 30, 'questions': 40},
+    'medium': {'users': 20, 'exams': 50, 'tasks': 300, 'sessions': 200, 'questions': 120},
+    'large': {'users': 50, 'exams': 200, 'tasks': 2000, 'sessions': 1000, 'questions': 160},
+}
+
+SUBJECT_TOPICS = {
+    'TYT Türkçe': ['Paragraf', 'Dil Bilgisi', 'Sözcükte Anlam', 'Cümlede Anlam'],
+    'TYT Matematik': ['Temel Kavramlar', 'Sayılar', 'Denklemler', 'Problemler'],
+    'TYT Fen Bilimleri': ['Mekanik', 'Elektrik', 'Atom ve Periyodik Sistem', 'Hücre'],
+    'TYT Sosyal Bilimler': ['Tarih Bilimi', 'Harita Bilgisi', 'Felsefeye Giriş', 'Din ve İslam'],
+}
+
+TASK_TYPES = ['study', 'practice', 'review', 'exam', 'flashcard', 'custom']
+SESSION_TYPES = ['study', 'practice', 'review', 'exam']
+CHOICES = ['A', 'B', 'C', 'D', 'E']
+
+
+def user_uid(index: int) -> str:
+    return f'bench-user-{index}'
+
+
+def _exam_document(rng: random.Random, uid: str, index: int, now: datetime) -> Dict[str, Any]:
+    """add_exam_data.py ile aynı şekilde deneme kaydı"""
+    exam_type = 'TYT' if rng.random() < 0.6 else 'AYT'
+    total_questions = 120 if exam_type == 'TYT' else 80
+    total_correct = rng.randint(int(total_questions * 0.3), int(total_questions * 0.7))
+    total_wrong = rng.randint(int(total_questions * 0.1), int(total_questions * 0.3))
+    subject_name = rng.choice(list(SUBJECT_TOPICS))
+    exam_date = now - timedelta(days=rng.randint(1, 365))
+    return {
+        'id': f'{uid}-exam-{index}',
+        'user_uid': uid,
+        'exam_name': f'Deneme {index + 1}',
+        'exam_date': exam_date.isoformat(),
+        'exam_type': exam_type.lower(),
+        'subject_name': subject_name,
+        'difficulty': rng.choice(['easy', 'medium', 'hard']),
+        'total_questions': total_questions,
+        'total_marked': total_correct + total_wrong,
+        'total_correct': total_correct,
+        'total_wrong': total_wrong,
+        'total_empty': total_questions - total_correct - total_wrong,
+        'total_net': float(total_correct - (total_wrong / 4)),
+        'topics': rng.sample(SUBJECT_TOPICS[subject_name], rng.randint(2, 4)),
+        'notes': 'Deneme notları ' * 20,
+        'created_at': exam_date.isoformat(),
+        'updated_at': exam_date.isoformat()
+    }
+
+
+def _task_document(rng: random.Random, uid: str, index: int, now: datetime) -> Dict[str, Any]:
+    """add_exam_data.py ile aynı şekilde görev"""
+    created_at = now - timedelta(days=rng.randint(0, 365), hours=rng.randint(0, 23))
+    estimated_duration = rng.randint(30, 120)
+    is_completed = rng.random() < 0.6
+    subject = rng.choice(list(SUBJECT_TOPICS))
+    topic = rng.choice(SUBJECT_TOPICS[subject])
+    return {
+        'id': f'{uid}-task-{index}',
+        'user_uid': uid,
+        'title': f"{subject} - {topic} Çalışması",
+        'description': f"{subject} dersinde {topic.lower()} konusunda çalışma yapılacak",
+        'task_type': rng.choice(TASK_TYPES),
+        'priority': rng.choice(['low', 'medium', 'high']),
+        'estimated_duration': estimated_duration,
+        'actual_duration': rng.randint(20, estimated_duration + 30) if is_completed else None,
+        'is_completed': is_completed,
+        'subject': subject,
+        'topic': topic,
+        'created_at': created_at.isoformat(),
+        'completed_at': (created_at + timedelta(hours=rng.randint(1, 4))).isoformat() if is_completed else None
+    }
+
+
+def _session_document(rng: random.Random, uid: str, index: int, now: datetime) -> Dict[str, Any]:
+    """add_exam_data.py ile aynı şekilde çalışma oturumu"""
+    start_time = now - timedelta(days=rng.randint(0, 180), hours=rng.randint(0, 23))
+    duration = rng.randint(30, 180)
+    return {
+        'id': f'{uid}-session-{index}',
+        'user_uid': uid,
+        'session_type': rng.choice(SESSION_TYPES),
+        'subject': rng.choice(list(SUBJECT_TOPICS)),
+        'start_time': start_time.isoformat(),
+        'end_time': (start_time + timedelta(minutes=duration)).isoformat(),
+        'duration_minutes': duration,
+        'questions_answered': rng.randint(10, 50),
+        'correct_answers': rng.randint(5, 30),
+        'focus_score': rng.uniform(60, 95),
+        'notes': f"Çalışma oturumu {index + 1} notları",
+        'is_completed': rng.choice([True, False]),
+        'created_at': start_time.isoformat()
+    }
+
+
+def generate_documents(size: Dict[str, int], topics: List[Topic], seed: int = 42) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Firestore şeklinde dokümanlar üret (InMemoryDataSource için)
+
+    Args:
+        size: SIZES'taki gibi boyut sözlüğü
+        topics: Soru/test kayıtlarının bağlanacağı konular
+        seed: Rastgelelik tohumu
+
+    Returns:
+        Dict: {koleksiyon: [doküman]} - exam_records, tasks, study_sessions, questions, tests
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    collections = {'exam_records': [], 'tasks': [], 'study_sessions': [], 'questions': [], 'tests': []}
+
+    for user_index in range(size['users']):
+        uid = user_uid(user_index)
+        for i in range(size['exams']):
+            collections['exam_records'].append(_exam_document(rng, uid, i, now))
+        for i in range(size['tasks']):
+            collections['tasks'].append(_task_document(rng, uid, i, now))
+        for i in range(size['sessions']):
+            collections['study_sessions'].append(_session_document(rng, uid, i, now))
+
+        # Konu bazlı soru ve test kayıtları
+        for i in range(size['tasks']):
+            is_answered = rng.random() < 0.85
+            collections['questions'].append({
+                'id': f'{uid}-question-{i}',
+                'user_uid': uid,
+                'topic_id': str(rng.choice(topics).id),
+                'is_answered': is_answered,
+                'is_correct': is_answered and rng.random() < 0.6
+            })
+        for i in range(size['exams']):
+            total_questions = rng.randint(10, 40)
+            correct = rng.randint(0, total_questions)
+            wrong = rng.randint(0, total_questions - correct)
+            collections['tests'].append({
+                'id': f'{uid}-test-{i}',
+                'user_uid': uid,
+                'topic_id': str(rng.choice(topics).id),
+                'total_questions': total_questions,
+                'correct_answers': correct,
+                'wrong_answers': wrong,
+                'empty_answers': total_questions - correct - wrong
+            })
+
+    return collections
+
+
+def create_catalog(questions_per_topic: int = 20, seed: int = 42) -> Dict[str, Any]:
+    """
+    Sınav kategorisi, ders, konu ve soru kataloğunu veritabanında oluştur
+
+    Returns:
+        Dict: category, subjects, topics ve questions
+    """
+    rng = random.Random(seed)
+    category = ExamCategory.objects.create(name='TYT', category_type='tyt')
+
+    subjects = []
+    topics = []
+    for order, (subject_name, topic_names) in enumerate(SUBJECT_TOPICS.items()):
+        subject = Subject.objects.create(category=category, name=subject_name, order=order)
+        subjects.append(subject)
+        for topic_order, topic_name in enumerate(topic_names):
+            topics.append(Topic.objects.create(subject=subject, name=topic_name, order=topic_order))
+
+    Question.objects.bulk_create([
+        Question(
+            topic=topic,
+            question_text=f'{topic.name} sorusu {i + 1}',
+            difficulty=rng.choice(['easy', 'medium', 'hard']),
+            choices=[{choice: f'Seçenek {choice}'} for choice in CHOICES],
+            correct_answer=rng.choice(CHOICES)
+        )
+        for topic in topics for i in range(questions_per_topic)
+    ])
+    # bulk_create sinyal üretmez
+    rebuild_counters()
+
+    return {
+        'category': category,
+        'subjects': subjects,
+        'topics': topics,
+        'questions': list(Question.objects.filter(topic__in=topics))
+    }
+
+
+def create_users(size: Dict[str, int], catalog: Dict[str, Any], seed: int = 42) -> List[User]:
+    """
+    Kullanıcıları ve ORM kayıtlarını (create_mock_data.py ile aynı modeller) toplu oluştur
+
+    Returns:
+        List: Oluşturulan kullanıcılar
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    subjects_by_name = {subject.name: subject for subject in catalog['subjects']}
+    topics_by_name = {(topic.subject_id, topic.name): topic for topic in catalog['topics']}
+
+    users = User.objects.bulk_create([
+        User(
+            username=user_uid(i),
+            email=f'{user_uid(i)}@example.com',
+            firebase_uid=user_uid(i),
+            first_name='Benchmark',
+            last_name=str(i)
+        )
+        for i in range(size['users'])
+    ])
+    users = list(User.objects.filter(firebase_uid__in=[user.firebase_uid for user in users]).order_by('id'))
+
+    exam_records = []
+    exam_topics = []
+    tasks = []
+    sessions = []
+    performances = []
+
+    for user in users:
+        for i in range(size['exams']):
+            document = _exam_document(rng, user.firebase_uid, i, now)
+            subject = subjects_by_name[document['subject_name']]
+            exam_records.append(ExamRecord(
+                user=user,
+                exam_name=document['exam_name'],
+                exam_date=document['exam_date'][:10],
+                exam_type=document['exam_type'],
+                exam_subject=subject,
+                difficulty=document['difficulty'],
+                total_questions=document['total_questions'],
+                total_marked=document['total_marked'],
+                total_correct=document['total_correct'],
+                total_wrong=document['total_wrong'],
+                total_net=Decimal(str(document['total_net']))
+            ))
+            exam_topics.append([topics_by_name[(subject.id, name)] for name in document['topics']])
+
+        for i in range(size['tasks']):
+            document = _task_document(rng, user.firebase_uid, i, now)
+            tasks.append(DailyTask(
+                user_uid=user.firebase_uid,
+                title=document['title'],
+                description=document['description'],
+                task_type=document['task_type'],
+                priority=document['priority'],
+                estimated_duration=document['estimated_duration'],
+                actual_duration=document['actual_duration'],
+                is_completed=document['is_completed'],
+                completed_at=datetime.fromisoformat(document['completed_at']) if document['completed_at'] else None,
+                subject=document['subject'],
+                topic=document['topic']
+            ))
+
+        for i in range(size['sessions']):
+            document = _session_document(rng, user.firebase_uid, i, now)
+            sessions.append(StudySession(
+                user=user,
+                session_type=document['session_type'],
+                start_time=datetime.fromisoformat(document['start_time']),
+                end_time=datetime.fromisoformat(document['end_time']),
+                duration_minutes=document['duration_minutes'],
+                questions_answered=document['questions_answered'],
+                correct_answers=document['correct_answers'],
+                focus_score=document['focus_score'],
+                notes=document['notes']
+            ))
+
+        # Mevcut kullanıcılar gibi her ders için performans kaydı
+        for subject in catalog['subjects']:
+            performances.append(SubjectPerformance(
+                user=user,
+                subject=subject,
+                total_questions_answered=rng.randint(50, 500),
+                correct_answers=rng.randint(20, 50),
+                success_rate=rng.uniform(30, 90)
+            ))
+
+    created_records = ExamRecord.objects.bulk_create(exam_records)
+    ExamRecord.exam_topics.through.objects.bulk_create([
+        ExamRecord.exam_topics.through(examrecord_id=record.id, topic_id=topic.id)
+        for record, topics in zip(created_records, exam_topics) for topic in topics
+    ])
+    DailyTask.objects.bulk_create(tasks)
+    StudySession.objects.bulk_create(sessions)
+    SubjectPerformance.objects.bulk_create(performances)
+
+    return users
+
+
+def exam_submission(catalog: Dict[str, Any], question_count: int, seed: int = 42) -> Dict[str, Any]:
+    """submit_exam_result için istek gövdesi üret"""
+    rng = random.Random(seed)
+    questions = rng.sample(catalog['questions'], min(question_count, len(catalog['questions'])))
+
+    answers = []
+    for question in questions:
+        roll = rng.random()
+        user_answer = '' if roll < 0.15 else (question.correct_answer if roll < 0.7 else rng.choice(CHOICES))
+        answers.append({
+            'question_id': question.id,
+            'user_answer': user_answer,
+            'is_correct': user_answer == question.correct_answer,
+            'time_spent_seconds': rng.randint(20, 180)
+        })
+
+    correct = len([answer for answer in answers if answer['is_correct']])
+    empty = len([answer for answer in answers if not answer['user_answer']])
+    return {
+        'exam_category_id': catalog['category'].id,
+        'total_questions': len(answers),
+        'correct_answers': correct,
+        'wrong_answers': len(answers) - correct - empty,
+        'empty_answers': empty,
+        'duration_minutes': 135,
+        'question_answers': answers
+    }
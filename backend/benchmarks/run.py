@@ -0,0 +1,89 @@
+"""
+YÖN App - Analiz Benchmark Çalıştırıcısı
+Sentetik veriyi geçici bir test veritabanına yükler, analiz metotlarını ve
+submit_exam_result'ı ölçer, sonuçları commit'ler arası karşılaştırma için JSON'a yazar.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.run --sizes small,medium --output benchmark_results.json
+    python -m benchmarks.run --sizes large --source django
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yon_backend.settings')
+django.setup()
+
+from django.db import connection
+
+from benchmarks.generator import SIZES
+from benchmarks.suite import run_size
+
+
+def current_commit() -> str:
+    """Çalışılan git commit'i (git yoksa 'unknown')"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return 'unknown'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analiz benchmark paketi')
+    parser.add_argument('--sizes', default='small,medium', help=f"Virgülle ayrılmış boyutlar ({', '.join(SIZES)})")
+    parser.add_argument('--source', default='memory', choices=['memory', 'django'],
+                        help='Analizlerin okuyacağı veri kaynağı')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args(argv)
+
+    size_names = [name.strip() for name in args.sizes.split(',') if name.strip()]
+    for name in size_names:
+        if name not in SIZES:
+            parser.error(f"Bilinmeyen boyut: {name}")
+
+    report = {
+        'commit': current_commit(),
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'source': args.source,
+        'seed': args.seed,
+        'results': []
+    }
+
+    # Her boyut boş bir test veritabanında çalışır, gerçek veritabanına dokunulmaz
+    old_name = connection.settings_dict['NAME']
+    tracemalloc.start()
+    try:
+        for name in size_names:
+            connection.creation.create_test_db(verbosity=0, serialize=False)
+            try:
+                print(f"⏱️ {name} boyutu çalışıyor: {SIZES[name]}")
+                for result in run_size(name, SIZES[name], args.source, args.seed):
+                    report['results'].append(result)
+                    status = f"❌ {result['error']}" if 'error' in result else '✅'
+                    print(f"  {result['benchmark']}: {result['wall_time_ms']} ms, "
+                          f"{result['db_queries']} sorgu, {result['peak_memory_kb']} KB {status}")
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        tracemalloc.stop()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 Sonuçlar yazıldı: {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,178 @@
+"""
+YÖN App - Analiz Benchmark Senaryoları
+Her senaryo için duvar saati süresi, ORM sorgu sayısı, veri kaynağı okumaları ve
+en yüksek bellek kullanımı ölçülür.
+"""
+
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from analytics.analysis_service import ComprehensiveAnalyzer
+from analytics.analysis_algorithm import ExamAnalyzer
+from analytics.data_sources import InMemoryDataSource, DjangoDataSource
+from coaching.jobs import recommendation_worker, run_pending
+from coaching.views import UserExamAttemptViewSet
+from .exam_analyzer import generate_attempts
+from .generator import create_catalog, create_users, generate_documents, exam_submission
+
+# Kullanıcı başına ayrı analyzer ile ölçülen ComprehensiveAnalyzer metotları
+ANALYZER_METHODS = [
+    'analyze_exam_performance',
+    'analyze_task_completion',
+    'analyze_study_patterns',
+    'analyze_topic_performance',
+    'calculate_study_streak',
+    'get_comprehensive_analysis',
+]
+
+
+def measure(name: str, size_name: str, size: Dict[str, int], func: Callable[[], Any],
+            read_stats: Callable[[], Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Fonksiyonu çalıştır ve ölçümleri döndür
+
+    Args:
+        name: Senaryo adı
+        size_name: Boyut adı (small, medium, large)
+        size: Boyut sözlüğü
+        func: Ölçülecek fonksiyon
+        read_stats: Çalıştıktan sonra veri kaynağı okumalarını döndüren fonksiyon
+    """
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        error = None
+        try:
+            func()
+        except Exception as e:
+            error = str(e)
+        wall_time = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+
+    result = {
+        'benchmark': name,
+        'size': size_name,
+        'params': dict(size),
+        'wall_time_ms': round(wall_time * 1000, 3),
+        'db_queries': len(queries.captured_queries),
+        'peak_memory_kb': round((peak - baseline) / 1024, 1),
+    }
+    if read_stats is not None:
+        stats = read_stats()
+        result['source_queries'] = stats['queries']
+        result['source_documents'] = stats['documents']
+    if error:
+        result['error'] = error
+    return result
+
+
+def _total_reads(sources: List) -> Dict[str, int]:
+    """Veri kaynaklarının okuma sayılarını topla"""
+    stats = [source.get_read_stats() for source in sources]
+    return {
+        'queries': sum(item['queries'] for item in stats),
+        'documents': sum(item['documents'] for item in stats)
+    }
+
+
+def run_analyzer_benchmarks(size_name: str, size: Dict[str, int], users: List, source_factory: Callable) -> List[Dict[str, Any]]:
+    """ComprehensiveAnalyzer metotlarını tüm kullanıcılar için ayrı analyzer örnekleriyle ölç"""
+    results = []
+    for method in ANALYZER_METHODS:
+        sources = []
+
+        def run():
+            for user in users:
+                source = source_factory()
+                sources.append(source)
+                getattr(ComprehensiveAnalyzer(user, data_source=source), method)()
+
+        results.append(measure(f'ComprehensiveAnalyzer.{method}', size_name, size, run,
+                               lambda: _total_reads(sources)))
+
+    sources = []
+
+    def run_subject_topics():
+        for user in users:
+            source = source_factory()
+            sources.append(source)
+            ComprehensiveAnalyzer(user, data_source=source).get_subject_topic_analysis('tyt_matematik')
+
+    results.append(measure('ComprehensiveAnalyzer.get_subject_topic_analysis', size_name, size,
+                           run_subject_topics, lambda: _total_reads(sources)))
+    return results
+
+
+def run_exam_analyzer_benchmarks(size_name: str, size: Dict[str, int], seed: int) -> List[Dict[str, Any]]:
+    """ExamAnalyzer sözlük ve toplu analizlerini ölç (kullanıcı x deneme kadar deneme)"""
+    analyzer = ExamAnalyzer()
+    attempt_lists = generate_attempts(size['users'] * size['exams'], size['questions'], 16, seed)
+    return [
+        measure('ExamAnalyzer.analyze_question_attempts', size_name, size,
+                lambda: [analyzer.analyze_question_attempts(attempts) for attempts in attempt_lists]),
+        measure('ExamAnalyzer.analyze_attempts_batch', size_name, size,
+                lambda: analyzer.analyze_attempts_batch(attempt_lists)),
+    ]
+
+
+def run_submit_benchmark(size_name: str, size: Dict[str, int], users: List, catalog: Dict[str, Any], seed: int) -> List[Dict[str, Any]]:
+    """
+    Her kullanıcı için bir sınav sonucu gönder (coaching submit_exam_result),
+    ardından kuyruğa alınan öneri işlerini ayrı ölç
+    """
+    factory = APIRequestFactory()
+    view = UserExamAttemptViewSet.as_view({'post': 'submit_exam_result'})
+    payloads = [exam_submission(catalog, size['questions'], seed + index) for index in range(len(users))]
+    errors = []
+
+    def run():
+        for user, payload in zip(users, payloads):
+            request = factory.post('/api/coaching/exam-attempts/submit_exam_result/', payload, format='json')
+            force_authenticate(request, user=user)
+            response = view(request)
+            if response.status_code >= 400:
+                errors.append(response.data)
+
+    # Öneri işleri arka plan iş parçacığında değil, aşağıda ayrı ölçülür
+    autostart = recommendation_worker.autostart
+    recommendation_worker.autostart = False
+    try:
+        result = measure('coaching.submit_exam_result', size_name, size, run)
+    finally:
+        recommendation_worker.autostart = autostart
+    if errors:
+        result['error'] = str(errors[0])
+
+    return [
+        result,
+        measure('coaching.recommendation_jobs', size_name, size, lambda: run_pending(limit=len(users))),
+    ]
+
+
+def run_size(size_name: str, size: Dict[str, int], source: str = 'memory', seed: int = 42) -> List[Dict[str, Any]]:
+    """Bir boyut için veriyi üret ve tüm senaryoları çalıştır"""
+    catalog = create_catalog(seed=seed)
+    users = create_users(size, catalog, seed=seed)
+
+    if source == 'django':
+        source_factory = DjangoDataSource
+    else:
+        documents = generate_documents(size, catalog['topics'], seed=seed)
+        topics = [
+            {'id': str(topic.id), 'name': topic.name, 'subject_code': topic.subject.name.lower().replace(' ', '_')}
+            for topic in catalog['topics']
+        ]
+        source_factory = lambda: InMemoryDataSource(documents, topics)
+
+    results = run_analyzer_benchmarks(size_name, size, users, source_factory)
+    results.extend(run_exam_analyzer_benchmarks(size_name, size, seed))
+    results.extend(run_submit_benchmark(size_name, size, users, catalog, seed))
+    return results
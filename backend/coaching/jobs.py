@@ -0,0 +1,178 @@
+"""
+YÖN App - Öneri İş Kuyruğu
+Dış bir broker gerektirmeyen, veritabanı tabanlı kuyruk. Sınav gönderimi sadece
+kullanıcının RecommendationJob kaydını oluşturur/günceller (tek sorgu); aynı
+kullanıcı için tekrar eden tetiklemeler tek işte birleşir. İşler süreç içindeki
+arka plan iş parçacığı veya run_recommendation_worker komutu tarafından işlenir;
+birden çok işçi çalışabilir, her iş koşullu UPDATE ile tek işçi tarafından sahiplenilir.
+"""
+
+import atexit
+import threading
+from datetime import timedelta
+from typing import Dict
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RecommendationJob
+from .recommendations import expire_recommendations, refresh_recommendations
+
+# Başarısız iş bu kadar denemeden sonra silinir
+MAX_ATTEMPTS = 5
+# Bu kadar saniyedir bitmeyen sahiplenme (çöken işçi) geçersiz sayılır
+CLAIM_TIMEOUT = 600
+
+
+def enqueue_recommendations(user_id: int) -> None:
+    """
+    Kullanıcı için öneri üretimini kuyruğa al.
+    Bekleyen iş varsa sadece requested_at güncellenir; işçi commit sonrası uyandırılır.
+    """
+    RecommendationJob.objects.bulk_create(
+        [RecommendationJob(user_id=user_id, requested_at=timezone.now())],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['requested_at']
+    )
+    if recommendation_worker.autostart:
+        transaction.on_commit(recommendation_worker.wake)
+
+
+def run_pending(limit: int = 100, delay: float = 0) -> Dict[str, int]:
+    """
+    Bekleyen işleri en eskiden başlayarak işle
+
+    Args:
+        limit: En fazla işlenecek iş sayısı
+        delay: Son tetiklenmesinden bu kadar saniye geçmemiş işler bekletilir
+               (art arda gelen tetiklemelerin birleşmesi için)
+
+    Returns:
+        Dict: processed, failed
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=delay)
+    claimable = Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=CLAIM_TIMEOUT))
+    jobs = list(
+        RecommendationJob.objects.filter(claimable, requested_at__lte=cutoff)
+        .order_by('requested_at').values_list('id', 'user_id', 'requested_at', 'attempts')[:limit]
+    )
+
+    processed = failed = 0
+    for job_id, user_id, requested_at, attempts in jobs:
+        # Tek UPDATE ile sahiplen; başka işçi önce aldıysa iş atlanır
+        if not RecommendationJob.objects.filter(claimable, pk=job_id).update(claimed_at=timezone.now()):
+            continue
+
+        try:
+            refresh_recommendations(user_id)
+        except Exception as e:
+            failed += 1
+            print(f"❌ Öneri işi başarısız (kullanıcı {user_id}): {e}")
+            if attempts + 1 >= MAX_ATTEMPTS:
+                RecommendationJob.objects.filter(pk=job_id).delete()
+            else:
+                RecommendationJob.objects.filter(pk=job_id).update(
+                    attempts=attempts + 1, last_error=str(e), claimed_at=None
+                )
+            continue
+
+        # İşlenirken yeniden tetiklendiyse (requested_at değiştiyse) iş serbest bırakılır ve kuyrukta kalır
+        if not RecommendationJob.objects.filter(pk=job_id, requested_at=requested_at).delete()[0]:
+            RecommendationJob.objects.filter(pk=job_id).update(claimed_at=None)
+        processed += 1
+
+    return {'processed': processed, 'failed': failed}
+
+
+class RecommendationWorker:
+    """
+    Süreç içi arka plan işçisi: wake() ile veya poll_interval saniyede bir kuyruğu işler,
+    expire_interval saniyede bir süresi dolan önerileri siler.
+
+    Args:
+        poll_interval: Kuyruk kontrolleri arasındaki süre (saniye)
+        expire_interval: Süresi dolan önerilerin silinme aralığı (saniye)
+        autostart: enqueue sonrası iş parçacığı otomatik başlatılsın mı
+    """
+
+    def __init__(self, poll_interval: float = 5, expire_interval: float = 3600, autostart: bool = True):
+        self.poll_interval = poll_interval
+        self.expire_interval = expire_interval
+        self.autostart = autostart
+        self.processed = 0
+        self.failed = 0
+        self.expired = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._expired_at = None
+
+    def wake(self) -> None:
+        self._ensure_worker()
+        self._wake.set()
+
+    def run_once(self, limit: int = 100) -> Dict[str, int]:
+        """Kuyruğu bir kez işle, gerekiyorsa süresi dolan önerileri sil"""
+        result = run_pending(limit)
+        self.processed += result['processed']
+        self.failed += result['failed']
+
+        now = timezone.now()
+        if self._expired_at is None or (now - self._expired_at).total_seconds() >= self.expire_interval:
+            self.expired += expire_recommendations(now)
+            self._expired_at = now
+        return result
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name='recommendation-worker', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                close_old_connections()
+                # Kuyruk boşalana kadar parça parça işle
+                while self.run_once()['processed']:
+                    pass
+            except Exception as e:
+                print(f"❌ Öneri işçisi hatası: {e}")
+            finally:
+                connection.close()
+
+    def stop(self):
+        """Arka plan iş parçacığını durdur"""
+        self._stop.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.poll_interval + 5)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'pending': RecommendationJob.objects.count(),
+            'processed': self.processed,
+            'failed': self.failed,
+            'expired': self.expired
+        }
+
+
+recommendation_worker = RecommendationWorker(
+    poll_interval=getattr(settings, 'RECOMMENDATION_WORKER_POLL_INTERVAL', 5),
+    expire_interval=getattr(settings, 'RECOMMENDATION_EXPIRE_INTERVAL', 3600),
+    autostart=getattr(settings, 'RECOMMENDATION_WORKER_AUTOSTART', True)
+)
+atexit.register(recommendation_worker.stop)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from coaching.progress import reconcile_progress
+
+
+class Command(BaseCommand):
+    help = 'Kullanıcı ilerlemelerini (deneme sayısı, ortalama skor, zayıf/güçlü dersler) denemelerden yeniden hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', help='Sadece bu kullanıcı id(ler)i')
+        parser.add_argument('--batch-size', type=int, default=500, help='Tek seferde işlenecek kullanıcı sayısı')
+
+    def handle(self, *args, **options):
+        result = reconcile_progress(options['user'], options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ İlerlemeler uzlaştırıldı: {result['users']} kullanıcı, "
+                f"{result['updated']} güncellendi, {result['created']} oluşturuldu"
+            )
+        )
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from coaching.jobs import run_pending
+from coaching.recommendations import expire_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Bekleyen koçluk önerisi işlerini işler ve süresi dolan önerileri siler'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Kuyruğu bir kez işleyip çık')
+        parser.add_argument('--interval', type=float, default=5, help='Kuyruk kontrol aralığı (saniye)')
+        parser.add_argument('--limit', type=int, default=100, help='Tek seferde işlenecek en fazla iş')
+        parser.add_argument(
+            '--delay',
+            type=float,
+            default=0,
+            help='Son tetiklenmesinden bu kadar saniye geçmemiş işleri beklet (tetiklemeleri birleştirir)'
+        )
+        parser.add_argument('--expire-interval', type=float, default=3600, help='Süresi dolan önerileri silme aralığı (saniye)')
+
+    def handle(self, *args, **options):
+        expired_at = None
+        while True:
+            result = run_pending(options['limit'], options['delay'])
+            if result['processed'] or result['failed']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {result['processed']} öneri işi işlendi, {result['failed']} başarısız"
+                ))
+
+            now = timezone.now()
+            if expired_at is None or (now - expired_at).total_seconds() >= options['expire_interval']:
+                expired = expire_recommendations(now)
+                expired_at = now
+                if expired:
+                    self.stdout.write(self.style.SUCCESS(f"✅ Süresi dolan {expired} öneri silindi"))
+
+            if options['once']:
+                break
+            # Kuyruk dolu ise beklemeden devam et
+            if result['processed'] < options['limit']:
+                time.sleep(options['interval'])
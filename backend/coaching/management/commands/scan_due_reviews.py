@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from coaching.reviews import scan_due_reviews
+
+
+class Command(BaseCommand):
+    help = (
+        'Tekrar zamanı gelen konuları işaretler ve kullanıcılara hatırlatma bildirimi oluşturur. '
+        'Periyodik çalıştırılmalıdır (--interval ile sürekli veya cron ile, örn. 5 dakikada bir)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Tek seferde işaretlenecek kayıt sayısı')
+        parser.add_argument(
+            '--interval',
+            type=int,
+            help='Verilirse bu kadar saniyede bir tekrar tarar (periyodik çalışma)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                result = scan_due_reviews(chunk_size=options['chunk_size'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {result['reviews']} tekrar işaretlendi, {result['notifications']} bildirim oluşturuldu"
+                ))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Tekrar taraması başarısız: {e}'))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_performance(apps, schema_editor):
+    """
+    Mevcut cevaplardan konu ve ders toplamlarını oluştur (coaching.performance ile aynı eşikler).
+    Ders toplamları konu toplamlarının toplamıdır; oranlar bu toplamlardan hesaplanır.
+    Cevabı olmayan eski ders kayıtlarının sayıları korunur.
+    """
+    SubjectPerformance = apps.get_model('coaching', 'SubjectPerformance')
+    TopicPerformance = apps.get_model('coaching', 'TopicPerformance')
+    UserQuestionAnswer = apps.get_model('coaching', 'UserQuestionAnswer')
+
+    rows = UserQuestionAnswer.objects.values(
+        'exam_attempt__user_id', 'question__topic_id', 'question__topic__subject_id', 'question__topic__name'
+    ).annotate(
+        total=Count('id'), correct=Count('id', filter=Q(is_correct=True)), time=Sum('time_spent_seconds')
+    )
+    topic_performances = []
+    subject_totals = {}
+    rated = {}
+    for row in rows:
+        success_rate = row['correct'] / row['total'] * 100
+        topic_performances.append(TopicPerformance(
+            user_id=row['exam_attempt__user_id'],
+            topic_id=row['question__topic_id'],
+            subject_id=row['question__topic__subject_id'],
+            total_questions_answered=row['total'],
+            correct_answers=row['correct'],
+            total_time_seconds=row['time'] or 0,
+            success_rate=success_rate
+        ))
+        key = (row['exam_attempt__user_id'], row['question__topic__subject_id'])
+        totals = subject_totals.setdefault(key, {'total': 0, 'correct': 0, 'time': 0})
+        totals['total'] += row['total']
+        totals['correct'] += row['correct']
+        totals['time'] += row['time'] or 0
+        if row['total'] >= 3:
+            rated.setdefault(key, []).append((success_rate, row['question__topic__name']))
+    TopicPerformance.objects.bulk_create(topic_performances, batch_size=500)
+
+    performances = list(SubjectPerformance.objects.all())
+    existing = {(performance.user_id, performance.subject_id) for performance in performances}
+    new_performances = [
+        SubjectPerformance(user_id=user_id, subject_id=subject_id)
+        for user_id, subject_id in subject_totals if (user_id, subject_id) not in existing
+    ]
+
+    for performance in performances + new_performances:
+        key = (performance.user_id, performance.subject_id)
+        totals = subject_totals.get(key)
+        if totals is None:
+            performance.total_time_seconds = round(performance.average_time_per_question * performance.total_questions_answered)
+            continue
+        performance.total_questions_answered = totals['total']
+        performance.correct_answers = totals['correct']
+        performance.total_time_seconds = totals['time']
+        performance.success_rate = totals['correct'] / totals['total'] * 100
+        performance.average_time_per_question = totals['time'] / totals['total']
+        topics = rated.get(key, [])
+        performance.weak_topics = [name for rate, name in sorted(topics) if rate < 60]
+        performance.strong_topics = [name for rate, name in sorted(topics, reverse=True) if rate >= 80]
+
+    SubjectPerformance.objects.bulk_update(
+        performances,
+        ['total_questions_answered', 'correct_answers', 'total_time_seconds', 'success_rate',
+         'average_time_per_question', 'weak_topics', 'strong_topics'],
+        batch_size=500
+    )
+    SubjectPerformance.objects.bulk_create(new_performances, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0004_alter_userquestionanswer_options_and_more'),
+        ('exams', '0008_firebase_catalog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subjectperformance',
+            name='total_time_seconds',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TopicPerformance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_questions_answered', models.IntegerField(default=0)),
+                ('correct_answers', models.IntegerField(default=0)),
+                ('total_time_seconds', models.IntegerField(default=0)),
+                ('success_rate', models.FloatField(default=0.0)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exams.subject')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exams.topic')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='topic_performances', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Konu Performansı',
+                'verbose_name_plural': 'Konu Performansları',
+                'db_table': 'topic_performances',
+                'indexes': [models.Index(fields=['user', 'subject'], name='topic_perfo_user_id_47334d_idx')],
+                'unique_together': {('user', 'topic')},
+            },
+        ),
+        migrations.RunPython(fill_performance, migrations.RunPython.noop),
+    ]
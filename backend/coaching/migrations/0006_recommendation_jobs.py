@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0005_topic_performance'),
+        ('exams', '0008_firebase_catalog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requested_at', models.DateTimeField()),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Öneri İşi',
+                'verbose_name_plural': 'Öneri İşleri',
+                'db_table': 'recommendation_jobs',
+                'ordering': ['requested_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='coachingrecommendation',
+            index=models.Index(fields=['user', 'recommendation_type', 'subject'], name='coaching_re_user_id_26984d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coachingrecommendation',
+            index=models.Index(fields=['valid_until'], name='coaching_re_valid_u_6ba607_idx'),
+        ),
+        migrations.AddField(
+            model_name='recommendationjob',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation_job', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
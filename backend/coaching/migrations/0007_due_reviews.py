@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:35
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def mark_due_reviews(apps, schema_editor):
+    """Tekrar zamanı geçmiş veya hiç planlanmamış kayıtları işaretle (bildirim gönderilmez)"""
+    SpacedRepetition = apps.get_model('coaching', 'SpacedRepetition')
+    SpacedRepetition.objects.filter(is_active=True).filter(
+        Q(next_review__lte=timezone.now()) | Q(next_review__isnull=True)
+    ).update(is_due=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0006_recommendation_jobs'),
+        ('exams', '0008_firebase_catalog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spacedrepetition',
+            name='is_due',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_due_reviews, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='spacedrepetition',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_due', False)), fields=['next_review'], name='spaced_rep_due_scan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spacedrepetition',
+            index=models.Index(fields=['user', 'is_due'], name='spaced_repe_user_id_429ead_idx'),
+        ),
+    ]
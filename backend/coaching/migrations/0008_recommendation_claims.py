@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_recommendations(apps, schema_editor):
+    """(kullanıcı, tür, ders) başına en uzun geçerli (eşitse en yeni) öneriyi bırak"""
+    CoachingRecommendation = apps.get_model('coaching', 'CoachingRecommendation')
+    seen = set()
+    duplicates = []
+    rows = CoachingRecommendation.objects.filter(subject__isnull=False).order_by(
+        'user_id', 'recommendation_type', 'subject_id', '-valid_until', '-id'
+    ).values_list('id', 'user_id', 'recommendation_type', 'subject_id')
+    for recommendation_id, *key in rows:
+        key = tuple(key)
+        if key in seen:
+            duplicates.append(recommendation_id)
+        seen.add(key)
+    for start in range(0, len(duplicates), 500):
+        CoachingRecommendation.objects.filter(id__in=duplicates[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0007_due_reviews'),
+        ('exams', '0008_firebase_catalog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='coachingrecommendation',
+            name='coaching_re_user_id_26984d_idx',
+        ),
+        migrations.AddField(
+            model_name='recommendationjob',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(remove_duplicate_recommendations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='coachingrecommendation',
+            constraint=models.UniqueConstraint(fields=('user', 'recommendation_type', 'subject'), name='unique_user_recommendation'),
+        ),
+    ]
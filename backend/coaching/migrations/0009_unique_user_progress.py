@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:03
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg, Count
+
+
+def merge_duplicate_progress(apps, schema_editor):
+    """
+    Kullanıcı başına birden fazla ilerleme satırını en eski satırda birleştir.
+    Deneme sayısı ve ortalama skor denemelerden yeniden hesaplanır (reconcile_progress gibi);
+    zayıf/güçlü dersler en son güncellenen satırdan alınır.
+    """
+    UserProgress = apps.get_model('coaching', 'UserProgress')
+    UserExamAttempt = apps.get_model('coaching', 'UserExamAttempt')
+
+    user_ids = list(
+        UserProgress.objects.order_by().values('user_id').annotate(rows=Count('id'))
+        .filter(rows__gt=1).values_list('user_id', flat=True)
+    )
+    for user_id in user_ids:
+        rows = list(UserProgress.objects.filter(user_id=user_id).order_by('id'))
+        keep, latest = rows[0], max(rows, key=lambda row: (row.updated_at, row.id))
+        attempts = UserExamAttempt.objects.filter(user_id=user_id).aggregate(count=Count('id'), average=Avg('score'))
+
+        keep.total_exam_attempts = attempts['count']
+        keep.average_score = attempts['average'] or 0
+        keep.weak_subjects = latest.weak_subjects
+        keep.strong_subjects = latest.strong_subjects
+        keep.total_study_hours = max(row.total_study_hours for row in rows)
+        keep.streak_days = max(row.streak_days for row in rows)
+        keep.last_study_date = max((row.last_study_date for row in rows if row.last_study_date), default=None)
+        keep.save()
+        UserProgress.objects.filter(id__in=[row.id for row in rows[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0008_recommendation_claims'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_progress, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userprogress',
+            constraint=models.UniqueConstraint(fields=('user',), name='unique_user_progress'),
+        ),
+    ]
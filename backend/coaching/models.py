@@ -60,6 +60,7 @@ class SubjectPerformance(models.Model):
     correct_answers = models.IntegerField(default=0)
     success_rate = models.FloatField(default=0.0)  # Başarı oranı %
     average_time_per_question = models.FloatField(default=0.0)  # Soru başına ortalama süre
+    total_time_seconds = models.IntegerField(default=0)  # Cevaplarda harcanan toplam süre
     weak_topics = models.JSONField(default=list)  # Zayıf olduğu konular
     strong_topics = models.JSONField(default=list)  # Güçlü olduğu konular
     last_updated = models.DateTimeField(auto_now=True)
@@ -74,6 +75,33 @@ class SubjectPerformance(models.Model):
         verbose_name_plural = 'Ders Performansları'
 
 
+class TopicPerformance(models.Model):
+    """
+    Kullanıcının konu bazlı cevap toplamları
+    (SubjectPerformance.weak_topics / strong_topics bunlardan hesaplanır)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='topic_performances')
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    total_questions_answered = models.IntegerField(default=0)
+    correct_answers = models.IntegerField(default=0)
+    total_time_seconds = models.IntegerField(default=0)
+    success_rate = models.FloatField(default=0.0)  # Başarı oranı %
+    last_updated = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.topic.name} (%{self.success_rate:.1f})"
+    
+    class Meta:
+        db_table = 'topic_performances'
+        unique_together = ['user', 'topic']
+        indexes = [
+            models.Index(fields=['user', 'subject']),
+        ]
+        verbose_name = 'Konu Performansı'
+        verbose_name_plural = 'Konu Performansları'
+
+
 class StudyPlan(models.Model):
     """
     Kişiselleştirilmiş çalışma planları
@@ -139,6 +167,33 @@ class CoachingRecommendation(models.Model):
         verbose_name = 'Koçluk Önerisi'
         verbose_name_plural = 'Koçluk Önerileri'
         ordering = ['-priority_score', '-created_at']
+        # (kullanıcı, tür, ders) başına tek öneri; süresi dolan kayıt yeniden kullanılır veya silinir
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'recommendation_type', 'subject'], name='unique_user_recommendation'),
+        ]
+        indexes = [
+            models.Index(fields=['valid_until']),
+        ]
+
+
+class RecommendationJob(models.Model):
+    """
+    Bekleyen öneri üretme işi (kullanıcı başına tek kayıt, tekrar eden istekler birleşir)
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='recommendation_job')
+    requested_at = models.DateTimeField()  # Son tetiklenme zamanı
+    claimed_at = models.DateTimeField(null=True, blank=True)  # İşleyen işçinin sahiplenme zamanı
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.requested_at}"
+    
+    class Meta:
+        db_table = 'recommendation_jobs'
+        verbose_name = 'Öneri İşi'
+        verbose_name_plural = 'Öneri İşleri'
+        ordering = ['requested_at']
 
 
 class UserProgress(models.Model):
@@ -163,6 +218,10 @@ class UserProgress(models.Model):
         db_table = 'user_progress'
         verbose_name = 'Kullanıcı İlerlemesi'
         verbose_name_plural = 'Kullanıcı İlerlemeleri'
+        constraints = [
+            # Kullanıcı başına tek ilerleme satırı (record_attempt eşzamanlı ilk gönderimde buna dayanır)
+            models.UniqueConstraint(fields=['user'], name='unique_user_progress'),
+        ]
 
 
 class SpacedRepetition(models.Model):
@@ -196,12 +255,19 @@ class SpacedRepetition(models.Model):
     
     # Durum
     is_active = models.BooleanField(default=True)
+    is_due = models.BooleanField(default=False)  # Tekrar zamanı geldi (coaching/reviews.py taramasıyla işaretlenir)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.user.username} - {self.topic.name} (Repetition {self.repetition_count})"
     
+    def save(self, *args, **kwargs):
+        # Henüz planlanmamış veya tarihi geçmiş tekrar hemen tekrar listesine girer
+        if self.pk is None and (self.next_review is None or self.is_due_for_review()):
+            self.is_due = True
+        super().save(*args, **kwargs)
+    
     def calculate_next_review(self, quality: int):
         """
         Spaced repetition algoritması
@@ -226,6 +292,7 @@ class SpacedRepetition(models.Model):
         # Sonraki tekrar tarihini hesapla
         from django.utils import timezone
         self.next_review = timezone.now() + timedelta(days=self.interval_days)
+        self.is_due = False
         
         # Performans güncelle
         if quality >= 3:
@@ -249,6 +316,16 @@ class SpacedRepetition(models.Model):
         verbose_name_plural = 'Spaced Repetitions'
         unique_together = ['user', 'topic']
         ordering = ['next_review']
+        indexes = [
+            # Tekrar zamanı tarama sorgusu (is_active, next_review): sadece aktif ve henüz
+            # işaretlenmemiş kayıtlar indekslenir, tarama next_review aralığında ilerler
+            models.Index(
+                fields=['next_review'],
+                condition=models.Q(is_active=True, is_due=False),
+                name='spaced_rep_due_scan_idx'
+            ),
+            models.Index(fields=['user', 'is_due']),
+        ]
 
 
 class StudySession(models.Model):
@@ -0,0 +1,162 @@
+"""
+YÖN App - Ders ve Konu Performansı
+Kullanıcı×ders (SubjectPerformance) ve kullanıcı×konu (TopicPerformance) için
+cevap sayısı, doğru sayısı ve toplam süre birikimli tutulur; oranlar bu
+toplamlardan hesaplanır. Zayıf/güçlü konular konu toplamlarından çıkarılır.
+Aynı kullanıcının eşzamanlı gönderimleri satır kilitleriyle sıralanır.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import SubjectPerformance, TopicPerformance
+
+# Zayıf / güçlü eşikleri (%)
+WEAK_RATE = 60
+STRONG_RATE = 80
+# Konunun zayıf/güçlü sayılması için gereken en az cevap
+MIN_TOPIC_ANSWERS = 3
+
+
+def _empty_stats() -> Dict[str, int]:
+    return {'total': 0, 'correct': 0, 'time': 0}
+
+
+def _apply(performance, stats: Dict[str, int]) -> None:
+    """Toplamları ekle ve oranları toplamlardan yeniden hesapla"""
+    performance.total_questions_answered += stats['total']
+    performance.correct_answers += stats['correct']
+    performance.total_time_seconds += stats['time']
+    if performance.total_questions_answered:
+        performance.success_rate = performance.correct_answers / performance.total_questions_answered * 100
+
+
+def topic_lists(topic_performances: Iterable[TopicPerformance]):
+    """
+    Konu toplamlarından zayıf ve güçlü konu adları
+
+    Returns:
+        Tuple: (zayıf konular - en düşük oran önce, güçlü konular - en yüksek oran önce)
+    """
+    rated = [
+        (performance.success_rate, performance.topic.name)
+        for performance in topic_performances
+        if performance.total_questions_answered >= MIN_TOPIC_ANSWERS
+    ]
+    weak = [name for rate, name in sorted(rated) if rate < WEAK_RATE]
+    strong = [name for rate, name in sorted(rated, reverse=True) if rate >= STRONG_RATE]
+    return weak, strong
+
+
+def record_answers(user, question_answers) -> List[SubjectPerformance]:
+    """
+    Bir sınavın cevaplarını kullanıcının ders ve konu toplamlarına ekle.
+    Aynı kullanıcının iki ilk gönderimi aynı satırı eklemeye çalışırsa kaybeden
+    gönderim, diğerinin eklediği satırları kilitleyerek bir kez daha denenir.
+
+    Args:
+        user: Kullanıcı
+        question_answers: UserQuestionAnswer listesi (question.topic.subject yüklenmiş olmalı)
+
+    Returns:
+        List: Kullanıcının tüm ders performansları (subject yüklenmiş)
+    """
+    question_answers = list(question_answers)
+    try:
+        with transaction.atomic():
+            return _record_answers(user, question_answers)
+    except IntegrityError:
+        with transaction.atomic():
+            return _record_answers(user, question_answers)
+
+
+def _record_answers(user, question_answers) -> List[SubjectPerformance]:
+    subject_stats = {}
+    topic_stats = {}
+    topics = {}
+    subjects = {}
+    for answer in question_answers:
+        topic = answer.question.topic
+        topics[topic.id] = topic
+        subjects[topic.subject_id] = topic.subject
+        for stats in (subject_stats.setdefault(topic.subject_id, _empty_stats()),
+                      topic_stats.setdefault(topic.id, _empty_stats())):
+            stats['total'] += 1
+            stats['correct'] += 1 if answer.is_correct else 0
+            stats['time'] += answer.time_spent_seconds
+
+    now = timezone.now()
+
+    # Etkilenen derslerin tüm konu toplamları (listeler için) tek sorguda, eşzamanlı gönderimler için kilitli
+    topic_performances = {
+        performance.topic_id: performance
+        for performance in TopicPerformance.objects.filter(
+            user=user, subject_id__in=subject_stats
+        ).select_related('topic').select_for_update(of=('self',))
+    }
+    new_topics = []
+    changed_topics = []
+    for topic_id, stats in topic_stats.items():
+        performance = topic_performances.get(topic_id)
+        if performance is None:
+            performance = TopicPerformance(user=user, topic=topics[topic_id], subject_id=topics[topic_id].subject_id)
+            topic_performances[topic_id] = performance
+            new_topics.append(performance)
+        else:
+            changed_topics.append(performance)
+        _apply(performance, stats)
+        performance.last_updated = now
+
+    TopicPerformance.objects.bulk_create(new_topics)
+    TopicPerformance.objects.bulk_update(
+        changed_topics,
+        ['total_questions_answered', 'correct_answers', 'total_time_seconds', 'success_rate', 'last_updated']
+    )
+
+    topics_by_subject = {}
+    for performance in topic_performances.values():
+        topics_by_subject.setdefault(performance.subject_id, []).append(performance)
+
+    performances = list(
+        SubjectPerformance.objects.filter(user=user).select_related('subject').select_for_update(of=('self',))
+    )
+    existing = {performance.subject_id: performance for performance in performances}
+    new_subjects = []
+    changed_subjects = []
+    for subject_id, stats in subject_stats.items():
+        performance = existing.get(subject_id)
+        if performance is None:
+            performance = SubjectPerformance(user=user, subject=subjects[subject_id])
+            performances.append(performance)
+            new_subjects.append(performance)
+        else:
+            changed_subjects.append(performance)
+        _apply(performance, stats)
+        performance.average_time_per_question = performance.total_time_seconds / performance.total_questions_answered
+        performance.weak_topics, performance.strong_topics = topic_lists(topics_by_subject[subject_id])
+        performance.last_updated = now
+
+    SubjectPerformance.objects.bulk_create(new_subjects)
+    SubjectPerformance.objects.bulk_update(
+        changed_subjects,
+        ['total_questions_answered', 'correct_answers', 'total_time_seconds', 'success_rate',
+         'average_time_per_question', 'weak_topics', 'strong_topics', 'last_updated']
+    )
+
+    return performances
+
+
+def weak_subjects(performances: Iterable[SubjectPerformance], limit: Optional[int] = None) -> List[SubjectPerformance]:
+    """Başarı oranı WEAK_RATE altındaki dersler (en zayıf önce)"""
+    weak = sorted(
+        (performance for performance in performances if performance.success_rate < WEAK_RATE),
+        key=lambda performance: performance.success_rate
+    )
+    return weak[:limit] if limit is not None else weak
+
+
+def strong_subjects(performances: Iterable[SubjectPerformance]) -> List[SubjectPerformance]:
+    """Başarı oranı STRONG_RATE ve üstündeki dersler"""
+    return [performance for performance in performances if performance.success_rate >= STRONG_RATE]
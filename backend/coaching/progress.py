@@ -0,0 +1,124 @@
+"""
+YÖN App - Kullanıcı İlerlemesi
+UserProgress deneme sayısı ve ortalama skoru her sınav gönderiminde tek UPDATE ile
+artımlı güncellenir (geçmiş denemeler taranmaz). Kullanıcı başına tek satır vardır;
+eşzamanlı ilk gönderimlerden biri satırı oluşturur, diğeri UPDATE'i tekrarlar.
+reconcile_progress bu alanları denemelerden yeniden hesaplar (reconcile_user_progress komutu).
+"""
+
+from typing import Dict, Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, F
+from django.utils import timezone
+
+from .models import UserExamAttempt, UserProgress, SubjectPerformance
+from .performance import weak_subjects, strong_subjects
+
+# Uzlaştırmada tek seferde işlenen kullanıcı sayısı
+RECONCILE_BATCH_SIZE = 500
+
+
+def _subject_lists(performances) -> Dict[str, list]:
+    return {
+        'weak_subjects': [performance.subject.name for performance in weak_subjects(performances)],
+        'strong_subjects': [performance.subject.name for performance in strong_subjects(performances)],
+    }
+
+
+def record_attempt(user, exam_attempt, performances: Iterable[SubjectPerformance]) -> None:
+    """
+    Yeni denemeyi kullanıcının ilerlemesine ekle (koşan ortalama)
+
+    Args:
+        user: Kullanıcı
+        exam_attempt: Yeni kaydedilen deneme
+        performances: Kullanıcının güncel ders performansları (zayıf/güçlü dersler için)
+    """
+    lists = _subject_lists(performances)
+    if _add_attempt(user, exam_attempt.score, lists):
+        return
+    try:
+        with transaction.atomic():
+            UserProgress.objects.create(
+                user=user,
+                total_exam_attempts=1,
+                average_score=exam_attempt.score,
+                **lists
+            )
+    except IntegrityError:
+        # Aynı kullanıcının eşzamanlı ilk gönderimi satırı önce oluşturdu
+        _add_attempt(user, exam_attempt.score, lists)
+
+
+def _add_attempt(user, score: float, lists: Dict[str, list]) -> int:
+    # average_score eski total_exam_attempts ile hesaplanır, bu yüzden önce yazılır
+    return UserProgress.objects.filter(user=user).update(
+        average_score=(F('average_score') * F('total_exam_attempts') + score) / (F('total_exam_attempts') + 1),
+        total_exam_attempts=F('total_exam_attempts') + 1,
+        updated_at=timezone.now(),
+        **lists
+    )
+
+
+def reconcile_progress(user_ids: Optional[Iterable[int]] = None,
+                       batch_size: int = RECONCILE_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Deneme sayısı, ortalama skor ve zayıf/güçlü dersleri kayıtlardan yeniden hesapla
+
+    Args:
+        user_ids: Sadece bu kullanıcılar (verilmezse denemesi veya ilerleme kaydı olan herkes)
+
+    Returns:
+        Dict: users, updated, created
+    """
+    if user_ids is None:
+        user_ids = set(UserExamAttempt.objects.values_list('user_id', flat=True).distinct())
+        user_ids |= set(UserProgress.objects.values_list('user_id', flat=True))
+    user_ids = sorted(set(user_ids))
+
+    updated = created = 0
+    for start in range(0, len(user_ids), batch_size):
+        chunk = user_ids[start:start + batch_size]
+        with transaction.atomic():
+            attempts = {
+                row['user_id']: row
+                for row in UserExamAttempt.objects.filter(user_id__in=chunk).values('user_id').annotate(
+                    count=Count('id'), average=Avg('score')
+                )
+            }
+            performances = {}
+            for performance in SubjectPerformance.objects.filter(user_id__in=chunk).select_related('subject'):
+                performances.setdefault(performance.user_id, []).append(performance)
+
+            now = timezone.now()
+            progress_rows = list(UserProgress.objects.filter(user_id__in=chunk))
+            for progress in progress_rows:
+                row = attempts.get(progress.user_id, {})
+                progress.total_exam_attempts = row.get('count', 0)
+                progress.average_score = row.get('average') or 0
+                lists = _subject_lists(performances.get(progress.user_id, []))
+                progress.weak_subjects = lists['weak_subjects']
+                progress.strong_subjects = lists['strong_subjects']
+                progress.updated_at = now
+            UserProgress.objects.bulk_update(
+                progress_rows,
+                ['total_exam_attempts', 'average_score', 'weak_subjects', 'strong_subjects', 'updated_at']
+            )
+
+            with_progress = {progress.user_id for progress in progress_rows}
+            new_rows = [
+                UserProgress(
+                    user_id=user_id,
+                    total_exam_attempts=row['count'],
+                    average_score=row['average'] or 0,
+                    **_subject_lists(performances.get(user_id, []))
+                )
+                for user_id, row in attempts.items() if user_id not in with_progress
+            ]
+            UserProgress.objects.bulk_create(new_rows)
+
+        updated += len(progress_rows)
+        created += len(new_rows)
+
+    return {'users': len(user_ids), 'updated': updated, 'created': created}
@@ -0,0 +1,88 @@
+"""
+YÖN App - Koçluk Önerileri
+Öneriler (kullanıcı, tür, ders) başına tektir (unique_user_recommendation): kayıt
+varsa yenisi eklenmez, mevcut kayıt güncellenir; süresi dolmuş kayıt okunmamış
+olarak yeniden kullanılır. Süresi dolan öneriler toplu silinir.
+Üretim istek yolunda değil, coaching.jobs kuyruğu üzerinden yapılır.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CoachingRecommendation, SubjectPerformance
+from .performance import weak_subjects
+
+# Önerilerin geçerlilik süresi
+VALID_DAYS = 7
+# Toplu silmede tek sorguda silinecek en fazla kayıt
+EXPIRE_BATCH_SIZE = 1000
+
+
+@transaction.atomic
+def refresh_recommendations(user_id: int) -> Dict[str, int]:
+    """
+    Kullanıcının zayıf dersleri için konu odaklı önerileri oluştur veya güncelle
+
+    Returns:
+        Dict: created, updated
+    """
+    now = timezone.now()
+    performances = SubjectPerformance.objects.filter(user_id=user_id).select_related('subject')
+
+    existing = {
+        recommendation.subject_id: recommendation
+        for recommendation in CoachingRecommendation.objects.filter(
+            user_id=user_id, recommendation_type='topic_focus'
+        )
+    }
+
+    created, updated = [], []
+    for subject_perf in weak_subjects(performances, limit=3):
+        recommendation = existing.get(subject_perf.subject_id)
+        if recommendation is None:
+            recommendation = CoachingRecommendation(
+                user_id=user_id,
+                recommendation_type='topic_focus',
+                subject=subject_perf.subject
+            )
+            created.append(recommendation)
+        else:
+            if recommendation.valid_until <= now:
+                # Süresi dolmuş öneri yeni öneri gibi gösterilir
+                recommendation.is_read = False
+                recommendation.is_applied = False
+            updated.append(recommendation)
+
+        recommendation.title = f'{subject_perf.subject.name} Odaklanın'
+        recommendation.description = f'{subject_perf.subject.name} dersinde başarı oranınız %{subject_perf.success_rate:.1f}. Bu derse daha fazla zaman ayırın.'
+        recommendation.priority_score = 80
+        recommendation.valid_until = now + timedelta(days=VALID_DAYS)
+
+    CoachingRecommendation.objects.bulk_create(created)
+    CoachingRecommendation.objects.bulk_update(
+        updated, ['title', 'description', 'priority_score', 'valid_until', 'is_read', 'is_applied']
+    )
+
+    return {'created': len(created), 'updated': len(updated)}
+
+
+def expire_recommendations(now: Optional[datetime] = None, batch_size: int = EXPIRE_BATCH_SIZE) -> int:
+    """
+    Geçerliliği dolmuş önerileri parça parça sil (her parça kısa bir yazma kilidi alır)
+
+    Returns:
+        int: Silinen öneri sayısı
+    """
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            CoachingRecommendation.objects.filter(valid_until__lte=now)
+            .order_by('valid_until').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += CoachingRecommendation.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,92 @@
+"""
+YÖN App - Tekrar Zamanı Taraması
+Tüm kullanıcıların tekrar zamanı gelen kayıtları (is_active, next_review) kısmi
+indeksi üzerinden next_review sırasıyla parça parça taranır, is_due olarak
+işaretlenir ve kullanıcı başına bir hatırlatma bildirimi toplu oluşturulur.
+
+Zamanlama: tarama istek yolunda veya uygulama içinde çalışmaz; scan_due_reviews
+komutu periyodik çalıştırılmalıdır, örn. sürekli süreç olarak
+`python manage.py scan_due_reviews --interval 300` veya cron ile
+`*/5 * * * * python manage.py scan_due_reviews`. Hatırlatmalar en fazla bu aralık
+kadar gecikir. due_reviews endpoint'i taramayı beklemez: işaretlenmiş kayıtlarla
+birlikte zamanı geçmiş ama henüz işaretlenmemiş kayıtları da döndürür.
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.models import Notification, NotificationSettings
+from .models import SpacedRepetition
+
+# Tek transaction'da işaretlenecek en fazla kayıt
+SCAN_CHUNK_SIZE = 1000
+
+
+def _notify(users: Dict[str, list]) -> int:
+    """
+    Kullanıcı başına bir tekrar hatırlatması oluştur.
+    Tekrar hatırlatmaları kapalı olanlar ve okunmamış hatırlatması olanlar atlanır.
+    """
+    uids = [uid for uid in users if uid]
+    if not uids:
+        return 0
+
+    skipped = set(NotificationSettings.objects.filter(
+        firebase_uid__in=uids, study_reminders=False
+    ).values_list('firebase_uid', flat=True))
+    skipped |= set(Notification.objects.filter(
+        firebase_uid__in=uids, is_read=False, notification_type='review_reminder'
+    ).values_list('firebase_uid', flat=True))
+
+    notifications = []
+    for uid in uids:
+        if uid in skipped:
+            continue
+        topics = users[uid]
+        notifications.append(Notification(
+            firebase_uid=uid,
+            notification_type='review_reminder',
+            title='Tekrar zamanı',
+            message=f"{len(topics)} konunun tekrar zamanı geldi: {', '.join(topics[:3])}" + ('...' if len(topics) > 3 else ''),
+            data={'topics': topics},
+            priority='medium'
+        ))
+    Notification.objects.bulk_create(notifications, batch_size=500)
+    return len(notifications)
+
+
+def scan_due_reviews(now: Optional[datetime] = None, chunk_size: int = SCAN_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Tekrar zamanı gelen kayıtları işaretle ve hatırlatma bildirimlerini oluştur.
+    İşaretlenen kayıtlar kısmi indeksten çıktığı için her parça bir sonrakinden bağımsızdır.
+
+    Returns:
+        Dict: reviews (işaretlenen kayıt), notifications (oluşturulan bildirim)
+    """
+    now = now or timezone.now()
+    reviews = notifications = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                SpacedRepetition.objects.filter(is_active=True, is_due=False, next_review__lte=now)
+                .order_by('next_review', 'id')
+                .values_list('id', 'user__firebase_uid', 'topic__name')[:chunk_size]
+            )
+            if not rows:
+                break
+
+            SpacedRepetition.objects.filter(id__in=[row[0] for row in rows]).update(is_due=True, updated_at=now)
+
+            users = {}
+            for _, uid, topic_name in rows:
+                users.setdefault(uid, []).append(topic_name)
+            notifications += _notify(users)
+
+        reviews += len(rows)
+        if len(rows) < chunk_size:
+            break
+
+    return {'reviews': reviews, 'notifications': notifications}
@@ -1,3 +1,359 @@
+import importlib
+from datetime import timedelta
+from unittest import mock
+
+from django.apps import apps
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from users.models import User
+from exams.models import ExamCategory, Subject, Topic, Question
+from notifications.models import Notification
+from . import jobs, progress as progress_module
+from .jobs import enqueue_recommendations, run_pending
+from .models import (
+    UserExamAttempt, UserQuestionAnswer, SubjectPerformance, TopicPerformance,
+    CoachingRecommendation, RecommendationJob, UserProgress, SpacedRepetition
+)
+from .progress import record_attempt, reconcile_progress
+from .recommendations import refresh_recommendations, expire_recommendations
+from .reviews import scan_due_reviews
+from .views import UserExamAttemptViewSet, SpacedRepetitionViewSet
+
+
+class SubmitExamResultTests(TestCase):
+    # Soru sayısından bağımsız, sabit sorgu sınırı
+    MAX_QUERIES = 25
+
+    def setUp(self):
+        self.user = User.objects.create(username='ogrenci', email='ogrenci@example.com', firebase_uid='uid-1')
+        self.category = ExamCategory.objects.create(name='TYT', category_type='TYT')
+        self.questions = []
+        for subject_index in range(3):
+            subject = Subject.objects.create(category=self.category, name=f'Ders {subject_index}')
+            for topic_index in range(4):
+                topic = Topic.objects.create(subject=subject, name=f'Konu {subject_index}-{topic_index}')
+                for question_index in range(10):
+                    self.questions.append(Question.objects.create(
+                        topic=topic,
+                        question_text=f'Soru {question_index}',
+                        correct_answer='A'
+                    ))
+
+    def submit(self, questions, correct=None):
+        if correct is None:
+            correct = [bool(index % 3) for index in range(len(questions))]
+        payload = {
+            'exam_category_id': self.category.id,
+            'total_questions': len(questions),
+            'correct_answers': sum(correct),
+            'wrong_answers': len(questions) - sum(correct),
+            'empty_answers': 0,
+            'duration_minutes': 90,
+            'question_answers': [
+                {
+                    'question_id': question.id,
+                    'user_answer': 'A' if correct[index] else 'B',
+                    'is_correct': correct[index],
+                    'time_spent_seconds': 30
+                }
+                for index, question in enumerate(questions)
+            ]
+        }
+        request = APIRequestFactory().post('/api/coaching/exam-attempts/submit_exam_result/', payload, format='json')
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = UserExamAttemptViewSet.as_view({'post': 'submit_exam_result'})(request)
+        return response, len(queries.captured_queries)
+
+    def test_query_count_does_not_grow_with_answers(self):
+        response, first_count = self.submit(self.questions)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(first_count, self.MAX_QUERIES)
+
+        # Performans kayıtları artık mevcut: küçük ve büyük sınav aynı sayıda sorgu yapmalı
+        response, small_count = self.submit(self.questions[:6])
+        self.assertEqual(response.status_code, 200)
+        response, large_count = self.submit(self.questions)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, self.MAX_QUERIES)
+        self.assertEqual(UserQuestionAnswer.objects.count(), 6 + 2 * len(self.questions))
+        self.assertEqual(RecommendationJob.objects.filter(user=self.user).count(), 1)
+
+    def test_subject_performance_accumulates(self):
+        self.submit(self.questions)
+        self.submit(self.questions)
+
+        performances = SubjectPerformance.objects.filter(user=self.user)
+        self.assertEqual(performances.count(), 3)
+        for performance in performances:
+            self.assertEqual(performance.total_questions_answered, 80)
+            self.assertAlmostEqual(performance.success_rate, performance.correct_answers / 80 * 100)
+
+    def test_unknown_question_is_rejected(self):
+        questions = self.questions[:2]
+        Question.objects.filter(pk=questions[1].pk).delete()
+
+        response, _ = self.submit(questions)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UserExamAttempt.objects.exists())
+
+    def test_topic_lists_follow_topic_totals(self):
+        # Ders 0: ilk iki konu hep yanlış, diğer konular hep doğru
+        answers = [
+            (question, question.topic.name not in ('Konu 0-0', 'Konu 0-1'))
+            for question in self.questions[:40]
+        ]
+        self.submit([question for question, _ in answers], correct=[is_correct for _, is_correct in answers])
+
+        performance = SubjectPerformance.objects.get(user=self.user, subject__name='Ders 0')
+        self.assertEqual(sorted(performance.weak_topics), ['Konu 0-0', 'Konu 0-1'])
+        self.assertEqual(sorted(performance.strong_topics), ['Konu 0-2', 'Konu 0-3'])
+        self.assertEqual(performance.total_time_seconds, 40 * 30)
+        self.assertEqual(TopicPerformance.objects.filter(user=self.user).count(), 4)
+
+    def test_concurrent_first_submission_is_retried(self):
+        self.submit(self.questions[:10])
+        topic = self.questions[0].topic
+        filter_topics = TopicPerformance.objects.filter
+        calls = []
+
+        def racing_filter(*args, **kwargs):
+            # İlk denemede diğer gönderimin eklediği satır henüz görünmüyor
+            calls.append(kwargs)
+            if len(calls) == 1:
+                return TopicPerformance.objects.none()
+            return filter_topics(*args, **kwargs)
+
+        with mock.patch.object(TopicPerformance.objects, 'filter', side_effect=racing_filter):
+            response, _ = self.submit(self.questions[:10])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 2)
+        performance = TopicPerformance.objects.get(user=self.user, topic=topic)
+        self.assertEqual(performance.total_questions_answered, 20)
+        self.assertEqual(SubjectPerformance.objects.get(user=self.user, subject=topic.subject).total_questions_answered, 20)
+
+    def test_migration_builds_totals_from_answers(self):
+        self.submit(self.questions[:20], correct=[index < 5 for index in range(20)])
+        TopicPerformance.objects.all().delete()
+        SubjectPerformance.objects.update(
+            total_questions_answered=3, correct_answers=3, success_rate=100,
+            average_time_per_question=1, total_time_seconds=0, weak_topics=[], strong_topics=[]
+        )
+
+        migration = importlib.import_module('coaching.migrations.0005_topic_performance')
+        migration.fill_performance(apps, None)
+
+        performance = SubjectPerformance.objects.get(user=self.user, subject__name='Ders 0')
+        self.assertEqual(
+            (performance.total_questions_answered, performance.correct_answers, performance.total_time_seconds),
+            (20, 5, 600)
+        )
+        self.assertEqual(performance.success_rate, 25)
+        self.assertEqual(performance.average_time_per_question, 30)
+        self.assertEqual(performance.weak_topics, ['Konu 0-1', 'Konu 0-0'])
+        self.assertEqual(performance.strong_topics, [])
+        self.assertEqual(TopicPerformance.objects.filter(user=self.user).count(), 2)
+
+
+class RecommendationJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ogrenci', email='ogrenci@example.com', firebase_uid='uid-1')
+        category = ExamCategory.objects.create(name='TYT', category_type='TYT')
+        self.subjects = [Subject.objects.create(category=category, name=f'Ders {index}') for index in range(2)]
+        for subject, success_rate in zip(self.subjects, (40, 55)):
+            SubjectPerformance.objects.create(
+                user=self.user, subject=subject, total_questions_answered=100,
+                correct_answers=success_rate, success_rate=success_rate
+            )
+
+    def test_repeated_triggers_coalesce_into_one_job(self):
+        for _ in range(3):
+            enqueue_recommendations(self.user.id)
+        self.assertEqual(RecommendationJob.objects.count(), 1)
+
+        self.assertEqual(run_pending()['processed'], 1)
+        self.assertFalse(RecommendationJob.objects.exists())
+        self.assertEqual(CoachingRecommendation.objects.filter(user=self.user).count(), 2)
+
+    def test_claimed_jobs_are_not_processed_twice(self):
+        enqueue_recommendations(self.user.id)
+        refresh = jobs.refresh_recommendations
+        inner_results = []
+
+        def refresh_while_other_worker_runs(user_id):
+            # İş işlenirken çalışan ikinci işçi sahiplenilmiş işi almaz
+            inner_results.append(run_pending())
+            return refresh(user_id)
+
+        with mock.patch.object(jobs, 'refresh_recommendations', side_effect=refresh_while_other_worker_runs) as refresh_mock:
+            self.assertEqual(run_pending()['processed'], 1)
+
+        self.assertEqual(refresh_mock.call_count, 1)
+        self.assertEqual(inner_results, [{'processed': 0, 'failed': 0}])
+        self.assertFalse(RecommendationJob.objects.exists())
+
+    def test_stale_claims_and_retriggered_jobs_are_released(self):
+        enqueue_recommendations(self.user.id)
+        RecommendationJob.objects.update(claimed_at=timezone.now())
+        self.assertEqual(run_pending()['processed'], 0)
+
+        RecommendationJob.objects.update(claimed_at=timezone.now() - timedelta(seconds=jobs.CLAIM_TIMEOUT + 1))
+        refresh = jobs.refresh_recommendations
+
+        def retrigger(user_id):
+            enqueue_recommendations(user_id)
+            return refresh(user_id)
+
+        with mock.patch.object(jobs, 'refresh_recommendations', side_effect=retrigger):
+            self.assertEqual(run_pending()['processed'], 1)
+        # İşlenirken gelen tetikleme kuyrukta, sahiplenilmemiş olarak kalır
+        self.assertIsNone(RecommendationJob.objects.get().claimed_at)
+
+        with mock.patch.object(jobs, 'refresh_recommendations', side_effect=ValueError('hata')):
+            self.assertEqual(run_pending()['failed'], 1)
+        job = RecommendationJob.objects.get()
+        self.assertEqual((job.attempts, job.last_error, job.claimed_at), (1, 'hata', None))
+
+    def test_one_recommendation_per_user_type_and_subject(self):
+        refresh_recommendations(self.user.id)
+        CoachingRecommendation.objects.update(valid_until=timezone.now() - timedelta(days=1), is_read=True)
+
+        # Süresi dolmuş öneri yeniden kullanılır
+        self.assertEqual(refresh_recommendations(self.user.id), {'created': 0, 'updated': 2})
+        self.assertEqual(CoachingRecommendation.objects.filter(is_read=False, valid_until__gt=timezone.now()).count(), 2)
+
+        recommendation = CoachingRecommendation.objects.first()
+        recommendation.pk = None
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            recommendation.save()
+
+    def test_live_recommendations_are_updated_not_duplicated(self):
+        refresh_recommendations(self.user.id)
+        SubjectPerformance.objects.filter(subject=self.subjects[0]).update(success_rate=50)
+        result = refresh_recommendations(self.user.id)
+
+        self.assertEqual(result, {'created': 0, 'updated': 2})
+        recommendation = CoachingRecommendation.objects.get(user=self.user, subject=self.subjects[0])
+        self.assertIn('%50.0', recommendation.description)
+
+    def test_expired_recommendations_are_deleted_in_batches(self):
+        refresh_recommendations(self.user.id)
+        CoachingRecommendation.objects.update(valid_until=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(expire_recommendations(batch_size=1), 2)
+        self.assertFalse(CoachingRecommendation.objects.exists())
+
+
+class UserProgressTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ogrenci', email='ogrenci@example.com', firebase_uid='uid-1')
+        self.category = ExamCategory.objects.create(name='TYT', category_type='TYT')
+        subject = Subject.objects.create(category=self.category, name='Matematik')
+        SubjectPerformance.objects.create(user=self.user, subject=subject, success_rate=45)
+
+    def add_attempt(self, score):
+        return UserExamAttempt.objects.create(
+            user=self.user, exam_category=self.category, total_questions=10, score=score, duration_minutes=20
+        )
+
+    def test_running_average_matches_reconciliation(self):
+        performances = SubjectPerformance.objects.filter(user=self.user).select_related('subject')
+        record_attempt(self.user, self.add_attempt(40), performances)
+        for score in (70, 85.5):
+            attempt = self.add_attempt(score)
+            # Geçmiş denemeler taranmaz: tek UPDATE
+            with self.assertNumQueries(1):
+                record_attempt(self.user, attempt, performances)
+
+        progress = UserProgress.objects.get(user=self.user)
+        self.assertEqual(progress.total_exam_attempts, 3)
+        self.assertAlmostEqual(progress.average_score, (40 + 70 + 85.5) / 3)
+        self.assertEqual(progress.weak_subjects, ['Matematik'])
+
+        UserProgress.objects.update(total_exam_attempts=0, average_score=0, weak_subjects=[])
+        self.assertEqual(reconcile_progress(), {'users': 1, 'updated': 1, 'created': 0})
+        progress.refresh_from_db()
+        self.assertEqual(progress.total_exam_attempts, 3)
+        self.assertAlmostEqual(progress.average_score, (40 + 70 + 85.5) / 3)
+        self.assertEqual(progress.weak_subjects, ['Matematik'])
+
+    def test_concurrent_first_submission_retries_update(self):
+        performances = SubjectPerformance.objects.filter(user=self.user).select_related('subject')
+        add_attempt = progress_module._add_attempt
+        calls = []
+
+        def racing_add_attempt(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                # Eşzamanlı ilk gönderim satırı bu UPDATE'ten hemen sonra oluşturur
+                record_attempt(self.user, self.add_attempt(40), performances)
+                return 0
+            return add_attempt(*args)
+
+        with mock.patch.object(progress_module, '_add_attempt', side_effect=racing_add_attempt):
+            record_attempt(self.user, self.add_attempt(70), performances)
+
+        progress = UserProgress.objects.get(user=self.user)
+        self.assertEqual(progress.total_exam_attempts, 2)
+        self.assertAlmostEqual(progress.average_score, 55)
+
+    def test_progress_is_unique_per_user(self):
+        UserProgress.objects.create(user=self.user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserProgress.objects.create(user=self.user)
+
+
+class DueReviewScanTests(TestCase):
+    def setUp(self):
+        category = ExamCategory.objects.create(name='TYT', category_type='TYT')
+        subject = Subject.objects.create(category=category, name='Matematik')
+        self.topics = [Topic.objects.create(subject=subject, name=f'Konu {index}') for index in range(3)]
+        self.users = [
+            User.objects.create(username=f'ogrenci{index}', email=f'ogrenci{index}@example.com', firebase_uid=f'uid-{index}')
+            for index in range(3)
+        ]
+        now = timezone.now()
+        for user in self.users:
+            for index, topic in enumerate(self.topics):
+                # Her kullanıcının ilk iki konusunun tekrarı geçmişte, üçüncüsü gelecekte
+                SpacedRepetition.objects.create(
+                    user=user, topic=topic, next_review=now + timedelta(days=1 if index == 2 else -index - 1)
+                )
+        SpacedRepetition.objects.update(is_due=False)
+
+    def test_scan_marks_due_reviews_and_notifies_once_per_user(self):
+        result = scan_due_reviews(chunk_size=4)
+
+        self.assertEqual(result, {'reviews': 6, 'notifications': 3})
+        self.assertEqual(SpacedRepetition.objects.filter(is_due=True).count(), 6)
+        self.assertEqual(Notification.objects.filter(notification_type='review_reminder').count(), 3)
+        # Yeni tekrar yoksa ikinci tarama bir şey yapmaz
+        self.assertEqual(scan_due_reviews(), {'reviews': 0, 'notifications': 0})
+
+    def test_due_reviews_endpoint_reads_marked_reviews(self):
+        scan_due_reviews()
+        review = SpacedRepetition.objects.filter(user=self.users[0], is_due=True).first()
+        review.calculate_next_review(5)
+
+        request = APIRequestFactory().get('/api/coaching/spaced-repetition/due_reviews/')
+        force_authenticate(request, user=self.users[0])
+        response = SpacedRepetitionViewSet.as_view({'get': 'due_reviews'})(request)
+
+        self.assertEqual(len(response.data['due_reviews']), 1)
+
+    def test_due_reviews_endpoint_does_not_wait_for_scan(self):
+        request = APIRequestFactory().get('/api/coaching/spaced-repetition/due_reviews/')
+        force_authenticate(request, user=self.users[0])
+        response = SpacedRepetitionViewSet.as_view({'get': 'due_reviews'})(request)
 
-# Create your tests here.
+        self.assertEqual(
+            sorted(review['topic__name'] for review in response.data['due_reviews']), ['Konu 0', 'Konu 1']
+        )
+        self.assertFalse(Notification.objects.exists())
@@ -14,6 +14,9 @@ from .models import (
     StudyPlan, CoachingRecommendation, UserProgress,
     SpacedRepetition, StudySession
 )
+from .jobs import enqueue_recommendations
+from .performance import record_answers
+from .progress import record_attempt
 from .serializers import (
     UserExamAttemptSerializer, UserExamAttemptCreateSerializer,
     UserQuestionAnswerSerializer, SubjectPerformanceSerializer,
@@ -23,6 +26,7 @@ from .serializers import (
 )
 from exams.models import ExamCategory, Subject, Question, Topic
 from analytics.analysis_service import ComprehensiveAnalyzer
+from analytics.snapshot import get_snapshot
 
 
 class UserExamAttemptViewSet(viewsets.ModelViewSet):
@@ -45,6 +49,18 @@ class UserExamAttemptViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             data = serializer.validated_data
             
+            # Tüm soruları konu ve dersleriyle tek sorguda al
+            try:
+                question_ids = [int(answer_data['question_id']) for answer_data in data['question_answers']]
+            except (KeyError, TypeError, ValueError):
+                return Response({'question_answers': 'Her cevapta geçerli bir question_id olmalı'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            questions = Question.objects.select_related('topic__subject').in_bulk(question_ids)
+            missing_ids = sorted(set(question_ids) - set(questions))
+            if missing_ids:
+                return Response({'question_answers': f'Soru bulunamadı: {missing_ids}'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            
             with transaction.atomic():
                 # Sınav denemesini oluştur
                 exam_attempt = UserExamAttempt.objects.create(
@@ -57,25 +73,27 @@ class UserExamAttemptViewSet(viewsets.ModelViewSet):
                     duration_minutes=data['duration_minutes']
                 )
                 
-                # Soru cevaplarını kaydet
-                for answer_data in data['question_answers']:
-                    question = Question.objects.get(id=answer_data['question_id'])
-                    UserQuestionAnswer.objects.create(
+                # Soru cevaplarını toplu kaydet
+                question_answers = [
+                    UserQuestionAnswer(
                         exam_attempt=exam_attempt,
-                        question=question,
+                        question=questions[question_id],
                         user_answer=answer_data.get('user_answer', ''),
                         is_correct=answer_data.get('is_correct', False),
                         time_spent_seconds=answer_data.get('time_spent_seconds', 0)
                     )
+                    for question_id, answer_data in zip(question_ids, data['question_answers'])
+                ]
+                UserQuestionAnswer.objects.bulk_create(question_answers, batch_size=500)
                 
                 # Performans analizini güncelle
-                self.update_subject_performance(exam_attempt)
+                performances = self.update_subject_performance(exam_attempt, question_answers)
                 
-                # Koçluk önerilerini oluştur
-                self.generate_recommendations(request.user)
+                # Koçluk önerileri arka planda üretilir (kullanıcı başına tek iş)
+                enqueue_recommendations(request.user.id)
                 
                 # User progress'i güncelle
-                self.update_user_progress(request.user, exam_attempt)
+                self.update_user_progress(request.user, exam_attempt, performances)
             
             return Response({
                 'message': 'Sınav sonucu başarıyla kaydedildi',
@@ -85,92 +103,24 @@ class UserExamAttemptViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    def update_subject_performance(self, exam_attempt):
-        """
-        Ders bazlı performans analizini güncelle
+    def update_subject_performance(self, exam_attempt, question_answers=None):
         """
-        # Soru cevaplarını analiz et
-        question_answers = exam_attempt.question_answers.all()
-        
-        # Ders bazlı grupla
-        subject_stats = {}
-        for answer in question_answers:
-            subject = answer.question.topic.subject
-            if subject not in subject_stats:
-                subject_stats[subject] = {
-                    'total': 0, 'correct': 0, 'total_time': 0
-                }
-            
-            subject_stats[subject]['total'] += 1
-            if answer.is_correct:
-                subject_stats[subject]['correct'] += 1
-            subject_stats[subject]['total_time'] += answer.time_spent_seconds
+        Ders ve konu bazlı performans toplamlarını güncelle
         
-        # Her ders için performans kaydet/güncelle
-        for subject, stats in subject_stats.items():
-            success_rate = (stats['correct'] / stats['total']) * 100 if stats['total'] > 0 else 0
-            avg_time = stats['total_time'] / stats['total'] if stats['total'] > 0 else 0
-            
-            SubjectPerformance.objects.update_or_create(
-                user=exam_attempt.user,
-                subject=subject,
-                defaults={
-                    'total_questions_answered': F('total_questions_answered') + stats['total'],
-                    'correct_answers': F('correct_answers') + stats['correct'],
-                    'success_rate': success_rate,
-                    'average_time_per_question': avg_time
-                }
-            )
-    
-    def generate_recommendations(self, user):
+        Returns:
+            List: Kullanıcının güncel ders performansları
         """
-        AI tabanlı koçluk önerileri oluştur
-        """
-        # Zayıf dersleri bul
-        weak_subjects = SubjectPerformance.objects.filter(
-            user=user,
-            success_rate__lt=60
-        ).order_by('success_rate')[:3]
-        
-        for subject_perf in weak_subjects:
-            CoachingRecommendation.objects.create(
-                user=user,
-                recommendation_type='topic_focus',
-                title=f'{subject_perf.subject.name} Odaklanın',
-                description=f'{subject_perf.subject.name} dersinde başarı oranınız %{subject_perf.success_rate:.1f}. Bu derse daha fazla zaman ayırın.',
-                subject=subject_perf.subject,
-                priority_score=80,
-                valid_until=timezone.now() + timedelta(days=7)
-            )
+        if question_answers is None:
+            question_answers = exam_attempt.question_answers.select_related('question__topic__subject')
+        return record_answers(exam_attempt.user, question_answers)
     
-    def update_user_progress(self, user, exam_attempt):
+    def update_user_progress(self, user, exam_attempt, performances=None):
         """
-        Kullanıcı ilerleme durumunu güncelle
+        Kullanıcı ilerleme durumunu güncelle (deneme sayısı ve ortalama skor artımlı)
         """
-        progress, created = UserProgress.objects.get_or_create(user=user)
-        
-        # Toplam deneme sayısını güncelle
-        progress.total_exam_attempts = UserExamAttempt.objects.filter(user=user).count()
-        
-        # Ortalama skoru güncelle
-        avg_score = UserExamAttempt.objects.filter(user=user).aggregate(Avg('score'))['score__avg'] or 0
-        progress.average_score = avg_score
-        
-        # Zayıf/güçlü dersleri güncelle
-        weak_subjects = SubjectPerformance.objects.filter(
-            user=user,
-            success_rate__lt=60
-        ).values_list('subject__name', flat=True)
-        
-        strong_subjects = SubjectPerformance.objects.filter(
-            user=user,
-            success_rate__gte=80
-        ).values_list('subject__name', flat=True)
-        
-        progress.weak_subjects = list(weak_subjects)
-        progress.strong_subjects = list(strong_subjects)
-        
-        progress.save()
+        if performances is None:
+            performances = SubjectPerformance.objects.filter(user=user).select_related('subject')
+        record_attempt(user, exam_attempt, performances)
 
 
 class SubjectPerformanceViewSet(viewsets.ReadOnlyModelViewSet):
@@ -241,11 +191,21 @@ class UserProgressViewSet(viewsets.ReadOnlyModelViewSet):
         """
         user = request.user
         
-        # Kapsamlı analiz servisi kullan
-        analyzer = ComprehensiveAnalyzer(user)
+        # Kapsamlı analiz servisi kullan (source=snapshot: kalıcı analiz özetinden oku)
+        if request.query_params.get('source') == 'snapshot':
+            analyzer = ComprehensiveAnalyzer(user, snapshot=get_snapshot(user))
+        else:
+            analyzer = ComprehensiveAnalyzer(user)
         analysis = analyzer.get_comprehensive_analysis()
         
-        return Response(analysis)
+        response = Response(analysis)
+        
+        # Bu isteğin yaptığı Firestore okumalarını raporla
+        read_stats = analyzer.get_read_stats()
+        response['X-Firestore-Queries'] = read_stats['queries']
+        response['X-Firestore-Documents'] = read_stats['documents']
+        
+        return response
     
     @action(detail=False, methods=['get'])
     def exam_analysis(self, request):
@@ -315,13 +275,13 @@ class SpacedRepetitionViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def due_reviews(self, request):
-        """Tekrar zamanı gelen konular"""
+        """
+        Tekrar zamanı gelen konular: scan_due_reviews ile işaretlenenler ve
+        tarama henüz çalışmadığı için işaretlenmemiş, zamanı geçmiş kayıtlar
+        """
         user = request.user
-        due_reviews = SpacedRepetition.objects.filter(
-            user=user,
-            is_active=True
-        ).filter(
-            Q(next_review__lte=timezone.now()) | Q(next_review__isnull=True)
+        due_reviews = SpacedRepetition.objects.filter(user=user, is_active=True).filter(
+            Q(is_due=True) | Q(is_due=False, next_review__lte=timezone.now())
         )
         
         return Response({
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yon_backend.settings')
 
 application = get_asgi_application()
+
+# Token imza anahtarlarını arka planda önceden yükle
+from yon_backend.token_keys import warm_signing_keys  # noqa: E402
+
+warm_signing_keys()
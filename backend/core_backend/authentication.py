@@ -10,6 +10,9 @@ from django.conf import settings
 import os
 from datetime import datetime
 
+from .token_cache import verify_id_token
+from .last_login import create_buffer
+
 # Firebase'i başlat
 if not firebase_admin._apps:
     SERVICE_ACCOUNT_KEY_PATH = os.path.join(settings.BASE_DIR, "yon_backend", "firebase-service.json")
@@ -21,6 +24,66 @@ if not firebase_admin._apps:
 
 db = firestore.client()
 
+# last_login yazmaları istek yolunda yapılmaz, arka planda toplu yazılır
+last_login_buffer = create_buffer(
+    db,
+    getattr(settings, 'LAST_LOGIN_UPDATE_INTERVAL', 300),
+    getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 10)
+)
+
+class FirebaseIdentity:
+    """
+    İstek başına bir kez oluşturulan Firebase kimliği.
+    Middleware, require_firebase_auth ve DRF authentication sınıfları aynı nesneyi kullanır.
+    """
+    
+    def __init__(self, uid=None, decoded_token=None, user_data=None, error=None):
+        self.uid = uid
+        self.decoded_token = decoded_token or {}
+        self.user_data = user_data
+        self.error = error
+    
+    @property
+    def is_verified(self):
+        return self.uid is not None
+
+
+def authenticate_request(request):
+    """
+    İsteğin Firebase kimliğini döndür (Authorization başlığı yoksa None).
+    Token ve Firestore kullanıcı kaydı istek başına yalnızca bir kez işlenir;
+    sonraki çağrılar request.firebase_identity'yi döndürür.
+    """
+    # DRF Request ise alttaki Django isteğini kullan
+    django_request = getattr(request, '_request', request)
+    if hasattr(django_request, 'firebase_identity'):
+        return django_request.firebase_identity
+    
+    identity = None
+    # Firebase ID token'ı header'dan al
+    auth_header = django_request.META.get('HTTP_AUTHORIZATION', '')
+    if auth_header.startswith('Bearer '):
+        id_token = auth_header.split('Bearer ')[1]
+        
+        try:
+            # Token'ı doğrula
+            decoded_token = verify_id_token(id_token)
+            user_uid = decoded_token['uid']
+            
+            # Kullanıcıyı Firestore'dan al veya oluştur
+            identity = FirebaseIdentity(user_uid, decoded_token, get_or_create_user(user_uid, decoded_token))
+            
+        except Exception as e:
+            print(f"Firebase authentication error: {e}")
+            identity = FirebaseIdentity(error=str(e))
+    
+    # Request'e kullanıcı bilgilerini ekle
+    django_request.firebase_identity = identity
+    django_request.firebase_user = identity.user_data if identity else None
+    django_request.user_uid = identity.uid if identity else None
+    return identity
+
+
 class FirebaseAuthenticationMiddleware:
     """Firebase Authentication Middleware"""
     
@@ -28,102 +91,81 @@ class FirebaseAuthenticationMiddleware:
         self.get_response = get_response
     
     def __call__(self, request):
-        # Firebase ID token'ı header'dan al
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        if auth_header.startswith('Bearer '):
-            id_token = auth_header.split('Bearer ')[1]
-            
-            try:
-                # Token'ı doğrula
-                decoded_token = auth.verify_id_token(id_token)
-                user_uid = decoded_token['uid']
-                
-                # Kullanıcıyı Firestore'dan al veya oluştur
-                user_data = self.get_or_create_user(user_uid, decoded_token)
-                
-                # Request'e kullanıcı bilgilerini ekle
-                request.firebase_user = user_data
-                request.user_uid = user_uid
-                
-            except Exception as e:
-                print(f"Firebase authentication error: {e}")
-                request.firebase_user = None
-                request.user_uid = None
+        authenticate_request(request)
         
         response = self.get_response(request)
         return response
-    
-    def get_or_create_user(self, user_uid, decoded_token):
-        """Kullanıcıyı Firestore'dan al veya oluştur"""
-        try:
-            user_ref = db.collection('users').document(user_uid)
-            doc = user_ref.get()
-            
-            if doc.exists:
-                # Mevcut kullanıcı - last_login güncelle
-                user_data = doc.to_dict()
-                user_ref.update({
-                    'last_login': datetime.now(),
-                    'email_verified': decoded_token.get('email_verified', False)
-                })
-                return user_data
-            else:
-                # Yeni kullanıcı oluştur
-                user_data = {
-                    'firebase_uid': user_uid,
-                    'email': decoded_token.get('email', ''),
-                    'first_name': decoded_token.get('name', '').split()[0] if decoded_token.get('name') else '',
-                    'last_name': ' '.join(decoded_token.get('name', '').split()[1:]) if decoded_token.get('name') and len(decoded_token.get('name', '').split()) > 1 else '',
-                    'target_profession': '',
-                    'department': '',
-                    'grade': '',
-                    'created_at': datetime.now(),
-                    'last_login': datetime.now(),
-                    'is_active': True,
-                    'email_verified': decoded_token.get('email_verified', False)
-                }
-                
-                user_ref.set(user_data)
-                
-                # Kullanıcı alt koleksiyonlarını oluştur
-                self.create_user_subcollections(user_uid)
-                
-                return user_data
-                
-        except Exception as e:
-            print(f"Error getting/creating user: {e}")
-            return None
-    
-    def create_user_subcollections(self, user_uid):
-        """Kullanıcı alt koleksiyonlarını oluştur"""
-        try:
-            user_ref = db.collection('users').document(user_uid)
-            
-            # Daily Data
-            daily_data = {
-                'study_hours': 0.0,
-                'total_questions': 0,
-                'date': datetime.now().date().isoformat(),
-                'created_at': datetime.now()
+
+
+def get_or_create_user(user_uid, decoded_token):
+    """Kullanıcıyı Firestore'dan al veya oluştur"""
+    try:
+        user_ref = db.collection('users').document(user_uid)
+        doc = user_ref.get()
+        
+        if doc.exists:
+            # Mevcut kullanıcı - last_login güncellemesini tampona ekle
+            user_data = doc.to_dict()
+            last_login_buffer.record(user_uid, decoded_token.get('email_verified', False))
+            return user_data
+        else:
+            # Yeni kullanıcı oluştur
+            user_data = {
+                'firebase_uid': user_uid,
+                'email': decoded_token.get('email', ''),
+                'first_name': decoded_token.get('name', '').split()[0] if decoded_token.get('name') else '',
+                'last_name': ' '.join(decoded_token.get('name', '').split()[1:]) if decoded_token.get('name') and len(decoded_token.get('name', '').split()) > 1 else '',
+                'target_profession': '',
+                'department': '',
+                'grade': '',
+                'created_at': datetime.now(),
+                'last_login': datetime.now(),
+                'is_active': True,
+                'email_verified': decoded_token.get('email_verified', False)
             }
-            user_ref.collection('daily_data').add(daily_data)
             
-            # Weak Topics
-            user_ref.collection('weak_topics').add({})
+            user_ref.set(user_data)
             
-            # Study Plans
-            user_ref.collection('study_plans').add({})
+            # Kullanıcı alt koleksiyonlarını oluştur
+            create_user_subcollections(user_uid)
             
-            # Flashcards
-            user_ref.collection('flashcards').add({})
+            return user_data
             
-        except Exception as e:
-            print(f"Error creating user subcollections: {e}")
+    except Exception as e:
+        print(f"Error getting/creating user: {e}")
+        return None
+
+
+def create_user_subcollections(user_uid):
+    """Kullanıcı alt koleksiyonlarını oluştur"""
+    try:
+        user_ref = db.collection('users').document(user_uid)
+        
+        # Daily Data
+        daily_data = {
+            'study_hours': 0.0,
+            'total_questions': 0,
+            'date': datetime.now().date().isoformat(),
+            'created_at': datetime.now()
+        }
+        user_ref.collection('daily_data').add(daily_data)
+        
+        # Weak Topics
+        user_ref.collection('weak_topics').add({})
+        
+        # Study Plans
+        user_ref.collection('study_plans').add({})
+        
+        # Flashcards
+        user_ref.collection('flashcards').add({})
+        
+    except Exception as e:
+        print(f"Error creating user subcollections: {e}")
 
 def require_firebase_auth(view_func):
     """Firebase authentication gerektiren view decorator"""
     def wrapper(request, *args, **kwargs):
-        if not hasattr(request, 'firebase_user') or not request.firebase_user:
+        if not get_current_user(request):
             return JsonResponse({
                 'error': 'Authentication required',
                 'message': 'Firebase ID token is required'
@@ -135,11 +177,13 @@ def require_firebase_auth(view_func):
 
 def get_current_user(request):
     """Mevcut kullanıcıyı al"""
-    return getattr(request, 'firebase_user', None)
+    identity = authenticate_request(request)
+    return identity.user_data if identity else None
 
 def get_user_uid(request):
     """Kullanıcı UID'sini al"""
-    return getattr(request, 'user_uid', None)
+    identity = authenticate_request(request)
+    return identity.uid if identity else None
 
 
 # DRF Authentication Class
@@ -149,100 +193,22 @@ from django.contrib.auth.models import AnonymousUser
 
 
 class FirebaseAuthentication(BaseAuthentication):
-    """DRF için Firebase Authentication"""
+    """DRF için Firebase Authentication (middleware'in çözdüğü kimliği kullanır)"""
     
     def authenticate(self, request):
-        # Firebase ID token'ı header'dan al
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        if not auth_header.startswith('Bearer '):
+        identity = authenticate_request(request)
+        if identity is None:
             return None
         
-        id_token = auth_header.split('Bearer ')[1]
+        if not identity.is_verified:
+            raise AuthenticationFailed(f'Firebase authentication failed: {identity.error}')
         
-        try:
-            # Token'ı doğrula
-            decoded_token = auth.verify_id_token(id_token)
-            user_uid = decoded_token['uid']
-            
-            # Kullanıcıyı Firestore'dan al veya oluştur
-            user_data = self.get_or_create_user(user_uid, decoded_token)
-            
-            if user_data:
-                # Django User objesi oluştur (Firebase UID ile)
-                user = FirebaseUser(user_uid, user_data)
-                return (user, None)
-            else:
-                raise AuthenticationFailed('Kullanıcı oluşturulamadı')
-                
-        except Exception as e:
-            raise AuthenticationFailed(f'Firebase authentication failed: {str(e)}')
-    
-    def get_or_create_user(self, user_uid, decoded_token):
-        """Kullanıcıyı Firestore'dan al veya oluştur"""
-        try:
-            user_ref = db.collection('users').document(user_uid)
-            doc = user_ref.get()
-            
-            if doc.exists:
-                # Mevcut kullanıcı - last_login güncelle
-                user_data = doc.to_dict()
-                user_ref.update({
-                    'last_login': datetime.now(),
-                    'email_verified': decoded_token.get('email_verified', False)
-                })
-                return user_data
-            else:
-                # Yeni kullanıcı oluştur
-                user_data = {
-                    'firebase_uid': user_uid,
-                    'email': decoded_token.get('email', ''),
-                    'first_name': decoded_token.get('name', '').split()[0] if decoded_token.get('name') else '',
-                    'last_name': ' '.join(decoded_token.get('name', '').split()[1:]) if decoded_token.get('name') and len(decoded_token.get('name', '').split()) > 1 else '',
-                    'target_profession': '',
-                    'department': '',
-                    'grade': '',
-                    'created_at': datetime.now(),
-                    'last_login': datetime.now(),
-                    'is_active': True,
-                    'email_verified': decoded_token.get('email_verified', False)
-                }
-                
-                user_ref.set(user_data)
-                
-                # Kullanıcı alt koleksiyonlarını oluştur
-                self.create_user_subcollections(user_uid)
-                
-                return user_data
-                
-        except Exception as e:
-            print(f"Error getting/creating user: {e}")
-            return None
-    
-    def create_user_subcollections(self, user_uid):
-        """Kullanıcı alt koleksiyonlarını oluştur"""
-        try:
-            user_ref = db.collection('users').document(user_uid)
-            
-            # Daily Data
-            daily_data = {
-                'study_hours': 0.0,
-                'total_questions': 0,
-                'date': datetime.now().date().isoformat(),
-                'created_at': datetime.now()
-            }
-            user_ref.collection('daily_data').add(daily_data)
-            
-            # Weak Topics
-            user_ref.collection('weak_topics').add({})
-            
-            # Study Plans
-            user_ref.collection('study_plans').add({})
-            
-            # Flashcards
-            user_ref.collection('flashcards').add({})
-            
-        except Exception as e:
-            print(f"Error creating user subcollections: {e}")
+        if identity.user_data:
+            # Django User objesi oluştur (Firebase UID ile)
+            user = FirebaseUser(identity.uid, identity.user_data)
+            return (user, None)
+        else:
+            raise AuthenticationFailed('Kullanıcı oluşturulamadı')
 
 
 class FirebaseUser:
@@ -0,0 +1,179 @@
+"""
+Firestore last_login güncellemeleri için write-behind tampon.
+İstek yolunda Firestore'a yazılmaz; her kullanıcı için güncelleme en fazla
+LAST_LOGIN_UPDATE_INTERVAL saniyede bir kabul edilir ve arka plan iş parçacığı
+bekleyen güncellemeleri toplu (batch) olarak yazar. Yazılamayan güncelleme bir sonraki
+flush'ta en fazla MAX_ATTEMPTS kez denenir; Firestore belgesi olmayan kullanıcılar
+atlanır. Süreç kapanırken kalanlar yazılır.
+"""
+
+import atexit
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from google.api_core.exceptions import NotFound
+
+# Firestore batch başına en fazla yazma sayısı
+MAX_BATCH_SIZE = 500
+
+# Bir güncellemenin bırakılmadan önce en fazla kaç kez deneneceği
+MAX_ATTEMPTS = 3
+
+
+class LastLoginBuffer:
+    """
+    Kullanıcı başına birleştirilen last_login/email_verified güncellemeleri
+
+    Args:
+        db: Firestore client
+        update_interval: Aynı kullanıcı için iki yazma arasındaki en az süre (saniye)
+        flush_interval: Arka plan yazmaları arasındaki süre (saniye)
+        clock: Monotonik zaman fonksiyonu (testlerde değiştirilebilir)
+    """
+
+    def __init__(self, db, update_interval: float = 300, flush_interval: float = 10, clock=time.monotonic):
+        self.db = db
+        self.update_interval = update_interval
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.writes = 0
+        self.skipped = 0
+        self.dropped = 0
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._failures: Dict[str, int] = {}
+        self._accepted: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+
+    def record(self, user_uid: str, email_verified: bool) -> bool:
+        """
+        Girişi kaydet. Aralık dolmadıysa ve email_verified değişmediyse güncelleme atlanır.
+
+        Returns:
+            bool: Güncelleme yazma kuyruğuna alındıysa True
+        """
+        now = self.clock()
+        with self._lock:
+            accepted = self._accepted.get(user_uid)
+            if accepted and now - accepted[0] < self.update_interval and accepted[1] == email_verified:
+                self.skipped += 1
+                return False
+
+            self._accepted[user_uid] = (now, email_verified)
+            self._pending[user_uid] = {
+                'last_login': datetime.now(),
+                'email_verified': email_verified
+            }
+        self._ensure_worker()
+        return True
+
+    def flush(self) -> int:
+        """Bekleyen güncellemeleri toplu yaz, yazılan kullanıcı sayısını döndür"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            # Süresi geçmiş kabul kayıtlarını temizle, sözlük kullanıcı sayısıyla sınırlı kalsın
+            now = self.clock()
+            self._accepted = {
+                uid: accepted for uid, accepted in self._accepted.items()
+                if now - accepted[0] < self.update_interval
+            }
+
+        items = list(pending.items())
+        written = 0
+        for start in range(0, len(items), MAX_BATCH_SIZE):
+            chunk = items[start:start + MAX_BATCH_SIZE]
+            try:
+                batch = self.db.batch()
+                for user_uid, data in chunk:
+                    batch.update(self.db.collection('users').document(user_uid), data)
+                batch.commit()
+                self._succeeded(chunk)
+                written += len(chunk)
+            except NotFound:
+                # Tek bir eksik belge tüm batch'i düşürür; kalanları tek tek yaz
+                written += self._write_each(chunk)
+            except Exception as e:
+                print(f"❌ last_login güncellemeleri yazılamadı ({len(chunk)} kullanıcı): {e}")
+                self._requeue(chunk)
+        self.writes += written
+        return written
+
+    def _write_each(self, chunk: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Batch'i düşüren eksik belgeyi ayıklamak için güncellemeleri tek tek yaz"""
+        written = 0
+        for user_uid, data in chunk:
+            try:
+                self.db.collection('users').document(user_uid).update(data)
+                self._succeeded([(user_uid, data)])
+                written += 1
+            except NotFound:
+                # Belgesi olmayan kullanıcı için last_login yazılmaz, tekrar da denenmez
+                print(f"❌ last_login yazılamadı, kullanıcı belgesi yok: {user_uid}")
+                self._drop(user_uid)
+            except Exception as e:
+                print(f"❌ last_login güncellemesi yazılamadı ({user_uid}): {e}")
+                self._requeue([(user_uid, data)])
+        return written
+
+    def _succeeded(self, chunk: List[Tuple[str, Dict[str, Any]]]):
+        with self._lock:
+            for user_uid, _ in chunk:
+                self._failures.pop(user_uid, None)
+
+    def _drop(self, user_uid: str):
+        with self._lock:
+            self._failures.pop(user_uid, None)
+            self.dropped += 1
+
+    def _requeue(self, chunk: List[Tuple[str, Dict[str, Any]]]):
+        """Bir sonraki flush'ta tekrar dene; bu arada gelen daha yeni giriş korunur"""
+        with self._lock:
+            for user_uid, data in chunk:
+                failures = self._failures.get(user_uid, 0) + 1
+                if failures >= MAX_ATTEMPTS:
+                    print(f"❌ last_login güncellemesi {failures} denemeden sonra bırakıldı: {user_uid}")
+                    self._failures.pop(user_uid, None)
+                    self.dropped += 1
+                    continue
+                self._failures[user_uid] = failures
+                self._pending.setdefault(user_uid, data)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name='last-login-flusher', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        """Arka plan iş parçacığını durdur ve kalan güncellemeleri yaz"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'writes': self.writes,
+                'skipped': self.skipped,
+                'dropped': self.dropped
+            }
+
+
+def create_buffer(db, update_interval: float, flush_interval: float) -> LastLoginBuffer:
+    """Tamponu oluştur ve süreç kapanırken boşaltılmasını sağla"""
+    buffer = LastLoginBuffer(db, update_interval, flush_interval)
+    atexit.register(buffer.stop)
+    return buffer
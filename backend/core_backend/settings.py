@@ -65,6 +65,7 @@ INSTALLED_APPS = [
     'notifications',
     'quick_solutions',
     'mindmaps',
+    'analytics',
 ]
 
 MIDDLEWARE = [
@@ -215,6 +216,32 @@ AUTH_USER_MODEL = 'users.User'
 # Firebase Configuration
 FIREBASE_CRED_PATH = BASE_DIR / 'yon_backend' / 'firebase-service.json'
 
+# Doğrulanmış ID token önbelleğinin en fazla tutacağı token sayısı (yon_backend/token_cache.py)
+FIREBASE_TOKEN_CACHE_SIZE = 10000
+
+# last_login yazmaları: kullanıcı başına en fazla bu aralıkta bir (sn) ve arka planda toplu yazma aralığı (sn)
+LAST_LOGIN_UPDATE_INTERVAL = 300
+LAST_LOGIN_FLUSH_INTERVAL = 10
+
+# FirebaseAuthentication UID -> User önbelleği: süre (sn) ve isteğe bağlı paylaşılan cache (örn. 'default')
+FIREBASE_USER_CACHE_TIMEOUT = 300
+FIREBASE_USER_CACHE_ALIAS = None
+
+# ID token'ları önceden yüklenen Google imza anahtarlarıyla yerel doğrula (yon_backend/token_keys.py)
+FIREBASE_OFFLINE_TOKEN_VERIFICATION = True
+# Boşsa Firebase uygulamasının project_id'si kullanılır
+FIREBASE_PROJECT_ID = None
+
+# Koçluk öneri kuyruğu (coaching/jobs.py): süreç içi işçi enqueue sonrası başlatılsın mı,
+# kuyruk kontrol aralığı (sn) ve süresi dolan önerilerin silinme aralığı (sn)
+RECOMMENDATION_WORKER_AUTOSTART = True
+RECOMMENDATION_WORKER_POLL_INTERVAL = 5
+RECOMMENDATION_EXPIRE_INTERVAL = 3600
+
+# Analiz verisi kaynağı: 'firestore' veya 'django' (analytics/data_sources.py);
+# bellek içi kaynak sadece test ve benchmark'larda doğrudan verilir
+ANALYTICS_DATA_SOURCE = 'firestore'
+
 # Initialize Firebase only if not already initialized
 if not firebase_admin._apps:
     try:
@@ -0,0 +1,101 @@
+"""
+Doğrulanmış Firebase ID token önbelleği.
+Mobil istemciler aynı token'ı bir saate kadar tekrar gönderdiği için imza kontrolü ve
+JWT çözümü token başına bir kez yapılır; sonuç token'ın kendi 'exp' zamanına kadar
+süreç belleğinde tutulur.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+from . import token_keys
+
+
+class VerifiedTokenCache:
+    """
+    Token hash'i ile anahtarlanan LRU önbellek.
+    Token'ın kendisi saklanmaz; süresi dolan kayıtlar okunurken silinir.
+
+    Args:
+        max_size: En fazla tutulacak token sayısı (dolunca en eski kullanılan atılır)
+        clock: Saniye cinsinden zaman fonksiyonu (testlerde değiştirilebilir)
+    """
+
+    def __init__(self, max_size: int = 10000, clock=time.time):
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(id_token: str) -> str:
+        return hashlib.sha256(id_token.encode('utf-8')).hexdigest()
+
+    def get(self, id_token: str) -> Optional[Dict[str, Any]]:
+        """Geçerli kayıt varsa çözülmüş token'ı döndür"""
+        key = self._key(id_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, decoded_token = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(decoded_token)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, id_token: str, decoded_token: Dict[str, Any]) -> None:
+        """Doğrulanmış token'ı 'exp' zamanına kadar sakla"""
+        expires_at = decoded_token.get('exp')
+        if not expires_at or expires_at <= self.clock():
+            return
+
+        key = self._key(id_token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(decoded_token))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def verify(self, id_token: str) -> Dict[str, Any]:
+        """
+        Token'ı önbellekten veya imza anahtarlarıyla (token_keys) doğrula.
+        Doğrulama hataları önbelleğe alınmaz, firebase_admin istisnası aynen yükselir.
+        """
+        decoded_token = self.get(id_token)
+        if decoded_token is None:
+            decoded_token = token_keys.verify_id_token(id_token)
+            self.set(id_token, decoded_token)
+        return decoded_token
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Önbellek isabet/ıska sayıları ve boyutu"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries)
+            }
+
+
+token_cache = VerifiedTokenCache(getattr(settings, 'FIREBASE_TOKEN_CACHE_SIZE', 10000))
+
+
+def verify_id_token(id_token: str) -> Dict[str, Any]:
+    """auth.verify_id_token yerine kullanılan önbellekli doğrulama"""
+    return token_cache.verify(id_token)
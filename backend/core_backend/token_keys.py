@@ -0,0 +1,234 @@
+"""
+Firebase ID token'larının yerel (offline) doğrulanması.
+Google'ın imza anahtarları önceden yüklenir ve arka plan iş parçacığında
+Cache-Control süresi dolmadan yenilenir; istekler sertifika indirmesini hiç beklemez.
+Testler ve yük testleri set_keys ile yerel bir anahtar çifti kullanabilir.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import firebase_admin
+import requests
+from django.conf import settings
+from firebase_admin import auth
+from google.auth import jwt
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+ID_TOKEN_ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+
+class SigningKeyStore:
+    """
+    kid -> sertifika/açık anahtar (PEM) eşlemesi.
+    Anahtar sözlüğü her yenilemede bütün olarak değiştirilir, okumalar kilitsizdir.
+
+    Args:
+        certs_url: Google sertifika adresi
+        refresh_margin: Süre dolmadan kaç saniye önce yenileneceği
+        retry_interval: Başarısız yenilemeden sonra ve iki yenileme arasında en az bekleme (saniye)
+        clock: Zaman fonksiyonu (testlerde değiştirilebilir)
+    """
+
+    def __init__(self, certs_url: str = GOOGLE_CERTS_URL, refresh_margin: int = 300,
+                 retry_interval: int = 60, clock=time.time):
+        self.certs_url = certs_url
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.clock = clock
+        self.expires_at = 0
+        self.last_refresh = 0
+        self._keys: Dict[str, str] = {}
+        self._static = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._keys)
+
+    def get_keys(self) -> Dict[str, str]:
+        return self._keys
+
+    def set_keys(self, keys: Dict[str, str], max_age: Optional[int] = None) -> None:
+        """
+        Anahtarları doğrudan ayarla. max_age verilmezse anahtarlar sabit kalır ve
+        arka plan yenilemesi yapılmaz (testler ve offline yük testleri için).
+        """
+        self._keys = dict(keys)
+        self._static = max_age is None
+        self.expires_at = self.clock() + max_age if max_age else 0
+
+    def refresh(self) -> int:
+        """
+        Anahtarları Google'dan indir.
+
+        Returns:
+            int: Bir sonraki yenilemeye kadar beklenecek süre (saniye)
+        """
+        self.last_refresh = self.clock()
+        try:
+            response = requests.get(self.certs_url, timeout=10)
+            response.raise_for_status()
+            keys = response.json()
+
+            match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+            max_age = int(match.group(1)) if match else 3600
+            self.set_keys(keys, max_age)
+            return max(max_age - self.refresh_margin, self.retry_interval)
+        except Exception as e:
+            print(f"❌ Token imza anahtarları yenilenemedi: {e}")
+            return self.retry_interval
+
+    def start(self) -> None:
+        """Arka plan yenilemesini başlat (ilk yükleme de arka planda yapılır)"""
+        if self._static or (self._worker is not None and self._worker.is_alive()):
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='token-key-refresher', daemon=True)
+            self._worker.start()
+
+    def request_refresh(self) -> None:
+        """Bilinmeyen kid görüldüğünde erken yenileme iste (retry_interval'dan sık değil)"""
+        if not self._static and self.clock() - self.last_refresh >= self.retry_interval:
+            self._wake.set()
+
+    def _run(self):
+        while not self._static:
+            delay = self.refresh()
+            self._wake.wait(delay)
+            self._wake.clear()
+
+
+class OfflineTokenVerifier:
+    """
+    firebase_admin ile aynı kontrolleri (alg, kid, aud, iss, sub, exp/iat) yerel anahtarlarla yapar.
+    Anahtarlar henüz hiç yüklenmediyse (ısınma öncesi) firebase_admin doğrulamasına düşer.
+    """
+
+    def __init__(self, key_store: SigningKeyStore, project_id: Optional[str] = None, clock_skew_seconds: int = 0):
+        self.key_store = key_store
+        self._project_id = project_id
+        self.clock_skew_seconds = clock_skew_seconds
+
+    @property
+    def project_id(self) -> Optional[str]:
+        if not self._project_id:
+            try:
+                self._project_id = firebase_admin.get_app().project_id
+            except Exception:
+                return None
+        return self._project_id
+
+    def verify(self, id_token: str) -> Dict[str, Any]:
+        keys = self.key_store.get_keys()
+        if not keys or not self.project_id:
+            self.key_store.start()
+            return auth.verify_id_token(id_token)
+
+        try:
+            header = jwt.decode_header(id_token)
+            payload = jwt.decode(id_token, verify=False)
+        except ValueError as e:
+            raise auth.InvalidIdTokenError(str(e), cause=e)
+
+        kid = header.get('kid')
+        error_message = None
+        if header.get('alg') != 'RS256':
+            error_message = f"Firebase ID token has incorrect algorithm: {header.get('alg')}"
+        elif not kid:
+            error_message = 'Firebase ID token has no "kid" claim.'
+        elif kid not in keys:
+            # Anahtarlar dönmüş olabilir; yenileme arka planda yapılır, istek beklemez
+            self.key_store.request_refresh()
+            error_message = f'Firebase ID token has unknown "kid": {kid}'
+        elif payload.get('aud') != self.project_id:
+            error_message = f"Firebase ID token has incorrect \"aud\" (audience) claim: {payload.get('aud')}"
+        elif payload.get('iss') != ID_TOKEN_ISSUER_PREFIX + self.project_id:
+            error_message = f"Firebase ID token has incorrect \"iss\" (issuer) claim: {payload.get('iss')}"
+        elif not isinstance(payload.get('sub'), str) or not payload['sub'] or len(payload['sub']) > 128:
+            error_message = 'Firebase ID token has an invalid "sub" (subject) claim.'
+
+        if error_message:
+            raise auth.InvalidIdTokenError(error_message)
+
+        try:
+            claims = jwt.decode(
+                id_token, certs={kid: keys[kid]}, audience=self.project_id,
+                clock_skew_in_seconds=self.clock_skew_seconds
+            )
+        except ValueError as e:
+            if 'Token expired' in str(e):
+                raise auth.ExpiredIdTokenError(str(e), cause=e)
+            raise auth.InvalidIdTokenError(str(e), cause=e)
+
+        claims['uid'] = claims['sub']
+        return claims
+
+
+key_store = SigningKeyStore()
+token_verifier = OfflineTokenVerifier(key_store, getattr(settings, 'FIREBASE_PROJECT_ID', None))
+
+
+def verify_id_token(id_token: str) -> Dict[str, Any]:
+    """Ayara göre yerel veya firebase_admin doğrulaması"""
+    if getattr(settings, 'FIREBASE_OFFLINE_TOKEN_VERIFICATION', True):
+        return token_verifier.verify(id_token)
+    return auth.verify_id_token(id_token)
+
+
+def warm_signing_keys(block: bool = False) -> None:
+    """
+    Sunucu başlarken anahtarları yükle.
+    block=True ise ilk indirme beklenir, aksi halde tamamen arka planda yapılır.
+    """
+    if not getattr(settings, 'FIREBASE_OFFLINE_TOKEN_VERIFICATION', True):
+        return
+    if block and not key_store.is_loaded:
+        key_store.refresh()
+    key_store.start()
+
+
+def create_local_key_pair(kid: str = 'local-test-key'):
+    """
+    Testler için RSA anahtar çifti üret.
+
+    Returns:
+        tuple: (özel anahtar PEM, {kid: açık anahtar PEM}) - ikincisi key_store.set_keys'e verilir
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode('utf-8')
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('utf-8')
+    return private_pem, {kid: public_pem}
+
+
+def sign_local_token(private_pem: str, uid: str, project_id: str, kid: str = 'local-test-key',
+                     expires_in: int = 3600, claims: Optional[Dict[str, Any]] = None) -> str:
+    """Yerel anahtarla Firebase ID token biçiminde token imzala (testler ve yük testleri için)"""
+    from google.auth import crypt
+
+    now = int(time.time())
+    payload = {
+        'iss': ID_TOKEN_ISSUER_PREFIX + project_id,
+        'aud': project_id,
+        'auth_time': now,
+        'sub': uid,
+        'user_id': uid,
+        'iat': now,
+        'exp': now + expires_in,
+        **(claims or {})
+    }
+    signer = crypt.RSASigner.from_string(private_pem, key_id=kid)
+    return jwt.encode(signer, payload).decode('utf-8')
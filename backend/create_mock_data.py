@@ -311,16 +311,19 @@ def create_coaching_recommendations(user, subjects):
         rec_type = random.choice(recommendation_types)
         title = f"Öneri {i+1}: {rec_type.replace('_', ' ').title()}"
         
-        recommendation = CoachingRecommendation.objects.create(
+        # (kullanıcı, tür, ders) başına tek öneri olabilir
+        recommendation, _ = CoachingRecommendation.objects.update_or_create(
             user=user,
             recommendation_type=rec_type,
-            title=title,
-            description=f"Bu öneri {rec_type} ile ilgili detaylı açıklama içerir.",
             subject=random.choice(subjects),
-            priority_score=random.randint(30, 90),
-            is_read=random.choice([True, False]),
-            is_applied=random.choice([True, False]),
-            valid_until=timezone.now() + timedelta(days=random.randint(7, 30))
+            defaults={
+                'title': title,
+                'description': f"Bu öneri {rec_type} ile ilgili detaylı açıklama içerir.",
+                'priority_score': random.randint(30, 90),
+                'is_read': random.choice([True, False]),
+                'is_applied': random.choice([True, False]),
+                'valid_until': timezone.now() + timedelta(days=random.randint(7, 30))
+            }
         )
         recommendations.append(recommendation)
         print(f"Koçluk önerisi oluşturuldu: {recommendation}")
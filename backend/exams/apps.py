@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ExamsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'exams'
+    
+    def ready(self):
+        # Katalog sayaçlarını (soru/konu/ders sayıları) güncelleyen sinyaller
+        from . import signals  # noqa: F401
@@ -0,0 +1,139 @@
+"""
+YÖN App - Firestore Konu Kataloğu Aynası
+Firestore topics koleksiyonu sync_firebase_catalog komutuyla yerel veritabanına kopyalanır.
+Endpoint'ler kataloğu bellekten sunar; sürüm (içerik hash'i) ETag olarak kullanılır.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CatalogSubject, CatalogTopic, CatalogVersion
+
+# Frontend ders kodları
+SUBJECT_CODES = {
+    'AYT Matematik': 'ayt_mat',
+    'AYT Fizik': 'ayt_fizik',
+    'AYT Kimya': 'ayt_kimya',
+    'AYT Biyoloji': 'ayt_biyoloji',
+    'AYT Türk Dili ve Edebiyatı': 'ayt_edebiyat',
+    'AYT Tarih': 'ayt_tarih',
+    'AYT Coğrafya': 'ayt_cografya',
+    'AYT Felsefe': 'ayt_felsefe',
+    'TYT Türkçe': 'tyt_turkce',
+    'TYT Matematik': 'tyt_mat',
+    'TYT Fen Bilgisi': 'tyt_fen',
+    'TYT Sosyal Bilgiler': 'tyt_sosyal',
+    'Geometri': 'geometri'
+}
+SUBJECT_NAMES = {code: name for name, code in SUBJECT_CODES.items()}
+
+
+def subject_code(subject_name: str) -> str:
+    return SUBJECT_CODES.get(subject_name, subject_name.lower().replace(' ', '_'))
+
+
+def sync_catalog(db) -> Dict[str, Any]:
+    """
+    Firestore topics koleksiyonunu tek taramada okuyup yerel tablolara yaz.
+    İçerik değişmediyse tablolar yeniden yazılmaz, son sürüm kaydının synced_at'i güncellenir.
+
+    Returns:
+        Dict: version, topics, subjects, changed
+    """
+    topics = []
+    for document in db.collection('topics').stream():
+        data = document.to_dict()
+        topics.append({
+            'id': document.id,
+            'name': data.get('name', ''),
+            'subject': data.get('subject', '')
+        })
+
+    subjects = sorted({topic['subject'] for topic in topics if topic['subject']})
+    version = hashlib.sha256(
+        json.dumps({'topics': topics, 'subjects': subjects}, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+    latest = CatalogVersion.objects.first()
+    changed = latest is None or latest.version != version
+    with transaction.atomic():
+        if changed:
+            CatalogTopic.objects.all().delete()
+            CatalogSubject.objects.all().delete()
+            CatalogTopic.objects.bulk_create([
+                CatalogTopic(firestore_id=topic['id'], name=topic['name'], subject=topic['subject'], position=position)
+                for position, topic in enumerate(topics)
+            ], batch_size=500)
+            CatalogSubject.objects.bulk_create([
+                CatalogSubject(name=name, code=subject_code(name), position=position)
+                for position, name in enumerate(subjects)
+            ])
+            CatalogVersion.objects.create(version=version, topics_count=len(topics), subjects_count=len(subjects))
+        else:
+            CatalogVersion.objects.filter(pk=latest.pk).update(synced_at=timezone.now())
+
+    print(f"✅ Katalog senkronize edildi: {len(topics)} konu, {len(subjects)} ders ({version[:12]})")
+    return {'version': version, 'topics': len(topics), 'subjects': len(subjects), 'changed': changed}
+
+
+class CatalogCache:
+    """
+    Yerel katalogdan hazırlanmış yanıt listeleri.
+    Sürüm en fazla check_interval saniyede bir kontrol edilir, değiştiyse yeniden yüklenir.
+    """
+
+    def __init__(self, check_interval: int = 60, clock=time.monotonic):
+        self.check_interval = check_interval
+        self.clock = clock
+        self.version: Optional[str] = None
+        self.subjects: List[Dict[str, Any]] = []
+        self.topics: List[Dict[str, Any]] = []
+        self.topics_by_subject: Dict[str, List[Dict[str, Any]]] = {}
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _load(self, version: str) -> None:
+        self.subjects = [
+            {'id': f'subject_{subject.position}', 'name': subject.name, 'code': subject.code}
+            for subject in CatalogSubject.objects.all()
+        ]
+        topics = [
+            {'id': firestore_id, 'name': name, 'subject_id': subject}
+            for firestore_id, name, subject in CatalogTopic.objects.values_list('firestore_id', 'name', 'subject')
+        ]
+        topics_by_subject = {}
+        for topic in topics:
+            topics_by_subject.setdefault(topic['subject_id'], []).append(topic)
+        self.topics = topics
+        self.topics_by_subject = topics_by_subject
+        self.version = version
+
+    def refresh(self, db=None) -> Optional[str]:
+        """Gerekirse yerel katalogu yükle; hiç senkronize edilmemişse db verildiyse senkronize et"""
+        now = self.clock()
+        if self.version is not None and self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self.version
+        with self._lock:
+            latest = CatalogVersion.objects.values_list('version', flat=True).first()
+            if latest is None and db is not None:
+                latest = sync_catalog(db)['version']
+            if latest is not None and latest != self.version:
+                self._load(latest)
+            self._checked_at = now
+        return self.version
+
+    def invalidate(self) -> None:
+        self._checked_at = None
+
+    def get_topics(self, subject_name: str) -> List[Dict[str, Any]]:
+        """Ders koduna veya adına göre konular"""
+        return self.topics_by_subject.get(SUBJECT_NAMES.get(subject_name, subject_name), [])
+
+
+catalog_cache = CatalogCache()
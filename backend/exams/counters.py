@@ -0,0 +1,101 @@
+"""
+YÖN App - Katalog Sayaçları
+Topic.questions_count / subtree_questions_count, Subject.topics_count ve
+ExamCategory.subjects_count alanlarını günceller. Tekil kayıtlar signals.py
+üzerinden artımlı, toplu içe aktarmalar sonrası rebuild_counters ile güncellenir.
+"""
+
+from collections import Counter
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import ExamCategory, Subject, Topic, Question
+
+
+def path_ids(path: str):
+    """Materialized path'teki id'ler (kökten konuya)"""
+    return [int(topic_id) for topic_id in path.split('/') if topic_id]
+
+
+def shift_question_count(topic_id: Optional[int], delta: int) -> None:
+    """Konunun ve üst konularının soru sayaçlarını delta kadar değiştir"""
+    if not topic_id or not delta:
+        return
+    path = Topic.objects.filter(pk=topic_id).values_list('path', flat=True).order_by().first()
+    if path is None:
+        return
+    with transaction.atomic():
+        Topic.objects.filter(pk=topic_id).update(questions_count=F('questions_count') + delta)
+        Topic.objects.filter(pk__in=path_ids(path) or [topic_id]).update(
+            subtree_questions_count=F('subtree_questions_count') + delta
+        )
+
+
+def shift_subtree_counts(topic_ids, delta: int) -> None:
+    """Alt ağaç taşındığında üst konuların toplamlarını delta kadar değiştir"""
+    if topic_ids and delta:
+        Topic.objects.filter(pk__in=topic_ids).update(
+            subtree_questions_count=F('subtree_questions_count') + delta
+        )
+
+
+def shift_topics_count(subject_id: Optional[int], delta: int) -> None:
+    if subject_id and delta:
+        Subject.objects.filter(pk=subject_id).update(topics_count=F('topics_count') + delta)
+
+
+def shift_subjects_count(category_id: Optional[int], delta: int) -> None:
+    if category_id and delta:
+        ExamCategory.objects.filter(pk=category_id).update(subjects_count=F('subjects_count') + delta)
+
+
+@transaction.atomic
+def rebuild_counters() -> Dict[str, int]:
+    """
+    Tüm sayaçları toplama sorgularıyla yeniden hesapla (toplu içe aktarma sonrası)
+
+    Returns:
+        Dict: Güncellenen kayıt sayıları
+    """
+    question_counts = dict(
+        Question.objects.filter(is_active=True).values('topic_id')
+        .annotate(count=Count('id')).values_list('topic_id', 'count')
+    )
+
+    topics = list(Topic.objects.only('id', 'path', 'questions_count', 'subtree_questions_count'))
+    subtree_counts = Counter()
+    for topic in topics:
+        count = question_counts.get(topic.id, 0)
+        for topic_id in path_ids(topic.path) or [topic.id]:
+            subtree_counts[topic_id] += count
+
+    for topic in topics:
+        topic.questions_count = question_counts.get(topic.id, 0)
+        topic.subtree_questions_count = subtree_counts[topic.id]
+    Topic.objects.bulk_update(topics, ['questions_count', 'subtree_questions_count'], batch_size=500)
+
+    topic_counts = dict(
+        Topic.objects.filter(is_active=True).values('subject_id')
+        .annotate(count=Count('id')).values_list('subject_id', 'count')
+    )
+    subjects = list(Subject.objects.only('id', 'topics_count'))
+    for subject in subjects:
+        subject.topics_count = topic_counts.get(subject.id, 0)
+    Subject.objects.bulk_update(subjects, ['topics_count'], batch_size=500)
+
+    subject_counts = dict(
+        Subject.objects.filter(is_active=True).values('category_id')
+        .annotate(count=Count('id')).values_list('category_id', 'count')
+    )
+    categories = list(ExamCategory.objects.only('id', 'subjects_count'))
+    for category in categories:
+        category.subjects_count = subject_counts.get(category.id, 0)
+    ExamCategory.objects.bulk_update(categories, ['subjects_count'], batch_size=500)
+
+    return {
+        'topics': len(topics),
+        'subjects': len(subjects),
+        'categories': len(categories)
+    }
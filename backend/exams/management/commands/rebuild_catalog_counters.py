@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from exams.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Konu soru sayaçlarını, ders konu sayılarını ve kategori ders sayılarını yeniden hesaplar'
+
+    def handle(self, *args, **options):
+        result = rebuild_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Sayaçlar güncellendi: {result['topics']} konu, "
+                f"{result['subjects']} ders, {result['categories']} kategori"
+            )
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from firebase_admin import firestore
+
+from exams.catalog import sync_catalog
+
+
+class Command(BaseCommand):
+    help = 'Firestore topics koleksiyonunu (konular ve dersler) yerel kataloğa kopyalar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            help='Verilirse bu kadar saniyede bir tekrar senkronize eder (periyodik çalışma)'
+        )
+
+    def handle(self, *args, **options):
+        db = firestore.client()
+        while True:
+            try:
+                result = sync_catalog(db)
+                status = 'güncellendi' if result['changed'] else 'değişiklik yok'
+                self.stdout.write(self.style.SUCCESS(
+                    f"Katalog {status}: {result['topics']} konu, {result['subjects']} ders, sürüm {result['version'][:12]}"
+                ))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Katalog senkronize edilemedi: {e}'))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
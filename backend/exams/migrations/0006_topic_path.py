@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+def fill_topic_paths(apps, schema_editor):
+    """Mevcut konuların path'lerini seviye seviye doldur"""
+    Topic = apps.get_model('exams', 'Topic')
+    topics = list(Topic.objects.only('id', 'parent_topic_id'))
+    parents = {topic.id: topic.parent_topic_id for topic in topics}
+    paths = {}
+
+    def path_of(topic_id):
+        if topic_id not in paths:
+            parent_id = parents[topic_id]
+            paths[topic_id] = (path_of(parent_id) if parent_id else '') + f'{topic_id}/'
+        return paths[topic_id]
+
+    for topic in topics:
+        topic.path = path_of(topic.id)
+    Topic.objects.bulk_update(topics, ['path'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0005_remove_examrecord_exam_record_exam_ty_be7b7b_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, max_length=255),
+        ),
+        migrations.RunPython(fill_topic_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:22
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    """Mevcut katalog için sayaçları hesapla (exams.counters.rebuild_counters ile aynı)"""
+    ExamCategory = apps.get_model('exams', 'ExamCategory')
+    Subject = apps.get_model('exams', 'Subject')
+    Topic = apps.get_model('exams', 'Topic')
+    Question = apps.get_model('exams', 'Question')
+
+    question_counts = dict(
+        Question.objects.filter(is_active=True).values('topic_id')
+        .annotate(count=Count('id')).values_list('topic_id', 'count')
+    )
+    topics = list(Topic.objects.only('id', 'path'))
+    subtree_counts = Counter()
+    for topic in topics:
+        for topic_id in [int(part) for part in topic.path.split('/') if part] or [topic.id]:
+            subtree_counts[topic_id] += question_counts.get(topic.id, 0)
+    for topic in topics:
+        topic.questions_count = question_counts.get(topic.id, 0)
+        topic.subtree_questions_count = subtree_counts[topic.id]
+    Topic.objects.bulk_update(topics, ['questions_count', 'subtree_questions_count'], batch_size=500)
+
+    topic_counts = dict(
+        Topic.objects.filter(is_active=True).values('subject_id')
+        .annotate(count=Count('id')).values_list('subject_id', 'count')
+    )
+    subjects = list(Subject.objects.only('id'))
+    for subject in subjects:
+        subject.topics_count = topic_counts.get(subject.id, 0)
+    Subject.objects.bulk_update(subjects, ['topics_count'], batch_size=500)
+
+    subject_counts = dict(
+        Subject.objects.filter(is_active=True).values('category_id')
+        .annotate(count=Count('id')).values_list('category_id', 'count')
+    )
+    categories = list(ExamCategory.objects.only('id'))
+    for category in categories:
+        category.subjects_count = subject_counts.get(category.id, 0)
+    ExamCategory.objects.bulk_update(categories, ['subjects_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_topic_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examcategory',
+            name='subjects_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='topics_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='questions_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='subtree_questions_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
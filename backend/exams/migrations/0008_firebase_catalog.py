@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_catalog_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSubject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('code', models.CharField(max_length=100)),
+                ('position', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Katalog Dersi',
+                'verbose_name_plural': 'Katalog Dersleri',
+                'db_table': 'catalog_subjects',
+                'ordering': ['position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogTopic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('firestore_id', models.CharField(max_length=200, unique=True)),
+                ('name', models.CharField(blank=True, max_length=300)),
+                ('subject', models.CharField(blank=True, db_index=True, max_length=200)),
+                ('position', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Katalog Konusu',
+                'verbose_name_plural': 'Katalog Konuları',
+                'db_table': 'catalog_topics',
+                'ordering': ['position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=64)),
+                ('topics_count', models.IntegerField(default=0)),
+                ('subjects_count', models.IntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Katalog Sürümü',
+                'verbose_name_plural': 'Katalog Sürümleri',
+                'db_table': 'catalog_versions',
+                'ordering': ['-synced_at', '-id'],
+            },
+        ),
+    ]
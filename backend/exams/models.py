@@ -1,9 +1,28 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-class ExamCategory(models.Model):
+
+class CounterFieldsMixin:
+    """
+    Sayaç alanları sadece exams/counters.py sorgularıyla güncellenir.
+    Var olan kaydın save()'i bu alanları yazmaz, böylece bellekteki eski değerler sayaçları ezmez.
+    """
+    COUNTER_FIELDS = ()
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not args and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class ExamCategory(CounterFieldsMixin, models.Model):
     """
     Sınav kategorileri (TYT, AYT, Dil vs.)
     """
@@ -18,6 +37,9 @@ class ExamCategory(models.Model):
     category_type = models.CharField(max_length=10, choices=CATEGORY_TYPES)
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
+    # Aktif ders sayısı (exams/counters.py tarafından güncellenir)
+    subjects_count = models.IntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('subjects_count',)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -29,7 +51,7 @@ class ExamCategory(models.Model):
         verbose_name_plural = 'Sınav Kategorileri'
 
 
-class Subject(models.Model):
+class Subject(CounterFieldsMixin, models.Model):
     """
     Ders konuları (Matematik, Türkçe, Fizik vs.)
     """
@@ -38,6 +60,9 @@ class Subject(models.Model):
     description = models.TextField(blank=True)
     order = models.IntegerField(default=0)  # Sıralama için
     is_active = models.BooleanField(default=True)
+    # Aktif konu sayısı (exams/counters.py tarafından güncellenir)
+    topics_count = models.IntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('topics_count',)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -50,7 +75,7 @@ class Subject(models.Model):
         ordering = ['category', 'order', 'name']
 
 
-class Topic(models.Model):
+class Topic(CounterFieldsMixin, models.Model):
     """
     Konu hiyerarşisi (Ana Konu → Alt Konu → Alt-Alt Konu)
     Örnek: Fizik → Hareket ve Kuvvet → Newton'un Hareket Yasaları
@@ -64,6 +89,13 @@ class Topic(models.Model):
     level = models.IntegerField(default=0)  # 0=Ana konu, 1=Alt konu, 2=Alt-alt konu
     order = models.IntegerField(default=0)
     full_path = models.CharField(max_length=500, blank=True)  # "Fizik > Hareket ve Kuvvet > Newton Yasaları"
+    # Materialized path: kökten bu konuya id'ler, "12/34/57/" (alt ağaç sorguları path__startswith ile)
+    path = models.CharField(max_length=255, blank=True, db_index=True)
+    
+    # Aktif soru sayıları: konunun kendisi ve alt ağaç toplamı (exams/counters.py tarafından güncellenir)
+    questions_count = models.IntegerField(default=0, editable=False)
+    subtree_questions_count = models.IntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('questions_count', 'subtree_questions_count')
     
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -76,29 +108,108 @@ class Topic(models.Model):
         else:
             self.level = 0
             self.full_path = f"{self.subject.name} > {self.name}"
-        super().save(*args, **kwargs)
+        
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Topic.objects.filter(pk=self.pk).values('path', 'level', 'full_path').order_by().first()
+            super().save(*args, **kwargs)
+            
+            # path pk'ye bağlı olduğu için kayıttan sonra yazılır
+            parent_path = self.parent_topic.path if self.parent_topic else ''
+            path = f"{parent_path}{self.pk}/"
+            if path != self.path:
+                self.path = path
+                Topic.objects.filter(pk=self.pk).update(path=path)
+            
+            if previous and previous['path']:
+                self._update_descendants(previous)
+    
+    def _update_descendants(self, previous):
+        """Taşıma veya yeniden adlandırma sonrası alt konuların path, level ve full_path'ini tek sorguda güncelle"""
+        # Boş path ile path__startswith tüm konularla eşleşir
+        if not previous['path']:
+            return
+        if (previous['path'], previous['level'], previous['full_path']) == (self.path, self.level, self.full_path):
+            return
+        Topic.objects.filter(path__startswith=previous['path']).exclude(pk=self.pk).update(
+            path=Concat(Value(self.path), Substr('path', len(previous['path']) + 1)),
+            level=F('level') + (self.level - previous['level']),
+            full_path=Concat(Value(self.full_path), Substr('full_path', len(previous['full_path']) + 1))
+        )
+    
+    def _get_path(self):
+        """
+        Konunun path'i; bellekteki değer boşsa veritabanından okunur.
+        Kaydedilmemiş veya path'i henüz yazılmamış konu için None (boş path her konuyla eşleşir).
+        """
+        if not self.path and self.pk:
+            self.path = Topic.objects.filter(pk=self.pk).values_list('path', flat=True).order_by().first() or ''
+        return self.path or None
+    
+    def delete(self, *args, **kwargs):
+        path = self._get_path()
+        if path is None:
+            # path yoksa alt ağaç CASCADE ile silinir
+            return super().delete(*args, **kwargs)
+        # Alt ağaç path ile tek sorguda toplanır (CASCADE seviye seviye inmez)
+        with transaction.atomic():
+            Topic.objects.filter(path__startswith=path).exclude(pk=self.pk).delete()
+            return super().delete(*args, **kwargs)
     
     def get_children(self):
         """Alt konuları getir"""
         return self.subtopics.filter(is_active=True).order_by('order', 'name')
     
+    def get_subtree(self):
+        """Konu ve tüm alt konuları (aktiflik filtresi olmadan) tek sorguluk queryset"""
+        path = self._get_path()
+        if path is None:
+            return Topic.objects.filter(pk=self.pk) if self.pk else Topic.objects.none()
+        return Topic.objects.filter(path__startswith=path)
+    
     def get_all_descendants(self):
-        """Tüm alt konuları recursive getir"""
+        """
+        Tüm aktif alt konuları tek sorguda getir.
+        Sıralama önceki recursive gezinme ile aynıdır (her seviyede order, name);
+        aktif olmayan bir konunun altı dahil edilmez.
+        """
+        topics = self.get_subtree().filter(is_active=True).exclude(pk=self.pk).order_by('order', 'name')
+        children = {}
+        for topic in topics:
+            children.setdefault(topic.parent_topic_id, []).append(topic)
+        
         descendants = []
-        for child in self.get_children():
-            descendants.append(child)
-            descendants.extend(child.get_all_descendants())
+        stack = list(reversed(children.get(self.pk, [])))
+        while stack:
+            topic = stack.pop()
+            descendants.append(topic)
+            stack.extend(reversed(children.get(topic.pk, [])))
         return descendants
     
+    def get_ancestor_ids(self):
+        """Kökten üst konuya kadar id'ler (sorgu yapmaz)"""
+        return [int(topic_id) for topic_id in self.path.split('/')[:-2]]
+    
+    def get_subtree_questions_count(self):
+        """Konu ve alt konularındaki aktif soru sayısı (tek sorgu; subtree_questions_count ile aynı tanım)"""
+        path = self._get_path()
+        if path is None:
+            return Question.objects.filter(is_active=True, topic_id=self.pk).count() if self.pk else 0
+        return Question.objects.filter(is_active=True, topic__path__startswith=path).count()
+    
     def is_leaf(self):
         """Yaprak node mu? (alt konusu yok mu?)"""
         return not self.subtopics.exists()
     
     def get_root(self):
-        """Kök konuyu getir"""
-        if self.parent_topic:
+        """Kök konuyu getir (path'teki ilk id ile tek sorgu)"""
+        if not self.parent_topic_id:
+            return self
+        path = self._get_path()
+        if path is None:
             return self.parent_topic.get_root()
-        return self
+        return Topic.objects.get(pk=int(path.split('/')[0]))
     
     def __str__(self):
         return self.full_path or f"{self.subject.name} > {self.name}"
@@ -222,3 +333,59 @@ class ExamRecord(models.Model):
             models.Index(fields=['user', 'exam_date']),
             models.Index(fields=['exam_type', 'exam_subject']),
         ]
+
+
+class CatalogSubject(models.Model):
+    """
+    Firestore topics koleksiyonundaki derslerin yerel kopyası (sync_firebase_catalog ile doldurulur)
+    """
+    name = models.CharField(max_length=200, unique=True)
+    code = models.CharField(max_length=100)
+    position = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return self.name
+    
+    class Meta:
+        db_table = 'catalog_subjects'
+        verbose_name = 'Katalog Dersi'
+        verbose_name_plural = 'Katalog Dersleri'
+        ordering = ['position']
+
+
+class CatalogTopic(models.Model):
+    """
+    Firestore topics koleksiyonunun yerel kopyası (sync_firebase_catalog ile doldurulur)
+    """
+    firestore_id = models.CharField(max_length=200, unique=True)
+    name = models.CharField(max_length=300, blank=True)
+    subject = models.CharField(max_length=200, blank=True, db_index=True)
+    position = models.IntegerField(default=0)  # Firestore okuma sırası
+    
+    def __str__(self):
+        return f"{self.subject} > {self.name}"
+    
+    class Meta:
+        db_table = 'catalog_topics'
+        verbose_name = 'Katalog Konusu'
+        verbose_name_plural = 'Katalog Konuları'
+        ordering = ['position']
+
+
+class CatalogVersion(models.Model):
+    """
+    Katalog senkronizasyon kaydı; version içerik hash'idir ve ETag olarak kullanılır
+    """
+    version = models.CharField(max_length=64)
+    topics_count = models.IntegerField(default=0)
+    subjects_count = models.IntegerField(default=0)
+    synced_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.version[:12]} ({self.synced_at})"
+    
+    class Meta:
+        db_table = 'catalog_versions'
+        verbose_name = 'Katalog Sürümü'
+        verbose_name_plural = 'Katalog Sürümleri'
+        ordering = ['-synced_at', '-id']
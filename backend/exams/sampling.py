@@ -0,0 +1,191 @@
+"""
+YÖN App - Rastgele Soru Seçimi
+ORDER BY RANDOM() yerine aktif soru id'leri (konu, zorluk, soru tipi) gruplarında
+bellekte tutulur; seçim bellekte yapılır ve sadece seçilen sorular veritabanından okunur.
+Konulara dağıtılmış (tabakalı) ve kullanıcının zayıflığına göre ağırlıklı seçim ile
+tohumlu (tekrarlanabilir) seçim desteklenir.
+"""
+
+import random
+import threading
+import time
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Count, Q
+
+from .models import Question, Topic
+
+
+class QuestionPool:
+    """
+    (konu, zorluk, soru tipi) -> sıralı soru id listesi.
+    Soru değiştiğinde bu süreçte hemen, diğer süreçlerde timeout sonunda yenilenir.
+
+    Args:
+        timeout: Havuzun yeniden yüklenmeden kullanılacağı süre (saniye)
+    """
+
+    def __init__(self, timeout: int = 300, clock=time.monotonic):
+        self.timeout = timeout
+        self.clock = clock
+        self._groups: Dict[Tuple[int, str, str], List[int]] = {}
+        self._topic_subjects: Dict[int, int] = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded_at is not None and self.clock() - self._loaded_at < self.timeout:
+            return
+        with self._lock:
+            if self._loaded_at is not None and self.clock() - self._loaded_at < self.timeout:
+                return
+            groups = {}
+            questions = Question.objects.filter(is_active=True).order_by('id').values_list(
+                'id', 'topic_id', 'difficulty', 'question_type'
+            )
+            for question_id, topic_id, difficulty, question_type in questions:
+                groups.setdefault((topic_id, difficulty, question_type), []).append(question_id)
+            self._groups = groups
+            self._topic_subjects = dict(Topic.objects.values_list('id', 'subject_id'))
+            self._loaded_at = self.clock()
+
+    def topic_pools(self, topic_ids: Optional[Iterable[int]] = None, subject_id: Optional[int] = None,
+                    difficulty: Optional[str] = None, question_type: Optional[str] = None) -> Dict[int, List[List[int]]]:
+        """Filtreye uyan id listeleri, konu bazında (listeler kopyalanmaz)"""
+        self._ensure_loaded()
+        topic_ids = set(topic_ids) if topic_ids else None
+        pools = {}
+        for (topic_id, group_difficulty, group_type), ids in self._groups.items():
+            if topic_ids is not None and topic_id not in topic_ids:
+                continue
+            if subject_id is not None and self._topic_subjects.get(topic_id) != subject_id:
+                continue
+            if difficulty and group_difficulty != difficulty:
+                continue
+            if question_type and group_type != question_type:
+                continue
+            pools.setdefault(topic_id, []).append(ids)
+        return pools
+
+
+def _draw(rng: random.Random, lists: List[List[int]], count: int) -> List[int]:
+    """Birden çok listeden, listeleri birleştirmeden count tane tekrarsız id seç"""
+    bounds = []
+    total = 0
+    for ids in lists:
+        total += len(ids)
+        bounds.append(total)
+    picks = rng.sample(range(total), min(count, total))
+    result = []
+    for pick in picks:
+        index = bisect_right(bounds, pick)
+        start = bounds[index - 1] if index else 0
+        result.append(lists[index][pick - start])
+    return result
+
+
+def allocate(count: int, weights: Dict[int, float], available: Dict[int, int]) -> Dict[int, int]:
+    """
+    count soruyu konulara ağırlıklarıyla orantılı dağıt (en büyük kalan yöntemi).
+    Yeterli sorusu olmayan konunun payı diğer konulara aktarılır.
+    """
+    allocation = {topic_id: 0 for topic_id in weights}
+    remaining = min(count, sum(available.get(topic_id, 0) for topic_id in weights))
+
+    while remaining > 0:
+        open_topics = [topic_id for topic_id in weights if allocation[topic_id] < available.get(topic_id, 0)]
+        total_weight = sum(weights[topic_id] for topic_id in open_topics)
+        shares = {
+            topic_id: remaining * (weights[topic_id] / total_weight if total_weight else 1 / len(open_topics))
+            for topic_id in open_topics
+        }
+
+        given = 0
+        capped = set()
+        for topic_id in open_topics:
+            amount = min(int(shares[topic_id]), available[topic_id] - allocation[topic_id])
+            if amount < int(shares[topic_id]):
+                capped.add(topic_id)
+            allocation[topic_id] += amount
+            given += amount
+
+        # Kalanlar aynı turda en büyük kesirli paylara birer birer verilir;
+        # sorusu yetmeyen konuların açığı bir sonraki turda dağıtılır
+        by_fraction = sorted(open_topics, key=lambda topic_id: shares[topic_id] - int(shares[topic_id]), reverse=True)
+        for topic_id in by_fraction:
+            if given == remaining:
+                break
+            if topic_id not in capped and allocation[topic_id] < available[topic_id]:
+                allocation[topic_id] += 1
+                given += 1
+        remaining -= given
+
+    return allocation
+
+
+def topic_weakness(user, topic_ids: Iterable[int]) -> Dict[int, float]:
+    """
+    Konu bazında zayıflık skoru: (yanlış/boş + 1) / (toplam + 2).
+    Hiç cevaplanmamış konular 0.5 alır.
+    """
+    from coaching.models import UserQuestionAnswer
+
+    topic_ids = list(topic_ids)
+    weakness = {topic_id: 0.5 for topic_id in topic_ids}
+    stats = UserQuestionAnswer.objects.filter(
+        exam_attempt__user=user, question__topic_id__in=topic_ids
+    ).values('question__topic_id').annotate(
+        total=Count('id'), correct=Count('id', filter=Q(is_correct=True))
+    )
+    for row in stats:
+        weakness[row['question__topic_id']] = (row['total'] - row['correct'] + 1) / (row['total'] + 2)
+    return weakness
+
+
+def sample_question_ids(count: int, topic_ids: Optional[Iterable[int]] = None, subject_id: Optional[int] = None,
+                        difficulty: Optional[str] = None, question_type: Optional[str] = None,
+                        weights: Optional[Dict[int, float]] = None, stratify: bool = False,
+                        seed: Optional[int] = None, pool: Optional[QuestionPool] = None) -> List[int]:
+    """
+    Rastgele soru id'leri seç
+
+    Args:
+        count: İstenen soru sayısı
+        topic_ids, subject_id, difficulty, question_type: Filtreler
+        weights: Konu ağırlıkları (verilirse sorular konulara bu oranda dağıtılır)
+        stratify: Ağırlık yoksa soruları konulara eşit dağıt
+        seed: Aynı havuzla aynı sonucu üretmek için tohum
+
+    Returns:
+        List: Seçilen soru id'leri (seçim sırasıyla)
+    """
+    pools = (pool or question_pool).topic_pools(topic_ids, subject_id, difficulty, question_type)
+    rng = random.Random(seed)
+
+    topics = sorted(pools)
+    if not weights and not stratify:
+        return _draw(rng, [ids for topic_id in topics for ids in pools[topic_id]], count)
+
+    weights = {topic_id: weights.get(topic_id, 1.0) if weights else 1.0 for topic_id in topics}
+    available = {topic_id: sum(len(ids) for ids in pools[topic_id]) for topic_id in topics}
+    allocation = allocate(count, weights, available)
+
+    selected = []
+    for topic_id in topics:
+        selected.extend(_draw(rng, pools[topic_id], allocation[topic_id]))
+    rng.shuffle(selected)
+    return selected
+
+
+def fetch_questions(question_ids: List[int], queryset=None) -> List[Question]:
+    """Seçilen soruları tek sorguda, seçim sırasıyla getir (bu arada silinenler atlanır)"""
+    queryset = queryset if queryset is not None else Question.objects.filter(is_active=True)
+    questions = queryset.in_bulk(question_ids)
+    return [questions[question_id] for question_id in question_ids if question_id in questions]
+
+
+question_pool = QuestionPool()
@@ -2,25 +2,18 @@ from rest_framework import serializers
 from .models import ExamCategory, Subject, Topic, Question, ExamRecord
 
 class ExamCategorySerializer(serializers.ModelSerializer):
-    subjects_count = serializers.SerializerMethodField()
+    # subjects_count sayaç alanıdır (exams/counters.py)
     
     class Meta:
         model = ExamCategory
         fields = ['id', 'name', 'category_type', 'description', 'subjects_count', 'is_active']
-    
-    def get_subjects_count(self, obj):
-        return obj.subjects.filter(is_active=True).count()
 
 class SubjectSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
-    topics_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Subject
         fields = ['id', 'name', 'category', 'category_name', 'description', 'order', 'topics_count', 'is_active']
-    
-    def get_topics_count(self, obj):
-        return obj.topics.filter(is_active=True).count()
 
 class TopicTreeSerializer(serializers.ModelSerializer):
     """
@@ -29,22 +22,18 @@ class TopicTreeSerializer(serializers.ModelSerializer):
     """
     children = serializers.SerializerMethodField()
     subject_name = serializers.CharField(source='subject.name', read_only=True)
-    questions_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Topic
         fields = [
             'id', 'name', 'subject', 'subject_name', 'level', 
-            'full_path', 'order', 'questions_count', 'children'
+            'full_path', 'order', 'questions_count', 'subtree_questions_count', 'children'
         ]
     
     def get_children(self, obj):
         """Alt konuları recursive olarak serialize et"""
         children = obj.get_children()
         return TopicTreeSerializer(children, many=True, context=self.context).data
-    
-    def get_questions_count(self, obj):
-        return obj.questions.filter(is_active=True).count()
 
 class TopicSerializer(serializers.ModelSerializer):
     """
@@ -52,17 +41,13 @@ class TopicSerializer(serializers.ModelSerializer):
     """
     subject_name = serializers.CharField(source='subject.name', read_only=True)
     parent_name = serializers.CharField(source='parent_topic.name', read_only=True)
-    questions_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Topic
         fields = [
             'id', 'name', 'subject', 'subject_name', 'parent_topic', 
-            'parent_name', 'level', 'full_path', 'questions_count', 'is_active'
+            'parent_name', 'level', 'full_path', 'questions_count', 'subtree_questions_count', 'is_active'
         ]
-    
-    def get_questions_count(self, obj):
-        return obj.questions.filter(is_active=True).count()
 
 class TopicListSerializer(serializers.ModelSerializer):
     """
@@ -70,17 +55,13 @@ class TopicListSerializer(serializers.ModelSerializer):
     """
     subject_name = serializers.CharField(source='subject.name', read_only=True)
     parent_name = serializers.CharField(source='parent_topic.name', read_only=True)
-    questions_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Topic
         fields = [
             'id', 'name', 'subject', 'subject_name', 'parent_topic', 
-            'parent_name', 'level', 'full_path', 'questions_count'
+            'parent_name', 'level', 'full_path', 'questions_count', 'subtree_questions_count'
         ]
-    
-    def get_questions_count(self, obj):
-        return obj.questions.filter(is_active=True).count()
 
 class QuestionSerializer(serializers.ModelSerializer):
     topic_path = serializers.CharField(source='topic.full_path', read_only=True)
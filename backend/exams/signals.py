@@ -0,0 +1,105 @@
+"""
+YÖN App - Katalog Sayaç Sinyalleri
+Soru, konu ve ders kaydedildikçe/silindikçe sayaçları artımlı günceller
+ve rastgele soru havuzunu geçersiz kılar.
+Sinyal üretmeyen toplu işlemlerden (bulk_create, update) sonra
+rebuild_catalog_counters komutu çalıştırılmalıdır.
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Subject, Topic, Question
+from .sampling import question_pool
+from .counters import (
+    path_ids, shift_question_count, shift_subtree_counts, shift_topics_count, shift_subjects_count
+)
+
+
+def _remember_previous(sender, instance, fields):
+    """Güncellemeden önceki değerleri sakla (delta için)"""
+    instance._counter_previous = None
+    if instance.pk:
+        instance._counter_previous = sender.objects.filter(pk=instance.pk).values(*fields).order_by().first()
+
+
+@receiver(pre_save, sender=Question)
+def remember_question(sender, instance, **kwargs):
+    _remember_previous(sender, instance, ['topic_id', 'is_active'])
+
+
+@receiver(post_save, sender=Question)
+def count_question(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_counter_previous', None)
+    if previous and (previous['topic_id'], previous['is_active']) == (instance.topic_id, instance.is_active):
+        return
+    if previous and previous['is_active']:
+        shift_question_count(previous['topic_id'], -1)
+    if instance.is_active:
+        shift_question_count(instance.topic_id, 1)
+
+
+@receiver(post_delete, sender=Question)
+def uncount_question(sender, instance, **kwargs):
+    if instance.is_active:
+        shift_question_count(instance.topic_id, -1)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def refresh_question_pool(sender, instance, **kwargs):
+    # Rastgele seçim havuzu (konu -> ders eşlemesi dahil) bir sonraki istekte yeniden yüklenir
+    question_pool.invalidate()
+
+
+@receiver(pre_save, sender=Topic)
+def remember_topic(sender, instance, **kwargs):
+    _remember_previous(sender, instance, ['subject_id', 'is_active', 'parent_topic_id', 'path', 'subtree_questions_count'])
+
+
+@receiver(post_save, sender=Topic)
+def count_topic(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_counter_previous', None)
+
+    if not previous or (previous['subject_id'], previous['is_active']) != (instance.subject_id, instance.is_active):
+        if previous and previous['is_active']:
+            shift_topics_count(previous['subject_id'], -1)
+        if instance.is_active:
+            shift_topics_count(instance.subject_id, 1)
+
+    # Taşınan alt ağacın soru toplamı eski üst konulardan yenilerine aktarılır
+    if previous and previous['path'] and previous['parent_topic_id'] != instance.parent_topic_id:
+        subtree_count = previous['subtree_questions_count']
+        shift_subtree_counts(path_ids(previous['path'])[:-1], -subtree_count)
+        parent_path = instance.parent_topic.path if instance.parent_topic else ''
+        shift_subtree_counts(path_ids(parent_path), subtree_count)
+
+
+@receiver(post_delete, sender=Topic)
+def uncount_topic(sender, instance, **kwargs):
+    if instance.is_active:
+        shift_topics_count(instance.subject_id, -1)
+
+
+@receiver(pre_save, sender=Subject)
+def remember_subject(sender, instance, **kwargs):
+    _remember_previous(sender, instance, ['category_id', 'is_active'])
+
+
+@receiver(post_save, sender=Subject)
+def count_subject(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_counter_previous', None)
+    if previous and (previous['category_id'], previous['is_active']) == (instance.category_id, instance.is_active):
+        return
+    if previous and previous['is_active']:
+        shift_subjects_count(previous['category_id'], -1)
+    if instance.is_active:
+        shift_subjects_count(instance.category_id, 1)
+
+
+@receiver(post_delete, sender=Subject)
+def uncount_subject(sender, instance, **kwargs):
+    if instance.is_active:
+        shift_subjects_count(instance.category_id, -1)
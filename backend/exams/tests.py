@@ -1,3 +1,395 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from coaching.models import UserExamAttempt, UserQuestionAnswer
+from users.models import User
+from yon_backend.authentication import FirebaseIdentity
+
+from . import views
+from .catalog import catalog_cache, sync_catalog
+from .counters import rebuild_counters
+from .models import CatalogTopic, CatalogVersion, ExamCategory, Subject, Topic, Question
+from .sampling import QuestionPool, allocate, question_pool, sample_question_ids, topic_weakness
+from .topic_tree import build_topic_tree
+from .views import QuestionViewSet, SubjectViewSet, TopicViewSet
+
+
+class CatalogTestCase(TestCase):
+    """Fizik > Hareket > (Newton, Momentum) ve Fizik > Optik ağacı"""
+
+    def setUp(self):
+        self.category = ExamCategory.objects.create(name='TYT', category_type='tyt')
+        self.subject = Subject.objects.create(category=self.category, name='Fizik')
+        self.motion = Topic.objects.create(subject=self.subject, name='Hareket', order=1)
+        self.newton = Topic.objects.create(subject=self.subject, name='Newton', parent_topic=self.motion, order=1)
+        self.momentum = Topic.objects.create(subject=self.subject, name='Momentum', parent_topic=self.motion, order=2)
+        self.optics = Topic.objects.create(subject=self.subject, name='Optik', order=2)
+
+    def add_questions(self, topic, count, **kwargs):
+        return [
+            Question.objects.create(topic=topic, question_text=f'{topic.name} {index}', correct_answer='A', **kwargs)
+            for index in range(count)
+        ]
+
+
+class TopicTreeTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create(username='ogrenci', firebase_uid='uid-1')
+        self.add_questions(self.newton, 2)
+        self.add_questions(self.motion, 1)
+
+    def get(self, view, path, **kwargs):
+        request = self.factory.get(path)
+        force_authenticate(request, user=self.user)
+        return view(request, **kwargs)
+
+    def names(self, nodes):
+        return [(node['name'], self.names(node['children'])) for node in nodes]
+
+    def test_builds_tree_with_one_query(self):
+        with self.assertNumQueries(1):
+            tree = build_topic_tree(self.subject.topics.filter(is_active=True))
+
+        self.assertEqual(self.names(tree), [('Hareket', [('Newton', []), ('Momentum', [])]), ('Optik', [])])
+        motion = tree[0]
+        self.assertEqual(motion['subject_name'], 'Fizik')
+        self.assertEqual(motion['full_path'], 'Fizik > Hareket')
+        self.assertEqual((motion['questions_count'], motion['subtree_questions_count']), (1, 3))
+        self.assertEqual(motion['children'][0]['level'], 1)
+
+    def test_children_of_inactive_topics_are_left_out(self):
+        self.motion.is_active = False
+        self.motion.save()
+
+        tree = build_topic_tree(self.subject.topics.filter(is_active=True))
+
+        self.assertEqual(self.names(tree), [('Optik', [])])
+
+    def test_subject_tree_view(self):
+        view = SubjectViewSet.as_view({'get': 'topics_tree'})
+        with self.assertNumQueries(2):
+            response = self.get(view, f'/subjects/{self.subject.id}/topics_tree/', pk=self.subject.id)
+
+        self.assertEqual(self.names(response.data), [('Hareket', [('Newton', []), ('Momentum', [])]), ('Optik', [])])
+
+    def test_topic_tree_view_filters(self):
+        view = TopicViewSet.as_view({'get': 'tree'})
+
+        response = self.get(view, f'/topics/tree/?subject={self.subject.id}&parent={self.motion.id}')
+        self.assertEqual(self.names(response.data), [('Newton', []), ('Momentum', [])])
+
+        response = self.get(view, '/topics/tree/?level=1')
+        self.assertEqual(response.data, [])
+
+        response = self.get(view, '/topics/tree/?level=0')
+        self.assertEqual([node['name'] for node in response.data], ['Hareket', 'Optik'])
+
+        response = self.get(view, '/topics/tree/?level=x')
+        self.assertEqual(response.status_code, 400)
+
+
+class TopicPathTests(CatalogTestCase):
+    def assertTopic(self, topic, path_topics, level, full_path):
+        topic.refresh_from_db()
+        self.assertEqual(topic.path, ''.join(f'{item.pk}/' for item in path_topics))
+        self.assertEqual(topic.level, level)
+        self.assertEqual(topic.full_path, full_path)
+
+    def test_insert(self):
+        self.assertTopic(self.motion, [self.motion], 0, 'Fizik > Hareket')
+        self.assertTopic(self.newton, [self.motion, self.newton], 1, 'Fizik > Hareket > Newton')
+
+        law = Topic.objects.create(subject=self.subject, name='Birinci Yasa', parent_topic=self.newton)
+        self.assertTopic(law, [self.motion, self.newton, law], 2, 'Fizik > Hareket > Newton > Birinci Yasa')
+        self.assertEqual(law.get_ancestor_ids(), [self.motion.pk, self.newton.pk])
+        self.assertEqual(law.get_root(), self.motion)
+
+    def test_move_updates_descendants(self):
+        law = Topic.objects.create(subject=self.subject, name='Birinci Yasa', parent_topic=self.newton)
+
+        self.newton.parent_topic = self.optics
+        self.newton.save()
+
+        self.assertTopic(self.newton, [self.optics, self.newton], 1, 'Fizik > Optik > Newton')
+        self.assertTopic(law, [self.optics, self.newton, law], 2, 'Fizik > Optik > Newton > Birinci Yasa')
+        self.assertEqual([topic.name for topic in self.optics.get_all_descendants()], ['Newton', 'Birinci Yasa'])
+        self.assertEqual([topic.name for topic in self.motion.get_all_descendants()], ['Momentum'])
+
+        self.newton.parent_topic = None
+        self.newton.save()
+        self.assertTopic(law, [self.newton, law], 1, 'Fizik > Newton > Birinci Yasa')
+
+    def test_rename_updates_descendants(self):
+        self.motion.name = 'Kuvvet ve Hareket'
+        self.motion.save()
+
+        self.assertTopic(self.newton, [self.motion, self.newton], 1, 'Fizik > Kuvvet ve Hareket > Newton')
+        self.assertTopic(self.optics, [self.optics], 0, 'Fizik > Optik')
+
+    def test_delete_removes_subtree(self):
+        Topic.objects.create(subject=self.subject, name='Birinci Yasa', parent_topic=self.newton)
+
+        self.motion.delete()
+
+        self.assertEqual(list(Topic.objects.values_list('name', flat=True)), ['Optik'])
+
+    def test_empty_path_does_not_match_other_topics(self):
+        Topic.objects.filter(pk=self.newton.pk).update(path='')
+        newton = Topic.objects.get(pk=self.newton.pk)
+
+        self.assertEqual(list(newton.get_subtree()), [newton])
+        self.assertEqual(newton.get_subtree_questions_count(), 0)
+        self.assertEqual(newton.get_root(), self.motion)
+
+        newton.delete()
+        self.assertEqual(
+            sorted(Topic.objects.values_list('name', flat=True)), ['Hareket', 'Momentum', 'Optik']
+        )
+        self.assertEqual(Topic(subject=self.subject, name='Yeni').get_subtree().count(), 0)
+
+
+class CatalogCounterTests(CatalogTestCase):
+    def counts(self, *topics):
+        return [
+            tuple(Topic.objects.filter(pk=topic.pk).values_list('questions_count', 'subtree_questions_count').get())
+            for topic in topics
+        ]
+
+    def test_question_changes_update_topic_and_ancestors(self):
+        self.add_questions(self.newton, 2)
+        with self.assertNumQueries(6):
+            question = Question.objects.create(topic=self.momentum, question_text='Soru', correct_answer='A')
+        self.assertEqual(self.counts(self.motion, self.newton, self.momentum), [(0, 3), (2, 2), (1, 1)])
+
+        question.topic = self.optics
+        question.save()
+        self.assertEqual(self.counts(self.motion, self.momentum, self.optics), [(0, 2), (0, 0), (1, 1)])
+
+        # Sayaçları etkilemeyen güncelleme sayaç sorgusu çalıştırmaz
+        question.question_text = 'Düzeltilmiş soru'
+        with self.assertNumQueries(2):
+            question.save()
+
+        question.is_active = False
+        question.save()
+        self.assertEqual(self.counts(self.optics), [(0, 0)])
+
+        Question.objects.filter(topic=self.newton).first().delete()
+        self.assertEqual(self.counts(self.motion, self.newton), [(0, 1), (1, 1)])
+
+    def test_moving_and_deleting_topics(self):
+        self.add_questions(self.newton, 2)
+        self.add_questions(self.motion, 1)
+
+        self.newton.parent_topic = self.optics
+        self.newton.save()
+        self.assertEqual(self.counts(self.motion, self.optics), [(1, 1), (0, 2)])
+
+        self.optics.delete()
+        self.assertEqual(self.counts(self.motion), [(1, 1)])
+        self.subject.refresh_from_db()
+        self.assertEqual(self.subject.topics_count, 2)
+
+    def test_topic_and_subject_counts(self):
+        self.subject.refresh_from_db()
+        self.assertEqual(self.subject.topics_count, 4)
+
+        self.optics.is_active = False
+        self.optics.save()
+        self.optics.name = 'Işık'
+        self.optics.save()
+        self.subject.refresh_from_db()
+        self.assertEqual(self.subject.topics_count, 3)
+
+        other = ExamCategory.objects.create(name='AYT', category_type='ayt')
+        self.subject.category = other
+        self.subject.save()
+        self.category.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.category.subjects_count, other.subjects_count), (0, 1))
+        # Var olan kaydın save()'i bellekteki eski sayaç değerini yazmaz
+        self.assertEqual(self.subject.topics_count, 3)
+
+    def test_rebuild_counters(self):
+        self.add_questions(self.newton, 2)
+        self.add_questions(self.optics, 1)
+        self.add_questions(self.optics, 1, is_active=False)
+        Topic.objects.update(questions_count=0, subtree_questions_count=0)
+        Subject.objects.update(topics_count=0)
+        ExamCategory.objects.update(subjects_count=0)
+
+        with self.assertNumQueries(11):
+            result = rebuild_counters()
+
+        self.assertEqual(result, {'topics': 4, 'subjects': 1, 'categories': 1})
+        self.assertEqual(
+            self.counts(self.motion, self.newton, self.momentum, self.optics), [(0, 2), (2, 2), (0, 0), (1, 1)]
+        )
+        self.assertEqual(Subject.objects.get().topics_count, 4)
+        self.assertEqual(ExamCategory.objects.get().subjects_count, 1)
+
+        Topic.objects.update(questions_count=0)
+        call_command('rebuild_catalog_counters', stdout=open('/dev/null', 'w'))
+        self.assertEqual(self.counts(self.newton), [(2, 2)])
+
+
+class QuestionSamplingTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        question_pool.invalidate()
+        self.newton_ids = [question.id for question in self.add_questions(self.newton, 6)]
+        self.momentum_ids = [question.id for question in self.add_questions(self.momentum, 2, difficulty='hard')]
+        self.optics_ids = [question.id for question in self.add_questions(self.optics, 4)]
+        self.pool = QuestionPool()
+        self.user = User.objects.create(username='ogrenci', firebase_uid='uid-1')
+
+    def test_seed_is_reproducible(self):
+        first = sample_question_ids(5, seed=42, pool=self.pool)
+        second = sample_question_ids(5, seed=42, pool=self.pool)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(first)), 5)
+        self.assertEqual(sorted(sample_question_ids(100, pool=self.pool)),
+                         sorted(self.newton_ids + self.momentum_ids + self.optics_ids))
+
+    def test_filters(self):
+        self.assertEqual(sorted(sample_question_ids(10, difficulty='hard', pool=self.pool)), self.momentum_ids)
+        self.assertEqual(sorted(sample_question_ids(10, topic_ids=[self.optics.id], pool=self.pool)), self.optics_ids)
+
+    def test_allocate_moves_unfilled_share(self):
+        self.assertEqual(allocate(9, {1: 1, 2: 1, 3: 1}, {1: 10, 2: 10, 3: 10}), {1: 3, 2: 3, 3: 3})
+        # 2. konunun eksik payı diğerlerine dağıtılır
+        self.assertEqual(allocate(9, {1: 1, 2: 1, 3: 1}, {1: 10, 2: 1, 3: 10}), {1: 4, 2: 1, 3: 4})
+        self.assertEqual(allocate(10, {1: 3, 2: 1}, {1: 10, 2: 10}), {1: 8, 2: 2})
+        self.assertEqual(allocate(20, {1: 1, 2: 1}, {1: 3, 2: 4}), {1: 3, 2: 4})
+
+    def test_stratified_sampling(self):
+        selected = sample_question_ids(6, stratify=True, seed=1, pool=self.pool)
+
+        self.assertEqual(len(selected), 6)
+        self.assertEqual(len(set(selected) & set(self.momentum_ids)), 2)
+        self.assertEqual(len(set(selected) & set(self.newton_ids)), 2)
+        self.assertEqual(len(set(selected) & set(self.optics_ids)), 2)
+
+    def test_weakness_weights(self):
+        category = self.category
+        attempt = UserExamAttempt.objects.create(user=self.user, exam_category=category, total_questions=4, duration_minutes=10)
+        for question_id, is_correct in ((self.newton_ids[0], False), (self.newton_ids[1], False), (self.optics_ids[0], True)):
+            UserQuestionAnswer.objects.create(exam_attempt=attempt, question_id=question_id, is_correct=is_correct)
+
+        weakness = topic_weakness(self.user, [self.newton.id, self.optics.id, self.momentum.id])
+
+        self.assertEqual(weakness, {self.newton.id: 0.75, self.optics.id: 1 / 3, self.momentum.id: 0.5})
+        selected = sample_question_ids(
+            5, topic_ids=[self.newton.id, self.optics.id], weights=weakness, seed=3, pool=self.pool
+        )
+        # 5 * 0.75 / (0.75 + 1/3) = 3.46 -> 3 (+ en büyük kalan)
+        self.assertEqual(len(set(selected) & set(self.newton_ids)), 3)
+        self.assertEqual(len(set(selected) & set(self.optics_ids)), 2)
+
+    def test_random_view(self):
+        view = QuestionViewSet.as_view({'get': 'random'})
+        factory = APIRequestFactory()
+
+        def get(query):
+            request = factory.get(f'/questions/random/?{query}')
+            force_authenticate(request, user=self.user)
+            return sorted(question['id'] for question in view(request).data)
+
+        self.assertEqual(get(f'topics={self.newton.id},{self.optics.id}&count=20'), sorted(self.newton_ids + self.optics_ids))
+        # ?topic ve ?topics birlikte verildiğinde kesişim kullanılır
+        self.assertEqual(get(f'topic={self.optics.id}&topics={self.newton.id},{self.optics.id}&count=20'), self.optics_ids)
+        self.assertEqual(get(f'topic={self.optics.id}&topics={self.newton.id}'), [])
+        self.assertEqual(get(f'topic={self.optics.id}&count=20'), self.optics_ids)
+
+    def test_topic_changes_invalidate_pool(self):
+        other = Subject.objects.create(category=self.category, name='Kimya')
+        sample_question_ids(1, pool=question_pool)
+
+        self.optics.subject = other
+        self.optics.save()
+
+        self.assertEqual(sorted(sample_question_ids(10, subject_id=other.id)), self.optics_ids)
+
+
+class FirebaseCatalogTests(TestCase):
+    def setUp(self):
+        self.db = mock.MagicMock()
+        self.set_topics([
+            ('t1', 'Türev', 'TYT Matematik'),
+            ('t2', 'Kuvvet', 'AYT Fizik'),
+            ('t3', 'İntegral', 'TYT Matematik'),
+        ])
+        catalog_cache.invalidate()
+        self.factory = RequestFactory()
+
+    def set_topics(self, topics):
+        documents = []
+        for firestore_id, name, subject in topics:
+            document = mock.Mock(id=firestore_id)
+            document.to_dict.return_value = {'name': name, 'subject': subject}
+            documents.append(document)
+        self.db.collection.return_value.stream.side_effect = lambda: iter(documents)
+
+    def get(self, view, *args, **headers):
+        request = self.factory.get('/', **headers)
+        request.firebase_identity = FirebaseIdentity('uid-1', {}, {'email': 'ogrenci@example.com'})
+        return view(request, *args)
+
+    def test_unchanged_catalog_only_updates_sync_time(self):
+        first = sync_catalog(self.db)
+        synced_at = CatalogVersion.objects.get().synced_at
+
+        second = sync_catalog(self.db)
+
+        self.assertTrue(first['changed'])
+        self.assertFalse(second['changed'])
+        self.assertEqual(first['version'], second['version'])
+        self.assertEqual(CatalogVersion.objects.count(), 1)
+        self.assertGreater(CatalogVersion.objects.get().synced_at, synced_at)
+
+        self.set_topics([('t1', 'Türev', 'TYT Matematik')])
+        third = sync_catalog(self.db)
+        self.assertTrue(third['changed'])
+        self.assertEqual(CatalogVersion.objects.count(), 2)
+        self.assertEqual(CatalogVersion.objects.first().version, third['version'])
+        self.assertEqual(list(CatalogTopic.objects.values_list('firestore_id', flat=True)), ['t1'])
+
+    def test_views_serve_local_catalog_with_etag(self):
+        version = sync_catalog(self.db)['version']
+        self.db.reset_mock()
+
+        with mock.patch.object(views, 'db', self.db):
+            response = self.get(views.get_firebase_topics_by_subject, 'tyt_mat')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['ETag'], f'"{version}"')
+            self.assertEqual(
+                [topic['name'] for topic in json.loads(response.content)['data']], ['Türev', 'İntegral']
+            )
+
+            response = self.get(views.get_firebase_subjects, HTTP_IF_NONE_MATCH=f'"{version}"')
+            self.assertEqual(response.status_code, 304)
+
+            response = self.get(views.get_firebase_topics, HTTP_IF_NONE_MATCH='"eski-surum"')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(json.loads(response.content)['data']), 3)
+
+        # Endpoint'ler Firestore'u okumaz
+        self.db.collection.assert_not_called()
+
+    def test_first_request_syncs_empty_catalog(self):
+        with mock.patch.object(views, 'db', self.db):
+            response = self.get(views.get_firebase_subjects)
+
+        self.assertEqual(
+            json.loads(response.content)['data'],
+            [{'id': 'subject_0', 'name': 'AYT Fizik', 'code': 'ayt_fizik'},
+             {'id': 'subject_1', 'name': 'TYT Matematik', 'code': 'tyt_mat'}]
+        )
+        self.assertEqual(CatalogVersion.objects.count(), 1)
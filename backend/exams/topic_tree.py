@@ -0,0 +1,52 @@
+"""
+YÖN App - Konu Ağacı
+Konular ve sayaç alanlarındaki soru sayıları tek sorguda alınır ve
+ağaç bellekte kurulur. Çıktı TopicTreeSerializer ile aynı alanları içerir.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+def build_topic_tree(topics, parent_id: Optional[int] = None, level: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Konu ağacını oluştur
+
+    Args:
+        topics: Aktif konu queryset'i (örn. subject.topics.filter(is_active=True))
+        parent_id: Verilirse bu konunun alt konuları kök olarak döner
+        level: Verilirse sadece bu seviyedeki kökler döner
+
+    Returns:
+        List: Kök konular, alt konular 'children' içinde (order, name sırasıyla)
+    """
+    rows = topics.order_by('order', 'name').values(
+        'id', 'name', 'subject_id', 'subject__name', 'parent_topic_id', 'level', 'full_path', 'order',
+        'questions_count', 'subtree_questions_count'
+    )
+
+    nodes = {}
+    parents = []
+    for row in rows:
+        nodes[row['id']] = {
+            'id': row['id'],
+            'name': row['name'],
+            'subject': row['subject_id'],
+            'subject_name': row['subject__name'],
+            'level': row['level'],
+            'full_path': row['full_path'],
+            'order': row['order'],
+            'questions_count': row['questions_count'],
+            'subtree_questions_count': row['subtree_questions_count'],
+            'children': []
+        }
+        parents.append((row['id'], row['parent_topic_id']))
+
+    roots = []
+    for topic_id, topic_parent_id in parents:
+        if topic_parent_id in nodes:
+            nodes[topic_parent_id]['children'].append(nodes[topic_id])
+        if topic_parent_id == parent_id and (level is None or nodes[topic_id]['level'] == level):
+            roots.append(nodes[topic_id])
+        # Üst konusu aktif olmayan konular ağaca girmez (get_children ile aynı)
+
+    return roots
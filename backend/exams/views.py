@@ -2,15 +2,19 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Prefetch
+from django.db.models import Q
 from .models import ExamCategory, Subject, Topic, Question, ExamRecord
 from .serializers import (
-    ExamCategorySerializer, SubjectSerializer, TopicTreeSerializer,
+    ExamCategorySerializer, SubjectSerializer,
     TopicListSerializer, QuestionSerializer, QuestionDetailSerializer,
     ExamRecordSerializer, ExamRecordListSerializer
 )
+from .topic_tree import build_topic_tree
+from .sampling import sample_question_ids, fetch_questions, topic_weakness, question_pool
+from .catalog import catalog_cache
 from yon_backend.authentication import require_firebase_auth, get_current_user
 from django.http import JsonResponse
+from django.views.decorators.http import condition
 import firebase_admin
 from firebase_admin import firestore
 
@@ -52,16 +56,8 @@ class SubjectViewSet(viewsets.ReadOnlyModelViewSet):
     def topics_tree(self, request, pk=None):
         """Dersin konularını tree yapısında getir"""
         subject = self.get_object()
-        # Sadece ana konuları getir (parent_topic=None)
-        main_topics = subject.topics.filter(
-            is_active=True, 
-            parent_topic=None
-        ).prefetch_related(
-            Prefetch('subtopics', queryset=Topic.objects.filter(is_active=True))
-        ).order_by('order', 'name')
-        
-        serializer = TopicTreeSerializer(main_topics, many=True)
-        return Response(serializer.data)
+        # Tüm konular tek sorguda, soru sayıları tek toplama sorgusunda
+        return Response(build_topic_tree(subject.topics.filter(is_active=True)))
     
     @action(detail=True, methods=['get'])
     def topics_flat(self, request, pk=None):
@@ -76,13 +72,9 @@ class TopicViewSet(viewsets.ReadOnlyModelViewSet):
     Konular (Hiyerarşik yapı)
     """
     queryset = Topic.objects.filter(is_active=True).select_related('subject__category', 'parent_topic')
+    serializer_class = TopicListSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_serializer_class(self):
-        if self.action == 'tree':
-            return TopicTreeSerializer
-        return TopicListSerializer
-    
     def get_queryset(self):
         queryset = super().get_queryset()
         
@@ -102,11 +94,22 @@ class TopicViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['get'])
     def tree(self, request):
-        """Tüm konuları tree yapısında getir"""
-        # Sadece ana konuları getir
-        main_topics = self.get_queryset().filter(parent_topic=None)
-        serializer = TopicTreeSerializer(main_topics, many=True)
-        return Response(serializer.data)
+        """
+        Tüm konuları tree yapısında getir.
+        ?level= kök seviyesini, ?parent= verilen konunun alt ağacını seçer.
+        """
+        topics = Topic.objects.filter(is_active=True)
+        subject_id = request.query_params.get('subject')
+        if subject_id:
+            topics = topics.filter(subject_id=subject_id)
+        try:
+            level = request.query_params.get('level')
+            parent_id = request.query_params.get('parent')
+            level = int(level) if level is not None else None
+            parent_id = int(parent_id) if parent_id else None
+        except ValueError:
+            return Response({'error': 'level ve parent sayı olmalıdır'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(build_topic_tree(topics, parent_id=parent_id, level=level))
     
     @action(detail=True, methods=['get'])
     def children(self, request, pk=None):
@@ -161,72 +164,69 @@ class QuestionViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['get'])
     def random(self, request):
-        """Rastgele sorular getir (sınav için)"""
+        """
+        Rastgele sorular getir (sınav için)
+        
+        Query params:
+            count: Soru sayısı (varsayılan 10)
+            topics: Konu id'leri (?topics=1&topics=2 veya ?topics=1,2)
+            topic, subject, difficulty, type: Liste ile aynı filtreler
+            distribution: 'uniform' (varsayılan), 'stratified' (konulara eşit) veya 'weakness' (zayıf konulara ağırlıklı)
+            seed: Aynı soruları tekrar üretmek için tohum
+        """
         count = int(request.query_params.get('count', 10))
-        topic_ids = request.query_params.getlist('topics')
-        
-        queryset = self.get_queryset()
-        if topic_ids:
-            queryset = queryset.filter(topic_id__in=topic_ids)
+        topic_ids = [
+            int(topic_id) for value in request.query_params.getlist('topics')
+            for topic_id in value.split(',') if topic_id.strip()
+        ]
+        if request.query_params.get('topic'):
+            # ?topic ve ?topics birlikte verilirse ikisine de uyan sorular seçilir
+            topic_id = int(request.query_params['topic'])
+            if topic_ids and topic_id not in topic_ids:
+                return Response([])
+            topic_ids = [topic_id]
+        subject_id = request.query_params.get('subject')
+        seed = request.query_params.get('seed')
+        distribution = request.query_params.get('distribution', 'uniform')
+        
+        filters = {
+            'topic_ids': topic_ids or None,
+            'subject_id': int(subject_id) if subject_id else None,
+            'difficulty': request.query_params.get('difficulty'),
+            'question_type': request.query_params.get('type'),
+        }
         
-        # Rastgele sorular
-        random_questions = queryset.order_by('?')[:count]
+        weights = None
+        if distribution == 'weakness':
+            # Zayıflık skorları sadece filtreye uyan konular için hesaplanır
+            weights = topic_weakness(request.user, question_pool.topic_pools(**filters).keys())
+        
+        # ORDER BY RANDOM() yerine bellekteki id havuzundan seçim
+        question_ids = sample_question_ids(
+            count, weights=weights, stratify=distribution == 'stratified',
+            seed=int(seed) if seed is not None else None, **filters
+        )
+        random_questions = fetch_questions(question_ids, super().get_queryset())
         serializer = QuestionDetailSerializer(random_questions, many=True)
         return Response(serializer.data)
 
+def catalog_etag(request, *args, **kwargs):
+    """Yerel katalog sürümü (hiç senkronize edilmemişse ilk istekte Firestore'dan kopyalanır)"""
+    try:
+        return catalog_cache.refresh(db)
+    except Exception as e:
+        print(f"❌ Katalog yüklenemedi: {e}")
+        return None
+
 @require_firebase_auth
+@condition(etag_func=catalog_etag)
 def get_firebase_subjects(request):
-    """Firebase'den unique subject'leri getir"""
+    """Firebase'den unique subject'leri getir (yerel katalogdan)"""
     try:
-        # Topics koleksiyonundan tüm verileri al
-        topics_ref = db.collection('topics')
-        topics = topics_ref.stream()
-        
-        # Unique subject'leri topla
-        subjects = set()
-        topic_count = 0
-        for topic in topics:
-            topic_data = topic.to_dict()
-            topic_count += 1
-            if 'subject' in topic_data:
-                subjects.add(topic_data['subject'])
-        
-        print(f"🔍 Firebase'den {topic_count} topic okundu")
-        print(f"🔍 Bulunan unique subjects: {subjects}")
-        print(f"🔍 Subjects count: {len(subjects)}")
-        
-        # Subject listesini oluştur
-        subjects_list = []
-        for i, subject_name in enumerate(sorted(subjects)):
-            # Normal subject mapping
-            code_mapping = {
-                'AYT Matematik': 'ayt_mat',
-                'AYT Fizik': 'ayt_fizik',
-                'AYT Kimya': 'ayt_kimya',
-                'AYT Biyoloji': 'ayt_biyoloji',
-                'AYT Türk Dili ve Edebiyatı': 'ayt_edebiyat',
-                'AYT Tarih': 'ayt_tarih',
-                'AYT Coğrafya': 'ayt_cografya',
-                'AYT Felsefe': 'ayt_felsefe',
-                'TYT Türkçe': 'tyt_turkce',
-                'TYT Matematik': 'tyt_mat',
-                'TYT Fen Bilgisi': 'tyt_fen',
-                'TYT Sosyal Bilgiler': 'tyt_sosyal',
-                'Geometri': 'geometri'
-            }
-            
-            subjects_list.append({
-                'id': f'subject_{i}',
-                'name': subject_name,
-                'code': code_mapping.get(subject_name, subject_name.lower().replace(' ', '_'))
-            })
-        
-        print(f"🔍 Döndürülen subjects count: {len(subjects_list)}")
-        print(f"🔍 İlk 5 subject: {subjects_list[:5]}")
-        
+        catalog_cache.refresh(db)
         return JsonResponse({
             'success': True,
-            'data': subjects_list
+            'data': catalog_cache.subjects
         })
     except Exception as e:
         print(f"❌ Firebase subjects hatası: {e}")
@@ -236,55 +236,15 @@ def get_firebase_subjects(request):
         }, status=500)
 
 @require_firebase_auth
+@condition(etag_func=catalog_etag)
 def get_firebase_topics_by_subject(request, subject_name):
-    """Firebase'den belirli subject'e ait topics'leri getir"""
+    """Firebase'den belirli subject'e ait topics'leri getir (yerel katalogdan)"""
     try:
-        print(f"🔍 Topics aranıyor, subject_name: {subject_name}")
-        
-        # Subject name mapping (frontend'den gelen code'ları backend name'lerine çevir)
-        subject_mapping = {
-            'tyt_fen': 'TYT Fen Bilgisi',
-            'ayt_mat': 'AYT Matematik',
-            'ayt_fizik': 'AYT Fizik',
-            'ayt_kimya': 'AYT Kimya',
-            'ayt_biyoloji': 'AYT Biyoloji',
-            'ayt_edebiyat': 'AYT Türk Dili ve Edebiyatı',
-            'ayt_tarih': 'AYT Tarih',
-            'ayt_cografya': 'AYT Coğrafya',
-            'ayt_felsefe': 'AYT Felsefe',
-            'tyt_turkce': 'TYT Türkçe',
-            'tyt_mat': 'TYT Matematik',
-            'tyt_sosyal': 'TYT Sosyal Bilgiler'
-        }
-        
-        # Eğer mapping varsa kullan, yoksa direkt subject_name kullan
-        firebase_subject_name = subject_mapping.get(subject_name, subject_name)
-        
-        # Topics koleksiyonundan subject'e göre filtrele
-        topics_ref = db.collection('topics')
-        topics = topics_ref.where('subject', '==', firebase_subject_name).stream()
-        
-        # Topics listesini oluştur
-        topics_list = []
-        topic_count = 0
-        
-        for topic in topics:
-            topic_count += 1
-            topic_data = topic.to_dict()
-            
-            # Normal konular
-            topics_list.append({
-                'id': topic.id,
-                'name': topic_data.get('name', ''),
-                'subject_id': topic_data.get('subject', '')
-            })
-        
-        print(f"🔍 {topic_count} topic bulundu, {len(topics_list)} filtrelendi")
-        print(f"🔍 İlk 3 topic: {topics_list[:3]}")
-        
+        # Frontend'den gelen code'lar backend name'lerine çevrilir (SUBJECT_NAMES)
+        catalog_cache.refresh(db)
         return JsonResponse({
             'success': True,
-            'data': topics_list
+            'data': catalog_cache.get_topics(subject_name)
         })
     except Exception as e:
         print(f"❌ Firebase topics hatası: {e}")
@@ -294,34 +254,14 @@ def get_firebase_topics_by_subject(request, subject_name):
         }, status=500)
 
 @require_firebase_auth
+@condition(etag_func=catalog_etag)
 def get_firebase_topics(request):
-    """Firebase'den tüm topics'leri getir"""
+    """Firebase'den tüm topics'leri getir (yerel katalogdan)"""
     try:
-        print("🔍 Firebase'den tüm topics okunuyor")
-        
-        # Topics koleksiyonundan tüm topics'leri al
-        topics_ref = db.collection('topics')
-        topics = topics_ref.stream()
-        
-        # Topics listesini oluştur
-        topics_list = []
-        topic_count = 0
-        
-        for topic in topics:
-            topic_count += 1
-            topic_data = topic.to_dict()
-            topics_list.append({
-                'id': topic.id,
-                'name': topic_data.get('name', ''),
-                'subject_id': topic_data.get('subject', '')
-            })
-        
-        print(f"🔍 {topic_count} topic bulundu")
-        print(f"🔍 İlk 5 topic: {topics_list[:5]}")
-        
+        catalog_cache.refresh(db)
         return JsonResponse({
             'success': True,
-            'data': topics_list
+            'data': catalog_cache.topics
         })
     except Exception as e:
         print(f"❌ Firebase topics hatası: {e}")
@@ -3,78 +3,201 @@ Firebase'den veri çekme servisi
 """
 import firebase_admin
 from firebase_admin import firestore
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from threading import Lock
 from django.utils import timezone
 
+from .records import ExamRecordDoc, TaskDoc, SessionDoc
+
+# Kullanıcıya ait koleksiyonlar: paket alanı -> Firestore koleksiyon adı
+USER_COLLECTIONS = {
+    'exam_records': 'exam_records',
+    'tasks': 'tasks',
+    'study_sessions': 'study_sessions',
+    'questions': 'user_questions',
+    'tests': 'user_tests',
+}
+
+# Tipli kayda dönüştürülen koleksiyonlar: paket alanı -> kayıt sınıfı
+RECORD_TYPES = {
+    'exam_records': ExamRecordDoc,
+    'tasks': TaskDoc,
+    'study_sessions': SessionDoc,
+}
+
+# Tarih aralığı filtresinin uygulandığı alanlar: paket alanı -> Firestore alanı
+# (composite index tanımları: backend/firestore.indexes.json)
+DATE_RANGE_FIELDS = {
+    'tasks': 'created_at',
+    'daily_tasks': 'created_at',
+    'study_sessions': 'start_time',
+}
+
+# Paralel okumada aynı anda çalışacak en fazla sorgu sayısı
+BUNDLE_MAX_WORKERS = 5
+
+
+def range_bound(value) -> str:
+    """
+    Tarih sınırını Firestore'da saklanan ISO string formatına çevir.
+    Zaman damgaları ISO string olarak tutulduğu için aralık sorguları string karşılaştırmasıdır;
+    'YYYY-MM-DD' sınırı o günün tüm saatlerini kapsar.
+    """
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat()
+    return value.isoformat()
+
+
+@dataclass
+class UserDataBundle:
+    """Bir kullanıcının toplu olarak okunan Firestore verileri"""
+    exam_records: List[ExamRecordDoc] = field(default_factory=list)
+    tasks: List[TaskDoc] = field(default_factory=list)
+    study_sessions: List[SessionDoc] = field(default_factory=list)
+    questions: List[Dict[str, Any]] = field(default_factory=list)
+    tests: List[Dict[str, Any]] = field(default_factory=list)
+    daily_tasks: List[Dict[str, Any]] = field(default_factory=list)  # users/{uid}/tasks alt koleksiyonu
+    errors: Dict[str, str] = field(default_factory=dict)  # Okunamayan koleksiyonlar ve hata mesajları
+
+
 class FirebaseDataService:
     """Firebase'den veri çekme servisi"""
     
     def __init__(self):
         self.db = firestore.client()
+        # Okuma sayaçları (istek başına kaç Firestore okuması yapıldığını raporlamak için)
+        self.query_count = 0
+        self.document_reads = 0
+        self._stats_lock = Lock()
     
-    def get_user_exam_records(self, user_uid: str) -> List[Dict[str, Any]]:
-        """Kullanıcının deneme kayıtlarını getir"""
-        try:
-            # Firebase'den deneme kayıtlarını çek
-            exam_records_ref = self.db.collection('exam_records')
-            query = exam_records_ref.where('user_uid', '==', user_uid)
-            docs = query.stream()
-            
-            exam_records = []
-            for doc in docs:
-                data = doc.to_dict()
-                exam_records.append({
+    def _stream_documents(self, query, record_type=None) -> List[Any]:
+        """
+        Sorguyu çalıştır, okuma sayaçlarını güncelle ve dokümanları döndür.
+        record_type verilirse her doküman bir kez tipli kayda dönüştürülür, aksi halde dict olarak döner.
+        """
+        documents = []
+        for doc in query.stream():
+            data = doc.to_dict()
+            if record_type is not None:
+                documents.append(record_type.from_document(doc.id, data))
+            else:
+                documents.append({
                     'id': doc.id,
                     **data
                 })
-            
-            return exam_records
+        with self._stats_lock:
+            self.query_count += 1
+            self.document_reads += len(documents)
+        return documents
+    
+    def _user_collection_query(self, name: str, user_uid: str, date_range: Optional[Tuple] = None,
+                               fields: Optional[Iterable[str]] = None):
+        """
+        Kullanıcı koleksiyonu için sorguyu oluştur
+        
+        Args:
+            name: Paket alanı (USER_COLLECTIONS anahtarı veya 'daily_tasks')
+            user_uid: Firebase kullanıcı UID'si
+            date_range: (başlangıç, bitiş) - başlangıç dahil, bitiş hariç; ikisi de None olabilir
+            fields: Sadece bu alanları indir (Firestore select); None ise dokümanın tamamı
+        """
+        if name == 'daily_tasks':
+            query = self.db.collection('users').document(user_uid).collection('tasks')
+        else:
+            query = self.db.collection(USER_COLLECTIONS[name]).where('user_uid', '==', user_uid)
+        
+        if date_range:
+            start, end = date_range
+            field_name = DATE_RANGE_FIELDS[name]
+            if start:
+                query = query.where(field_name, '>=', range_bound(start))
+            if end:
+                query = query.where(field_name, '<', range_bound(end))
+        
+        if name == 'daily_tasks':
+            query = query.order_by('created_at', direction=firestore.Query.DESCENDING)
+        if fields is not None:
+            query = query.select(list(fields))
+        return query
+    
+    def get_user_bundle(self, user_uid: str, collections: Optional[Iterable[str]] = None,
+                        date_ranges: Optional[Dict[str, Tuple]] = None,
+                        fields: Optional[Dict[str, Iterable[str]]] = None) -> UserDataBundle:
+        """
+        Kullanıcının koleksiyonlarını sınırlı bir thread havuzunda paralel olarak getir.
+        Toplam süre, sıralı okumaların toplamı yerine en yavaş tek sorgu kadar olur.
+        
+        Args:
+            user_uid: Firebase kullanıcı UID'si
+            collections: Okunacak paket alanları (varsayılan: USER_COLLECTIONS'taki tümü)
+            date_ranges: Koleksiyon bazında (başlangıç, bitiş) aralıkları; sadece DATE_RANGE_FIELDS'taki
+                koleksiyonlar için geçerlidir ve sorguya eklenir
+            fields: Koleksiyon bazında indirilecek alanlar; verilmeyen koleksiyonlar tam okunur
+        """
+        names = list(collections) if collections is not None else list(USER_COLLECTIONS)
+        date_ranges = date_ranges or {}
+        fields = fields or {}
+        bundle = UserDataBundle()
+        if not names:
+            return bundle
+        
+        def fetch(name):
+            query = self._user_collection_query(name, user_uid, date_ranges.get(name), fields.get(name))
+            return self._stream_documents(query, RECORD_TYPES.get(name))
+        
+        with ThreadPoolExecutor(max_workers=min(len(names), BUNDLE_MAX_WORKERS)) as executor:
+            futures = {name: executor.submit(fetch, name) for name in names}
+            for name, future in futures.items():
+                try:
+                    setattr(bundle, name, future.result())
+                except Exception as e:
+                    print(f"Firebase'den {name} alınırken hata: {e}")
+                    bundle.errors[name] = str(e)
+        
+        return bundle
+    
+    def has_user_documents(self, name: str, user_uid: str) -> bool:
+        """Kullanıcının koleksiyonda en az bir dokümanı var mı (tek doküman, sadece anahtarı okunur)"""
+        # Boş select tüm alanları döndürür; sadece doküman adı istenir
+        query = self._user_collection_query(name, user_uid, fields=['__name__'])
+        return bool(self._stream_documents(query.limit(1)))
+    
+    def get_read_stats(self) -> Dict[str, int]:
+        """Bu servis örneği üzerinden yapılan Firestore okumalarını döndür"""
+        return {
+            'queries': self.query_count,
+            'documents': self.document_reads
+        }
+    
+    def get_user_exam_records(self, user_uid: str, fields: Optional[Iterable[str]] = None) -> List[ExamRecordDoc]:
+        """Kullanıcının deneme kayıtlarını getir"""
+        try:
+            query = self._user_collection_query('exam_records', user_uid, fields=fields)
+            return self._stream_documents(query, ExamRecordDoc)
         except Exception as e:
             print(f"Firebase'den deneme kayıtları alınırken hata: {e}")
             return []
     
-    def get_user_questions(self, user_uid: str) -> List[Dict[str, Any]]:
+    def get_user_questions(self, user_uid: str, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """Kullanıcının soru çözme kayıtlarını getir"""
         try:
-            questions_ref = self.db.collection('user_questions')
-            query = questions_ref.where('user_uid', '==', user_uid)
-            docs = query.stream()
-            
-            questions = []
-            for doc in docs:
-                data = doc.to_dict()
-                questions.append({
-                    'id': doc.id,
-                    **data
-                })
-            
-            return questions
+            return self._stream_documents(self._user_collection_query('questions', user_uid, fields=fields))
         except Exception as e:
             print(f"Firebase'den soru kayıtları alınırken hata: {e}")
             return []
     
-    def get_user_tests(self, user_uid: str) -> List[Dict[str, Any]]:
+    def get_user_tests(self, user_uid: str, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """Kullanıcının test kayıtlarını getir"""
         try:
-            tests_ref = self.db.collection('user_tests')
-            query = tests_ref.where('user_uid', '==', user_uid)
-            docs = query.stream()
-            
-            tests = []
-            for doc in docs:
-                data = doc.to_dict()
-                tests.append({
-                    'id': doc.id,
-                    **data
-                })
-            
-            return tests
+            return self._stream_documents(self._user_collection_query('tests', user_uid, fields=fields))
         except Exception as e:
             print(f"Firebase'den test kayıtları alınırken hata: {e}")
             return []
     
-    def get_topics(self, subject_code: str = None) -> List[Dict[str, Any]]:
+    def get_topics(self, subject_code: str = None, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """Konuları getir"""
         try:
             topics_ref = self.db.collection('topics')
@@ -82,77 +205,41 @@ class FirebaseDataService:
                 query = topics_ref.where('subject_code', '==', subject_code)
             else:
                 query = topics_ref
+            if fields is not None:
+                query = query.select(list(fields))
             
-            docs = query.stream()
-            
-            topics = []
-            for doc in docs:
-                data = doc.to_dict()
-                topics.append({
-                    'id': doc.id,
-                    **data
-                })
-            
-            return topics
+            return self._stream_documents(query)
         except Exception as e:
             print(f"Firebase'den konular alınırken hata: {e}")
             return []
     
-    def get_subjects(self) -> List[Dict[str, Any]]:
+    def get_subjects(self, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """Dersleri getir"""
         try:
-            subjects_ref = self.db.collection('subjects')
-            docs = subjects_ref.stream()
-            
-            subjects = []
-            for doc in docs:
-                data = doc.to_dict()
-                subjects.append({
-                    'id': doc.id,
-                    **data
-                })
-            
-            return subjects
+            query = self.db.collection('subjects')
+            if fields is not None:
+                query = query.select(list(fields))
+            return self._stream_documents(query)
         except Exception as e:
             print(f"Firebase'den dersler alınırken hata: {e}")
             return []
     
-    def get_user_study_sessions(self, user_uid: str) -> List[Dict[str, Any]]:
-        """Kullanıcının çalışma oturumlarını getir"""
+    def get_user_study_sessions(self, user_uid: str, since=None, until=None,
+                                fields: Optional[Iterable[str]] = None) -> List[SessionDoc]:
+        """Kullanıcının çalışma oturumlarını getir (isteğe bağlı start_time aralığıyla)"""
         try:
-            sessions_ref = self.db.collection('study_sessions')
-            query = sessions_ref.where('user_uid', '==', user_uid)
-            docs = query.stream()
-            
-            sessions = []
-            for doc in docs:
-                data = doc.to_dict()
-                sessions.append({
-                    'id': doc.id,
-                    **data
-                })
-            
-            return sessions
+            query = self._user_collection_query('study_sessions', user_uid, (since, until), fields)
+            return self._stream_documents(query, SessionDoc)
         except Exception as e:
             print(f"Firebase'den çalışma oturumları alınırken hata: {e}")
             return []
     
-    def get_user_tasks(self, user_uid: str) -> List[Dict[str, Any]]:
-        """Kullanıcının görevlerini getir"""
+    def get_user_tasks(self, user_uid: str, since=None, until=None,
+                       fields: Optional[Iterable[str]] = None) -> List[TaskDoc]:
+        """Kullanıcının görevlerini getir (isteğe bağlı created_at aralığıyla)"""
         try:
-            tasks_ref = self.db.collection('tasks')
-            query = tasks_ref.where('user_uid', '==', user_uid)
-            docs = query.stream()
-            
-            tasks = []
-            for doc in docs:
-                data = doc.to_dict()
-                tasks.append({
-                    'id': doc.id,
-                    **data
-                })
-            
-            return tasks
+            query = self._user_collection_query('tasks', user_uid, (since, until), fields)
+            return self._stream_documents(query, TaskDoc)
         except Exception as e:
             print(f"Firebase'den görevler alınırken hata: {e}")
-            return [] 
\ No newline at end of file
+            return []
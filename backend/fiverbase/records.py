@@ -0,0 +1,87 @@
+"""
+Firestore dokümanları için tipli kayıt sınıfları.
+FirebaseDataService her dokümanı bir kez dönüştürür; zaman damgaları dönüşüm sırasında
+ayrıştırılır, böylece analizler aynı string'leri tekrar tekrar parse etmez.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    ISO string veya Firestore zaman damgasını timezone bilgisi olmayan datetime'a çevir.
+    Geçersiz veya boş değerler için None döner.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class ExamRecordDoc:
+    """exam_records koleksiyonundaki deneme kaydı"""
+    id: str
+    exam_name: str = 'Bilinmeyen Deneme'
+    exam_date: Any = 'Bilinmeyen Tarih'
+    subject_name: str = 'Bilinmeyen Ders'
+    total_net: float = 0
+    total_questions: int = 0
+    total_correct: int = 0
+    topics: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_document(cls, doc_id: str, data: Dict[str, Any]) -> 'ExamRecordDoc':
+        return cls(
+            id=doc_id,
+            exam_name=data.get('exam_name', 'Bilinmeyen Deneme'),
+            exam_date=data.get('exam_date', 'Bilinmeyen Tarih'),
+            subject_name=data.get('subject_name', 'Bilinmeyen Ders'),
+            total_net=data.get('total_net', 0),
+            total_questions=data.get('total_questions', 0),
+            total_correct=data.get('total_correct', 0),
+            topics=data.get('topics', [])
+        )
+
+
+@dataclass(slots=True)
+class TaskDoc:
+    """tasks koleksiyonundaki görev"""
+    id: str
+    task_type: str = 'unknown'
+    is_completed: bool = False
+    estimated_duration: int = 0
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    @classmethod
+    def from_document(cls, doc_id: str, data: Dict[str, Any]) -> 'TaskDoc':
+        return cls(
+            id=doc_id,
+            task_type=data.get('task_type', 'unknown'),
+            is_completed=data.get('is_completed', False),
+            estimated_duration=data.get('estimated_duration', 0),
+            created_at=parse_timestamp(data.get('created_at')),
+            completed_at=parse_timestamp(data.get('completed_at'))
+        )
+
+
+@dataclass(slots=True)
+class SessionDoc:
+    """study_sessions koleksiyonundaki çalışma oturumu"""
+    id: str
+    start_time: Optional[datetime] = None
+    duration_minutes: int = 0
+
+    @classmethod
+    def from_document(cls, doc_id: str, data: Dict[str, Any]) -> 'SessionDoc':
+        return cls(
+            id=doc_id,
+            start_time=parse_timestamp(data.get('start_time')),
+            duration_minutes=data.get('duration_minutes', 0)
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_rename_extra_data_notification_data_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('daily_question', 'Günlük Soru'), ('task_reminder', 'Görev Hatırlatması'), ('goal_reminder', 'Hedef Hatırlatması'), ('achievement', 'Başarı'), ('system', 'Sistem'), ('study_reminder', 'Çalışma Hatırlatması'), ('exam_reminder', 'Sınav Hatırlatması'), ('quick_solution', 'Hızlı Çözüm'), ('review_reminder', 'Tekrar Hatırlatması')], max_length=50),
+        ),
+    ]
@@ -13,6 +13,7 @@ class Notification(models.Model):
         ('study_reminder', 'Çalışma Hatırlatması'),
         ('exam_reminder', 'Sınav Hatırlatması'),
         ('quick_solution', 'Hızlı Çözüm'),
+        ('review_reminder', 'Tekrar Hatırlatması'),
     ]
     
     PRIORITY_CHOICES = [
@@ -55,6 +56,7 @@ class Notification(models.Model):
             'study_reminder': 'book',
             'exam_reminder': 'calendar',
             'quick_solution': 'bulb',
+            'review_reminder': 'refresh',
         }
         return icon_map.get(self.notification_type, 'notifications')
     
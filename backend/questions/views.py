@@ -16,6 +16,7 @@ import json
 from firebase_admin import storage, firestore, auth
 
 from yon_backend.settings import FIREBASE_DB
+from yon_backend.token_cache import verify_id_token
 from .models import Question
 from .serializers import QuestionSerializer
 
@@ -31,7 +32,7 @@ def upload_image(request):
         if not id_token:
             return JsonResponse({'error': 'Authorization token missing'}, status=401)
 
-        decoded_token = auth.verify_id_token(id_token)
+        decoded_token = verify_id_token(id_token)
         user_id = decoded_token['uid']
 
         # Resim dosyasını al
@@ -16,6 +16,7 @@ from django.core.exceptions import ObjectDoesNotExist
 import firebase_admin
 from firebase_admin import firestore
 from django.conf import settings
+from fiverbase.firebase_service import FirebaseDataService
 
 # Firebase Firestore client
 db = firestore.client()
@@ -37,14 +38,15 @@ def get_daily_tasks(request):
         
         # Firebase'den görevleri al
         try:
-            user_ref = db.collection('users').document(user_uid)
-            tasks_ref = user_ref.collection('tasks')
-            firestore_tasks = tasks_ref.order_by('created_at', direction=firestore.Query.DESCENDING).stream()
+            # Sadece bugün oluşturulan görevleri Firestore sorgusuyla oku
+            bundle = FirebaseDataService().get_user_bundle(
+                user_uid, ['daily_tasks'], {'daily_tasks': (today, today + timedelta(days=1))}
+            )
+            if 'daily_tasks' in bundle.errors:
+                raise Exception(bundle.errors['daily_tasks'])
             
             tasks_data = []
-            for task_doc in firestore_tasks:
-                task_data = task_doc.to_dict()
-                
+            for task_data in bundle.daily_tasks:
                 # Sadece bugün oluşturulan görevleri filtrele
                 created_at = task_data.get('created_at')
                 if created_at:
@@ -378,14 +380,15 @@ def get_tasks_by_date(request):
         
         # Firebase'den görevleri al
         try:
-            user_ref = db.collection('users').document(user_uid)
-            tasks_ref = user_ref.collection('tasks')
-            firestore_tasks = tasks_ref.order_by('created_at', direction=firestore.Query.DESCENDING).stream()
+            # Sadece hedef tarihte oluşturulan görevleri Firestore sorgusuyla oku
+            bundle = FirebaseDataService().get_user_bundle(
+                user_uid, ['daily_tasks'], {'daily_tasks': (target_date, target_date + timedelta(days=1))}
+            )
+            if 'daily_tasks' in bundle.errors:
+                raise Exception(bundle.errors['daily_tasks'])
             
             tasks_data = []
-            for task_doc in firestore_tasks:
-                task_data = task_doc.to_dict()
-                
+            for task_data in bundle.daily_tasks:
                 # Sadece hedef tarihte oluşturulan görevleri filtrele
                 created_at = task_data.get('created_at')
                 if created_at:
@@ -1,24 +1,25 @@
 # users/authentication.py
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
-from firebase_admin import auth
-from django.contrib.auth import get_user_model
+from yon_backend.authentication import authenticate_request
+from .user_cache import user_cache
 
 class FirebaseAuthentication(BaseAuthentication):
     def authenticate(self, request):
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
+        # Token middleware'de bir kez çözülür, burada aynı kimlik kullanılır
+        identity = authenticate_request(request)
+        if identity is None:
             return None
 
-        id_token = auth_header.split(' ')[1]
+        if not identity.is_verified:
+            raise AuthenticationFailed('Token doğrulanamadı: ' + identity.error)
 
         try:
-            decoded = auth.verify_id_token(id_token)
-            uid = decoded['uid']
-            email = decoded.get('email')
+            uid = identity.uid
+            email = identity.decoded_token.get('email')
 
-            User = get_user_model()
-            user, _ = User.objects.get_or_create(firebase_uid=uid, defaults={
+            # Önbellek penceresi başına sadece ilk istek veritabanına gider
+            user = user_cache.get_or_create(uid, defaults={
                 'username': email.split('@')[0] if email else uid,
                 'email': email,
             })
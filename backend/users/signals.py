@@ -0,0 +1,18 @@
+"""
+YÖN App - Kullanıcı Sinyalleri
+Kullanıcı kaydedildiğinde veya silindiğinde UID önbelleğini temizler.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .user_cache import user_cache
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.firebase_uid, instance.pk)
@@ -1,3 +1,336 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from firebase_admin import auth
+from google.api_core.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from yon_backend import authentication, last_login, token_cache, token_keys
+from yon_backend.last_login import LastLoginBuffer
+from yon_backend.token_cache import VerifiedTokenCache
+
+from .models import User
+from .user_cache import UserCache, user_cache
+
+
+class VerifiedTokenCacheTests(TestCase):
+    def setUp(self):
+        self.now = 1000
+        self.cache = VerifiedTokenCache(max_size=2, clock=lambda: self.now)
+
+    def test_verifies_each_token_once_until_expiry(self):
+        with mock.patch.object(token_cache.token_keys, 'verify_id_token',
+                               side_effect=lambda token: {'uid': token, 'exp': 1100}) as verify:
+            self.assertEqual(self.cache.verify('a')['uid'], 'a')
+            self.assertEqual(self.cache.verify('a')['uid'], 'a')
+            self.assertEqual(verify.call_count, 1)
+
+            # 'exp' geçince token yeniden doğrulanır
+            self.now = 1100
+            self.cache.verify('a')
+            self.assertEqual(verify.call_count, 2)
+
+        self.assertEqual(self.cache.get_stats(), {'hits': 1, 'misses': 2, 'size': 0})
+
+    def test_evicts_least_recently_used(self):
+        for token in ('a', 'b'):
+            self.cache.set(token, {'uid': token, 'exp': 2000})
+        self.assertIsNotNone(self.cache.get('a'))
+        self.cache.set('c', {'uid': 'c', 'exp': 2000})
+
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+
+    def test_does_not_cache_expired_or_failed_tokens(self):
+        self.cache.set('old', {'uid': 'old', 'exp': 900})
+        self.assertIsNone(self.cache.get('old'))
+
+        with mock.patch.object(token_cache.token_keys, 'verify_id_token', side_effect=ValueError('bad')) as verify:
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    self.cache.verify('bad')
+        self.assertEqual(verify.call_count, 2)
+        self.assertEqual(self.cache.get_stats()['size'], 0)
+
+    def test_returns_copies(self):
+        self.cache.set('a', {'uid': 'a', 'exp': 2000})
+        self.cache.get('a')['uid'] = 'changed'
+        self.assertEqual(self.cache.get('a')['uid'], 'a')
+
+
+class AuthenticateRequestTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        verify = mock.patch.object(authentication, 'verify_id_token',
+                                   return_value={'uid': 'uid-1', 'email': 'ogrenci@example.com', 'exp': 2000})
+        get_or_create = mock.patch.object(authentication, 'get_or_create_user', return_value={'email': 'ogrenci@example.com'})
+        self.verify = verify.start()
+        self.get_or_create = get_or_create.start()
+        self.addCleanup(verify.stop)
+        self.addCleanup(get_or_create.stop)
+
+    def test_identity_is_resolved_once_per_request(self):
+        class ProfileView(APIView):
+            authentication_classes = [authentication.FirebaseAuthentication]
+
+            def get(self, request):
+                authentication.get_user_uid(request)
+                return Response({'uid': request.user.firebase_uid, 'email': authentication.get_current_user(request)['email']})
+
+        request = self.factory.get('/', HTTP_AUTHORIZATION='Bearer token')
+        response = authentication.FirebaseAuthenticationMiddleware(ProfileView.as_view())(request)
+
+        self.assertEqual(response.data, {'uid': 'uid-1', 'email': 'ogrenci@example.com'})
+        self.assertEqual(request.firebase_identity.uid, 'uid-1')
+        self.assertEqual(request.user_uid, 'uid-1')
+        self.verify.assert_called_once_with('token')
+        self.get_or_create.assert_called_once()
+
+    def test_failed_token_is_not_verified_again(self):
+        self.verify.side_effect = ValueError('bad token')
+        request = self.factory.get('/', HTTP_AUTHORIZATION='Bearer bad')
+
+        identity = authentication.authenticate_request(request)
+        response = authentication.require_firebase_auth(lambda request: None)(request)
+
+        self.assertFalse(identity.is_verified)
+        self.assertEqual(identity.error, 'bad token')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.verify.call_count, 1)
+
+    def test_request_without_token(self):
+        request = self.factory.get('/')
+
+        self.assertIsNone(authentication.authenticate_request(request))
+        self.assertIsNone(request.firebase_user)
+        self.assertIsNone(authentication.FirebaseAuthentication().authenticate(request))
+        self.verify.assert_not_called()
+
+
+class LastLoginBufferTests(TestCase):
+    def setUp(self):
+        self.now = 0
+        self.db = mock.MagicMock()
+        self.buffer = LastLoginBuffer(self.db, update_interval=300, flush_interval=3600, clock=lambda: self.now)
+        self.addCleanup(self.buffer.stop)
+
+    def written_uids(self, batch):
+        return [call.args[0] for call in batch.update.call_args_list]
+
+    def test_coalesces_logins_within_interval(self):
+        self.assertTrue(self.buffer.record('uid-1', False))
+        self.assertFalse(self.buffer.record('uid-1', False))
+        # email_verified değişirse aralık beklenmez
+        self.assertTrue(self.buffer.record('uid-1', True))
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.db.collection.return_value.document.assert_called_once_with('uid-1')
+        self.assertTrue(self.db.batch.return_value.update.call_args.args[1]['email_verified'])
+
+        self.now = 300
+        self.assertTrue(self.buffer.record('uid-1', True))
+        self.assertEqual(self.buffer.get_stats(), {'pending': 1, 'writes': 1, 'skipped': 1, 'dropped': 0})
+
+    def test_writes_in_batches(self):
+        for index in range(5):
+            self.buffer.record(f'uid-{index}', False)
+
+        with mock.patch.object(last_login, 'MAX_BATCH_SIZE', 2):
+            self.assertEqual(self.buffer.flush(), 5)
+
+        self.assertEqual(self.db.batch.call_count, 3)
+        self.assertEqual(self.db.batch.return_value.commit.call_count, 3)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_failed_batch_is_retried_without_overwriting_newer_login(self):
+        self.buffer.record('uid-1', False)
+        self.buffer.record('uid-2', False)
+        self.db.batch.return_value.commit.side_effect = [RuntimeError('unavailable'), None]
+
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.get_stats()['pending'], 2)
+
+        # Başarısız yazmadan sonra gelen giriş tekrar denenen değerin yerine geçer
+        self.buffer.record('uid-1', True)
+        self.assertEqual(self.buffer.flush(), 2)
+        updates = {call.args[1]['email_verified'] for call in self.db.batch.return_value.update.call_args_list[-2:]}
+        self.assertEqual(updates, {True, False})
+        self.assertEqual(self.buffer.get_stats()['pending'], 0)
+
+    def test_missing_document_does_not_block_batch(self):
+        refs = {uid: mock.MagicMock() for uid in ('uid-1', 'missing', 'uid-2')}
+        refs['missing'].update.side_effect = NotFound('No document to update')
+        self.db.collection.return_value.document.side_effect = refs.__getitem__
+        self.db.batch.return_value.commit.side_effect = NotFound('No document to update')
+        for uid in refs:
+            self.buffer.record(uid, False)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        refs['uid-1'].update.assert_called_once()
+        refs['uid-2'].update.assert_called_once()
+        # Eksik belge tekrar kuyruğa alınmaz
+        self.assertEqual(self.buffer.get_stats(), {'pending': 0, 'writes': 2, 'skipped': 0, 'dropped': 1})
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.db.batch.return_value.commit.call_count, 1)
+
+    def test_failing_update_is_dropped_after_max_attempts(self):
+        self.buffer.record('uid-1', False)
+        self.db.batch.return_value.commit.side_effect = RuntimeError('unavailable')
+
+        for _ in range(last_login.MAX_ATTEMPTS):
+            self.assertEqual(self.buffer.flush(), 0)
+
+        self.assertEqual(self.db.batch.return_value.commit.call_count, last_login.MAX_ATTEMPTS)
+        self.assertEqual(self.buffer.get_stats(), {'pending': 0, 'writes': 0, 'skipped': 0, 'dropped': 1})
+        self.assertEqual(self.buffer._failures, {})
+
+    def test_pending_logins_are_written_at_exit(self):
+        with mock.patch.object(last_login.atexit, 'register') as register:
+            buffer = last_login.create_buffer(self.db, 300, 3600)
+        buffer.record('uid-1', False)
+
+        exit_handler = register.call_args.args[0]
+        exit_handler()
+
+        self.assertEqual(buffer.get_stats(), {'pending': 0, 'writes': 1, 'skipped': 0, 'dropped': 0})
+        self.assertFalse(buffer._worker.is_alive())
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        self.now = 0
+        self.cache = UserCache(timeout=300, max_size=2, clock=lambda: self.now)
+        self.defaults = {'username': 'ogrenci', 'email': 'ogrenci@example.com'}
+
+    def test_only_first_lookup_hits_database(self):
+        User.objects.create(firebase_uid='uid-1', **self.defaults)
+        with self.assertNumQueries(1):
+            user = self.cache.get_or_create('uid-1', self.defaults)
+        with self.assertNumQueries(0):
+            cached = self.cache.get_or_create('uid-1', self.defaults)
+
+        self.assertEqual(cached.pk, user.pk)
+        self.assertIsNot(cached, user)
+        self.assertEqual(self.cache.get_stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+        # Süre dolunca tekrar veritabanından okunur
+        self.now = 300
+        with self.assertNumQueries(1):
+            self.cache.get_or_create('uid-1', self.defaults)
+
+    def test_evicts_least_recently_used(self):
+        for index in range(3):
+            self.cache.set(f'uid-{index}', User(pk=index + 1))
+
+        self.assertIsNone(self.cache.get('uid-0'))
+        self.assertEqual(self.cache.get('uid-2').pk, 3)
+        self.assertEqual(self.cache._uids_by_user, {2: {'uid-1'}, 3: {'uid-2'}})
+
+    def test_invalidates_by_user_id(self):
+        self.cache.set('old-uid', User(pk=1))
+        self.cache.set('uid-2', User(pk=2))
+
+        self.cache.invalidate('new-uid', user_id=1)
+
+        self.assertIsNone(self.cache.get('old-uid'))
+        self.assertIsNotNone(self.cache.get('uid-2'))
+        self.assertEqual(self.cache._uids_by_user, {2: {'uid-2'}})
+
+    def test_saving_user_invalidates_module_cache(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        user = user_cache.get_or_create('uid-1', self.defaults)
+        self.assertIsNotNone(user_cache.get('uid-1'))
+
+        user.first_name = 'Ayşe'
+        user.save()
+        self.assertIsNone(user_cache.get('uid-1'))
+
+        self.assertEqual(user_cache.get_or_create('uid-1', self.defaults).first_name, 'Ayşe')
+        user.delete()
+        self.assertIsNone(user_cache.get('uid-1'))
+
+    def test_shared_cache_layer(self):
+        shared = caches['default']
+        shared.clear()
+        self.addCleanup(shared.clear)
+        first = UserCache(cache_alias='default')
+        second = UserCache(cache_alias='default')
+
+        user = first.get_or_create('uid-1', self.defaults)
+        # Başka bir sürecin önbelleği paylaşılan katmandan okur
+        with self.assertNumQueries(0):
+            self.assertEqual(second.get('uid-1').pk, user.pk)
+
+        first.invalidate('uid-1', user.pk)
+        self.assertIsNone(shared.get(UserCache.KEY_PREFIX + 'uid-1'))
+
+
+class OfflineTokenVerifierTests(TestCase):
+    project_id = 'yon-test'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_key, cls.public_keys = token_keys.create_local_key_pair()
+        cls.other_private_key, _ = token_keys.create_local_key_pair()
+
+    def setUp(self):
+        self.key_store = token_keys.SigningKeyStore()
+        self.key_store.set_keys(self.public_keys)
+        self.verifier = token_keys.OfflineTokenVerifier(self.key_store, self.project_id)
+
+    def sign(self, private_key=None, **kwargs):
+        return token_keys.sign_local_token(private_key or self.private_key, 'uid-1', self.project_id, **kwargs)
+
+    def test_valid_token(self):
+        claims = self.verifier.verify(self.sign(claims={'email': 'ogrenci@example.com'}))
+
+        self.assertEqual(claims['uid'], 'uid-1')
+        self.assertEqual(claims['email'], 'ogrenci@example.com')
+
+    def test_expired_token(self):
+        with self.assertRaises(auth.ExpiredIdTokenError):
+            self.verifier.verify(self.sign(expires_in=-60))
+
+    def test_unknown_kid_requests_refresh(self):
+        with mock.patch.object(self.key_store, 'request_refresh') as request_refresh:
+            with self.assertRaisesMessage(auth.InvalidIdTokenError, 'unknown "kid"'):
+                self.verifier.verify(self.sign(kid='rotated-key'))
+        request_refresh.assert_called_once()
+
+    def test_wrong_signing_key(self):
+        with self.assertRaises(auth.InvalidIdTokenError):
+            self.verifier.verify(self.sign(self.other_private_key))
+
+    def test_wrong_audience_issuer_and_future_iat(self):
+        now = int(time.time())
+        for claims, message in (
+            ({'aud': 'other-project'}, '"aud"'),
+            ({'iss': 'https://securetoken.google.com/other-project'}, '"iss"'),
+            ({'iat': now + 3600, 'exp': now + 7200}, 'too early'),
+        ):
+            with self.subTest(claims=claims):
+                with self.assertRaisesMessage(auth.InvalidIdTokenError, message):
+                    self.verifier.verify(self.sign(claims=claims))
+
+    def test_falls_back_to_firebase_admin_before_keys_are_loaded(self):
+        verifier = token_keys.OfflineTokenVerifier(token_keys.SigningKeyStore(), self.project_id)
+        token = self.sign()
+
+        with mock.patch.object(verifier.key_store, 'start') as start, \
+                mock.patch.object(token_keys.auth, 'verify_id_token', return_value={'uid': 'uid-1'}) as verify:
+            self.assertEqual(verifier.verify(token), {'uid': 'uid-1'})
+
+        verify.assert_called_once_with(token)
+        start.assert_called_once()
+
+    @override_settings(FIREBASE_OFFLINE_TOKEN_VERIFICATION=False)
+    def test_offline_verification_can_be_disabled(self):
+        with mock.patch.object(token_keys.auth, 'verify_id_token', return_value={'uid': 'uid-1'}) as verify:
+            token_keys.verify_id_token('token')
+        verify.assert_called_once_with('token')
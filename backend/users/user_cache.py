@@ -0,0 +1,142 @@
+"""
+Firebase UID -> Django User önbelleği.
+FirebaseAuthentication her istekte get_or_create çalıştırmak yerine kullanıcıyı
+süreç belleğinden (isteğe bağlı olarak Django cache'ten) alır. Kullanıcı kaydedildiğinde
+veya silindiğinde kayıt signals.py üzerinden geçersiz kılınır.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+
+class UserCache:
+    """
+    Süreç içi LRU önbellek; cache_alias verilirse Django cache'i ikinci katman olarak kullanılır.
+    Başka süreçlerin bellek katmanı geçersiz kılmayı timeout sonunda görür.
+
+    Args:
+        timeout: Kaydın geçerli kalacağı süre (saniye)
+        max_size: Bellekte tutulacak en fazla kullanıcı sayısı
+        cache_alias: settings.CACHES içindeki cache adı (None ise sadece bellek)
+        clock: Monotonik zaman fonksiyonu (testlerde değiştirilebilir)
+    """
+
+    KEY_PREFIX = 'firebase_user:'
+
+    def __init__(self, timeout: int = 300, max_size: int = 10000,
+                 cache_alias: Optional[str] = None, clock=time.monotonic):
+        self.timeout = timeout
+        self.max_size = max_size
+        self.cache_alias = cache_alias
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # user.pk -> UID'ler (UID değişmiş olabilir); invalidate tüm önbelleği taramaz
+        self._uids_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shared_cache(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def get(self, firebase_uid: str):
+        """Önbellekteki kullanıcının kopyasını döndür (yoksa None)"""
+        with self._lock:
+            entry = self._entries.get(firebase_uid)
+            if entry is not None:
+                expires_at, user = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(firebase_uid)
+                    self.hits += 1
+                    return copy.copy(user)
+                self._discard(firebase_uid)
+
+        user = self.shared_cache.get(self.KEY_PREFIX + firebase_uid) if self.cache_alias else None
+        if user is not None:
+            self._remember(firebase_uid, user)
+            with self._lock:
+                self.hits += 1
+            return copy.copy(user)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _discard(self, firebase_uid: str) -> None:
+        """Kaydı ve kullanıcı indeksindeki karşılığını sil (kilit alınmış olmalı)"""
+        entry = self._entries.pop(firebase_uid, None)
+        if entry is None:
+            return
+        uids = self._uids_by_user.get(entry[1].pk)
+        if uids is not None:
+            uids.discard(firebase_uid)
+            if not uids:
+                del self._uids_by_user[entry[1].pk]
+
+    def _remember(self, firebase_uid: str, user) -> None:
+        with self._lock:
+            self._discard(firebase_uid)
+            self._entries[firebase_uid] = (self.clock() + self.timeout, user)
+            self._uids_by_user.setdefault(user.pk, set()).add(firebase_uid)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def set(self, firebase_uid: str, user) -> None:
+        self._remember(firebase_uid, user)
+        if self.cache_alias:
+            self.shared_cache.set(self.KEY_PREFIX + firebase_uid, user, self.timeout)
+
+    def get_or_create(self, firebase_uid: str, defaults: Dict[str, Any]):
+        """
+        Kullanıcıyı önbellekten al; yoksa User.objects.get_or_create ile getir ve sakla.
+        Önbellek penceresi başına sadece ilk istek veritabanına gider.
+        """
+        user = self.get(firebase_uid)
+        if user is None:
+            User = get_user_model()
+            user, _ = User.objects.get_or_create(firebase_uid=firebase_uid, defaults=defaults)
+            self.set(firebase_uid, user)
+            user = copy.copy(user)
+        return user
+
+    def invalidate(self, firebase_uid: Optional[str] = None, user_id: Optional[int] = None) -> None:
+        """UID'ye veya kullanıcı id'sine ait kayıtları sil (UID değişmiş olabilir)"""
+        with self._lock:
+            uids = set(self._uids_by_user.get(user_id, ())) if user_id is not None else set()
+            if firebase_uid in self._entries:
+                uids.add(firebase_uid)
+            for uid in uids:
+                self._discard(uid)
+        if firebase_uid:
+            uids.add(firebase_uid)
+        if self.cache_alias and uids:
+            self.shared_cache.delete_many([self.KEY_PREFIX + uid for uid in uids])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._uids_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries)
+            }
+
+
+user_cache = UserCache(
+    timeout=getattr(settings, 'FIREBASE_USER_CACHE_TIMEOUT', 300),
+    cache_alias=getattr(settings, 'FIREBASE_USER_CACHE_ALIAS', None)
+)
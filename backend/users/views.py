@@ -13,6 +13,7 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from yon_backend.authentication import require_firebase_auth
+from yon_backend.token_cache import verify_id_token
 
 # Firebase Firestore client
 db = firestore.client()
@@ -30,7 +31,7 @@ def firebase_login(request):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         # Firebase token'ı doğrula
-        decoded_token = auth.verify_id_token(firebase_token)
+        decoded_token = verify_id_token(firebase_token)
         user_uid = decoded_token['uid']
 
         # Kullanıcıyı Firestore'dan al veya oluştur